@@ -3,9 +3,17 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import psycopg2
+import os
+import threading
+import time
 from contextlib import contextmanager
 
+import psycopg2
+
+from db import LOCAL_DB, create_pool, checkout, checkin
+from consultation import find_students, find_profs, student_planning, prof_planning
+from scheduler import ExamScheduler, PHASES
+
 st.set_page_config(
     page_title="Plateforme d'Optimisation des Examens",
     layout="wide",
@@ -92,82 +100,106 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+def _db_settings():
+    """Paramètres de connexion et taille du pool : secrets Streamlit (cloud) sinon base locale"""
+    try:
+        if 'database' in st.secrets:
+            db = st.secrets["database"]
+            params = dict(
+                host=db["host"],
+                port=db["port"],
+                database=db["name"],
+                user=db["user"],
+                password=db["password"]
+            )
+            return params, int(db.get("pool_min", 1)), int(db.get("pool_max", 10))
+    except Exception:
+        pass
+    # Fall back to local connection
+    return dict(LOCAL_DB), int(os.environ.get("DB_POOL_MIN", 1)), int(os.environ.get("DB_POOL_MAX", 10))
+
+@st.cache_resource
+def get_pool():
+    """Un seul pool pour tout le processus, partagé par les sessions"""
+    params, minconn, maxconn = _db_settings()
+    return create_pool(minconn, maxconn, **params)
+
 @contextmanager
 def get_connection():
-    conn = None
+    """Emprunte une connexion au pool (vérifiée) et la rend à la sortie"""
     try:
-        # Try Streamlit secrets first (for cloud deployment)
-        try:
-            if 'database' in st.secrets:
-                conn = psycopg2.connect(
-                    host=st.secrets["database"]["host"],
-                    port=st.secrets["database"]["port"],
-                    database=st.secrets["database"]["name"],
-                    user=st.secrets["database"]["user"],
-                    password=st.secrets["database"]["password"]
-                )
-        except:
-            # Fall back to local connection
-            conn = psycopg2.connect(
-                dbname="exam_scheduler",
-                user="postgres",
-                password="yassinopostgresql",
-                host="localhost",
-                port="5432"
-            )
-        yield conn
+        pool = get_pool()
+        conn = checkout(pool)
     except Exception as e:
         st.error(f"Erreur de connexion à la base de données : {e}")
         st.info("Vérifiez que PostgreSQL est démarré et que les identifiants sont corrects")
         yield None
+        return
+    try:
+        yield conn
     finally:
-        if conn:
-            conn.close()
+        checkin(pool, conn)
+
+# Tables lues par chaque chargeur : son cache n'est recalculé que si l'une d'elles change
+SOURCES = {
+    'kpis': ('etudiants', 'professeurs', 'modules', 'inscriptions', 'departements',
+             'formations', 'salles', 'examens'),
+    'department_stats': ('departements', 'formations', 'etudiants', 'professeurs'),
+    'conflicts': ('examens', 'inscriptions', 'modules', 'salles'),
+    'exam_list': ('examens', 'modules', 'professeurs', 'salles'),
+    'prof_workload': ('professeurs', 'examens', 'departements'),
+    'salle_occupation': ('salles', 'examens', 'modules'),
+}
+
+@st.cache_data(ttl=2, show_spinner=False)
+def get_data_versions():
+    """Compteur de version de chaque table (data_version) ; mis en cache le temps d'un rendu"""
+    with get_connection() as conn:
+        if not conn:
+            return None
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT source, version FROM data_version")
+            versions = dict(cur.fetchall())
+            cur.close()
+            return versions
+        except Exception:
+            return None
+
+def data_version(loader):
+    """Clé de cache d'un chargeur : versions de ses tables sources.
+
+    Sans table data_version (schéma non migré), retombe sur une expiration de 5 minutes.
+    """
+    versions = get_data_versions()
+    if versions is None:
+        return int(time.time() // 300)
+    return tuple(versions.get(table, 0) for table in SOURCES[loader])
 
-@st.cache_data(ttl=300)
-def get_global_kpis():
+KPI_CLES = [
+    'total_etudiants', 'total_professeurs', 'total_modules', 'total_inscriptions',
+    'total_departements', 'total_formations', 'total_salles', 'capacite_totale', 'total_examens'
+]
+
+@st.cache_data(max_entries=2)
+def get_global_kpis(version):
     with get_connection() as conn:
         if not conn:
             return {}
         try:
-            kpis = {}
+            # Compteurs tenus à jour par trigger (kpi_snapshot) : un seul aller-retour
             cur = conn.cursor()
-            
-            cur.execute("SELECT COUNT(*) FROM etudiants")
-            kpis['total_etudiants'] = cur.fetchone()[0]
-            
-            cur.execute("SELECT COUNT(*) FROM professeurs")
-            kpis['total_professeurs'] = cur.fetchone()[0]
-            
-            cur.execute("SELECT COUNT(*) FROM modules")
-            kpis['total_modules'] = cur.fetchone()[0]
-            
-            cur.execute("SELECT COUNT(*) FROM inscriptions")
-            kpis['total_inscriptions'] = cur.fetchone()[0]
-            
-            cur.execute("SELECT COUNT(*) FROM departements")
-            kpis['total_departements'] = cur.fetchone()[0]
-            
-            cur.execute("SELECT COUNT(*) FROM formations")
-            kpis['total_formations'] = cur.fetchone()[0]
-            
-            cur.execute("SELECT COUNT(*) FROM salles")
-            kpis['total_salles'] = cur.fetchone()[0]
-            
-            cur.execute("SELECT SUM(capacite) FROM salles")
-            kpis['capacite_totale'] = cur.fetchone()[0] or 0
-            
-            cur.execute("SELECT COUNT(*) FROM examens")
-            kpis['total_examens'] = cur.fetchone()[0]
-            
+            cur.execute("SELECT cle, SUM(valeur) FROM kpi_snapshot GROUP BY cle")
+            valeurs = dict(cur.fetchall())
+            kpis = {cle: int(valeurs.get(cle) or 0) for cle in KPI_CLES}
             cur.close()
             return kpis
         except Exception as e:
             st.error(f"Erreur KPIs : {e}")
             return {}
 
-@st.cache_data(ttl=300)
-def get_department_stats():
+@st.cache_data(max_entries=2)
+def get_department_stats(version):
     with get_connection() as conn:
         if not conn:
             return pd.DataFrame()
@@ -191,8 +223,8 @@ def get_department_stats():
             st.error(f"Erreur stats département : {e}")
             return pd.DataFrame()
 
-@st.cache_data(ttl=300)
-def get_conflicts():
+@st.cache_data(max_entries=2)
+def get_conflicts(version):
     with get_connection() as conn:
         if not conn:
             return {}
@@ -200,16 +232,13 @@ def get_conflicts():
             conflicts = {}
             cur = conn.cursor()
             
-            # Conflits étudiants (>1 examen/jour)
+            # Conflits étudiants (>1 examen/jour) : lookup sur la table maintenue par triggers
             cur.execute("""
-                SELECT COUNT(DISTINCT e.id)
-                FROM etudiants e
-                JOIN inscriptions i ON i.etudiant_id = e.id
-                JOIN examens ex ON ex.module_id = i.module_id
-                GROUP BY e.id, DATE(ex.date_heure)
-                HAVING COUNT(*) > 1
+                SELECT COUNT(*)
+                FROM student_day_load
+                WHERE nb > 1
             """)
-            conflicts['etudiants'] = len(cur.fetchall())
+            conflicts['etudiants'] = cur.fetchone()[0]
             
             # Conflits professeurs (>3 examens/jour)
             cur.execute("""
@@ -223,17 +252,27 @@ def get_conflicts():
             """)
             conflicts['professeurs'] = cur.fetchone()[0]
             
-            # Conflits capacité salles
+            # Conflits capacité salles : places cumulées des salles d'un examen
+            # (réparti sur plusieurs salles) insuffisantes, ou salle occupée deux fois
             cur.execute("""
-                SELECT COUNT(*)
-                FROM (
-                    SELECT ex.id
-                    FROM examens ex
-                    JOIN salles s ON s.id = ex.salle_id
-                    JOIN inscriptions i ON i.module_id = ex.module_id
-                    GROUP BY ex.id, s.capacite
-                    HAVING COUNT(i.etudiant_id) > s.capacite
-                ) t
+                SELECT
+                    (SELECT COUNT(*)
+                     FROM (
+                         SELECT ex.module_id, ex.date_heure,
+                                SUM(s.capacite) as places, MAX(m.nb_inscrits) as nb_inscrits
+                         FROM examens ex
+                         JOIN salles s ON s.id = ex.salle_id
+                         JOIN modules m ON m.id = ex.module_id
+                         GROUP BY ex.module_id, ex.date_heure
+                     ) t
+                     WHERE t.nb_inscrits > t.places)
+                  + (SELECT COUNT(*)
+                     FROM (
+                         SELECT salle_id, date_heure
+                         FROM examens
+                         GROUP BY salle_id, date_heure
+                         HAVING COUNT(DISTINCT module_id) > 1
+                     ) t)
             """)
             conflicts['capacite'] = cur.fetchone()[0]
             
@@ -243,13 +282,37 @@ def get_conflicts():
             st.error(f"Erreur détection conflits : {e}")
             return {}
 
-@st.cache_data(ttl=300)
-def get_exam_list():
+# Examens par page de la liste d'administration
+EXAM_PAGE_SIZE = 50
+
+@st.cache_data(max_entries=64)
+def get_exam_page(version, after=None, dept_id=None, jour=None, salle_id=None, page_size=EXAM_PAGE_SIZE):
+    """Une page d'examens triés par (date_heure, id), à partir de la clé after.
+
+    Pagination par clé (keyset) : la base ne lit que page_size + 1 lignes quel que
+    soit le rang de la page ; la ligne en plus indique s'il reste une page suivante.
+    Retourne (DataFrame, clé de la page suivante ou None).
+    """
     with get_connection() as conn:
         if not conn:
-            return pd.DataFrame()
+            return pd.DataFrame(), None
         try:
-            query = """
+            filtres, params = [], []
+            if after is not None:
+                filtres.append("(ex.date_heure, ex.id) > (%s, %s)")
+                params += list(after)
+            if dept_id is not None:
+                filtres.append("f.dept_id = %s")
+                params.append(dept_id)
+            if jour is not None:
+                # Intervalle plutôt que DATE(...) = : reste compatible avec l'index trié
+                filtres.append("ex.date_heure >= %s AND ex.date_heure < %s")
+                params += [jour, jour + timedelta(days=1)]
+            if salle_id is not None:
+                filtres.append("ex.salle_id = %s")
+                params.append(salle_id)
+            where = f"WHERE {' AND '.join(filtres)}" if filtres else ""
+            query = f"""
                 SELECT 
                     ex.id,
                     m.nom as module,
@@ -257,24 +320,49 @@ def get_exam_list():
                     s.nom as salle,
                     ex.date_heure,
                     ex.duree_minutes,
-                    COUNT(i.etudiant_id) as nb_inscrits,
+                    m.nb_inscrits,
                     s.capacite
                 FROM examens ex
                 JOIN modules m ON m.id = ex.module_id
+                JOIN formations f ON f.id = m.formation_id
                 JOIN professeurs p ON p.id = ex.prof_id
                 JOIN salles s ON s.id = ex.salle_id
-                LEFT JOIN inscriptions i ON i.module_id = ex.module_id
-                GROUP BY ex.id, m.nom, p.nom, s.nom, ex.date_heure, ex.duree_minutes, s.capacite
-                ORDER BY ex.date_heure
+                {where}
+                ORDER BY ex.date_heure, ex.id
+                LIMIT %s
             """
-            df = pd.read_sql(query, conn)
-            return df
+            df = pd.read_sql(query, conn, params=params + [page_size + 1])
+            if len(df) > page_size:
+                df = df.iloc[:page_size]
+                last = df.iloc[-1]
+                return df, (last['date_heure'].to_pydatetime(), int(last['id']))
+            return df, None
         except Exception as e:
             st.error(f"Erreur liste examens : {e}")
-            return pd.DataFrame()
+            return pd.DataFrame(), None
+
+@st.cache_data(max_entries=2)
+def get_exam_filters(version):
+    """Valeurs des filtres de la liste : départements, jours d'examen, salles"""
+    with get_connection() as conn:
+        if not conn:
+            return [], [], []
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT id, nom FROM departements ORDER BY nom")
+            departements = cur.fetchall()
+            cur.execute("SELECT DISTINCT DATE(date_heure) FROM examens ORDER BY 1")
+            jours = [j for j, in cur.fetchall()]
+            cur.execute("SELECT id, nom FROM salles ORDER BY nom")
+            salles = cur.fetchall()
+            cur.close()
+            return departements, jours, salles
+        except Exception as e:
+            st.error(f"Erreur filtres examens : {e}")
+            return [], [], []
 
-@st.cache_data(ttl=300)
-def get_prof_workload():
+@st.cache_data(max_entries=2)
+def get_prof_workload(version):
     with get_connection() as conn:
         if not conn:
             return pd.DataFrame()
@@ -297,28 +385,31 @@ def get_prof_workload():
             st.error(f"Erreur charge professeurs : {e}")
             return pd.DataFrame()
 
-@st.cache_data(ttl=300)
-def get_salle_occupation():
+@st.cache_data(max_entries=2)
+def get_salle_occupation(version):
     with get_connection() as conn:
         if not conn:
             return pd.DataFrame()
         try:
+            # Un examen réparti sur plusieurs salles remplit chacune au prorata de ses
+            # inscrits sur les places cumulées (plafonné à 100)
             query = """
+                WITH occupation AS (
+                    SELECT ex.id, ex.salle_id, m.nb_inscrits,
+                           SUM(s.capacite) OVER (PARTITION BY ex.module_id, ex.date_heure) as places
+                    FROM examens ex
+                    JOIN salles s ON s.id = ex.salle_id
+                    JOIN modules m ON m.id = ex.module_id
+                )
                 SELECT 
                     s.nom,
                     s.type,
                     s.capacite,
-                    COUNT(ex.id) as nb_examens,
-                    ROUND(AVG(inscr_count.nb_inscrits * 100.0 / s.capacite), 2) as taux_occupation
+                    COUNT(o.id) as nb_examens,
+                    ROUND(AVG(LEAST(o.nb_inscrits, o.places) * 100.0 / o.places), 2) as taux_occupation
                 FROM salles s
-                LEFT JOIN examens ex ON ex.salle_id = s.id
-                LEFT JOIN (
-                    SELECT ex.id, COUNT(i.etudiant_id) as nb_inscrits
-                    FROM examens ex
-                    JOIN inscriptions i ON i.module_id = ex.module_id
-                    GROUP BY ex.id
-                ) inscr_count ON inscr_count.id = ex.id
-                GROUP BY s.nom, s.type, s.capacite
+                LEFT JOIN occupation o ON o.salle_id = s.id
+                GROUP BY s.id, s.nom, s.type, s.capacite
                 ORDER BY taux_occupation DESC NULLS LAST
                 LIMIT 15
             """
@@ -358,7 +449,7 @@ def render_navbar(current_page):
 def show_accueil():
     st.markdown('<div class="main-header">Plateforme d\'Optimisation des Emplois du Temps d\'Examens</div>', unsafe_allow_html=True)
     
-    kpis = get_global_kpis()
+    kpis = get_global_kpis(data_version('kpis'))
     
     st.markdown('<div class="stats-header">Vue d\'ensemble</div>', unsafe_allow_html=True)
     
@@ -388,7 +479,7 @@ def show_accueil():
     
     st.markdown('<div class="stats-header">Statistiques par Département</div>', unsafe_allow_html=True)
     
-    dept_stats = get_department_stats()
+    dept_stats = get_department_stats(data_version('department_stats'))
     
     if not dept_stats.empty:
         col_left, col_right = st.columns(2)
@@ -419,6 +510,71 @@ def show_accueil():
         
         st.dataframe(dept_stats, use_container_width=True, hide_index=True)
 
+class GenerationJob:
+    """Génération du planning dans un thread : le script Streamlit ne bloque pas et
+    lit l'avancement (phase en cours, durées) à chaque rafraîchissement"""
+    
+    def __init__(self, params):
+        self.params = params
+        self.phase = None
+        self.timings = {}
+        self.result = None
+        self.debut = time.time()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def is_alive(self):
+        return self._thread.is_alive()
+    
+    def _progress(self, phase, timings):
+        self.phase, self.timings = phase, timings
+    
+    def _run(self):
+        try:
+            # Connexion dédiée (hors pool) : generate() la ferme à la fin
+            conn = psycopg2.connect(**self.params)
+            self.result = ExamScheduler(conn=conn).generate(progress=self._progress)
+        except Exception as e:
+            self.result = (False, str(e), {})
+
+@st.cache_resource
+def get_generation_jobs():
+    """Génération en cours (ou dernière terminée), commune à toutes les sessions"""
+    return {'lock': threading.Lock(), 'courant': None}
+
+def _generation_panel(job):
+    noms = [nom for nom, _ in PHASES]
+    libelles = dict(PHASES)
+    
+    if job.is_alive():
+        fait = noms.index(job.phase) if job.phase in noms else 0
+        st.progress(fait / len(PHASES), text=f"{libelles.get(job.phase, 'Démarrage')}... "
+                                             f"({time.time() - job.debut:.0f} s)")
+    else:
+        ok, msg, metrics = job.result
+        (st.success if ok else st.error)(msg)
+    
+    # Compteurs de chaque phase (lignes, arêtes, couleurs...) une fois la génération finie
+    mesures = {} if job.is_alive() else job.result[2].get('phases', {})
+    st.dataframe(pd.DataFrame({
+        'phase': [libelles[nom] for nom in noms],
+        'durée (s)': [round(job.timings[nom], 2) if nom in job.timings else None for nom in noms],
+        'détail': [", ".join(f"{k}={v}" for k, v in mesures.get(nom, {}).items() if k != 'secondes')
+                   for nom in noms],
+    }), hide_index=True)
+    
+    # Fin de génération : les versions de données ont changé, on relit tout le tableau de bord
+    if not job.is_alive() and st.session_state.get('generation_vue') is not job:
+        st.session_state.generation_vue = job
+        get_data_versions.clear()
+        st.rerun()
+
+# Pendant la génération, seul ce panneau est rafraîchi chaque seconde
+generation_progress_live = st.fragment(run_every=1)(_generation_panel)
+generation_progress = st.fragment(_generation_panel)
+
 def show_administration():
     st.markdown('<div class="main-header">Administration des Examens</div>', unsafe_allow_html=True)
     
@@ -434,19 +590,29 @@ def show_administration():
     
     col1, col2, col3 = st.columns([1, 2, 1])
     
+    jobs = get_generation_jobs()
     with col2:
-        if st.button(" Générer les Emplois du Temps", use_container_width=True, type="primary"):
-            with st.spinner("Génération en cours... Optimisation des ressources"):
-                import time
-                time.sleep(20)
-                st.success("Emplois du temps générés avec succès ! en 20 secondes ")
-                
+        if st.button(" Générer les Emplois du Temps", use_container_width=True, type="primary",
+                     disabled=jobs['courant'] is not None and jobs['courant'].is_alive()):
+            with jobs['lock']:
+                if jobs['courant'] is None or not jobs['courant'].is_alive():
+                    params, _, _ = _db_settings()
+                    jobs['courant'] = GenerationJob(params)
+                    jobs['courant'].start()
+    
+    job = jobs['courant']
+    if job is not None:
+        if job.is_alive():
+            generation_progress_live(job)
+        else:
+            generation_progress(job)
+    
     
     st.markdown("---")
     
     st.markdown('<div class="stats-header">Détection de Conflits</div>', unsafe_allow_html=True)
     
-    conflicts = get_conflicts()
+    conflicts = get_conflicts(data_version('conflicts'))
     
     col_c1, col_c2, col_c3 = st.columns(3)
     
@@ -472,10 +638,47 @@ def show_administration():
     
     st.markdown('<div class="stats-header">Liste des Examens Planifiés</div>', unsafe_allow_html=True)
     
-    df_exams = get_exam_list()
+    version = data_version('exam_list')
+    departements, jours, salles = get_exam_filters(version)
+    
+    col_f1, col_f2, col_f3 = st.columns(3)
+    with col_f1:
+        dept = st.selectbox("Département", [None] + departements,
+                            format_func=lambda d: "Tous" if d is None else d[1])
+    with col_f2:
+        jour = st.selectbox("Jour", [None] + jours,
+                            format_func=lambda j: "Tous" if j is None else j.strftime('%d/%m/%Y'))
+    with col_f3:
+        salle = st.selectbox("Salle", [None] + salles,
+                             format_func=lambda s: "Toutes" if s is None else s[1])
+    filtres = dict(
+        dept_id=dept[0] if dept else None,
+        jour=jour,
+        salle_id=salle[0] if salle else None,
+    )
+    
+    # Pile des clés de début de page ; remise à zéro quand les filtres ou les données changent
+    etat = (version, tuple(filtres.items()))
+    if st.session_state.get('exam_pages_etat') != etat:
+        st.session_state.exam_pages_etat = etat
+        st.session_state.exam_pages = [None]
+    pages = st.session_state.exam_pages
+    
+    df_exams, suivante = get_exam_page(version, pages[-1], **filtres)
     
     if not df_exams.empty:
         st.dataframe(df_exams, use_container_width=True, hide_index=True)
+        col_p1, col_p2, col_p3 = st.columns([1, 2, 1])
+        with col_p1:
+            if st.button("← Précédent", disabled=len(pages) == 1, use_container_width=True):
+                pages.pop()
+                st.rerun()
+        with col_p2:
+            st.caption(f"Page {len(pages)} — {EXAM_PAGE_SIZE} examens par page")
+        with col_p3:
+            if st.button("Suivant →", disabled=suivante is None, use_container_width=True):
+                pages.append(suivante)
+                st.rerun()
     else:
         st.info("Aucun examen planifié pour le moment")
 
@@ -484,7 +687,7 @@ def show_statistiques():
     
     st.markdown('<div class="stats-header">Statistiques par Département</div>', unsafe_allow_html=True)
     
-    dept_stats = get_department_stats()
+    dept_stats = get_department_stats(data_version('department_stats'))
     
     if not dept_stats.empty:
         col1, col2 = st.columns(2)
@@ -514,7 +717,7 @@ def show_statistiques():
     
     st.markdown('<div class="stats-header">Charge de Travail des Professeurs</div>', unsafe_allow_html=True)
     
-    df_prof = get_prof_workload()
+    df_prof = get_prof_workload(data_version('prof_workload'))
     
     if not df_prof.empty:
         col_a, col_b = st.columns([2, 1])
@@ -539,7 +742,7 @@ def show_statistiques():
     
     st.markdown('<div class="stats-header">Occupation des Salles</div>', unsafe_allow_html=True)
     
-    df_salles = get_salle_occupation()
+    df_salles = get_salle_occupation(data_version('salle_occupation'))
     
     if not df_salles.empty:
         fig = px.bar(
@@ -569,22 +772,34 @@ def show_consultation():
     
     role = st.selectbox("Sélectionnez votre rôle", ["Étudiant", "Professeur"])
     
+    # Recherche par préfixe côté base : seules les premières correspondances remontent
     if role == "Étudiant":
-        with get_connection() as conn:
-            if conn:
-                df_students = pd.read_sql("SELECT id, nom, prenom FROM etudiants LIMIT 100", conn)
-                if not df_students.empty:
-                    student = st.selectbox("Sélectionnez un étudiant", 
-                                          df_students.apply(lambda x: f"{x['nom']} {x['prenom']}", axis=1))
+        texte = st.text_input("Nom, nom prénom ou numéro d'étudiant", placeholder="ex. Martin Léa")
+        find, planning = find_students, student_planning
+        label = lambda r: f"{r['nom']} {r['prenom']} — {r['formation']} (n° {r['id']})"
+    else:
+        texte = st.text_input("Nom du professeur", placeholder="ex. Bernard")
+        find, planning = find_profs, prof_planning
+        label = lambda r: f"{r['nom']} — {r['departement']} (n° {r['id']})"
+    
+    if not texte.strip():
+        return
+    
+    with get_connection() as conn:
+        if not conn:
+            return
+        resultats = find(conn, texte)
+        if resultats.empty:
+            st.info("Aucun résultat")
+            return
+        choix = st.selectbox("Sélectionnez une personne", resultats.to_dict('records'), format_func=label)
+        
+        df_planning = planning(conn, choix['id'])
+    
+    if df_planning.empty:
+        st.info("Aucun examen planifié")
     else:
-        with get_connection() as conn:
-            if conn:
-                df_profs = pd.read_sql("SELECT id, nom FROM professeurs LIMIT 100", conn)
-                if not df_profs.empty:
-                    prof = st.selectbox("Sélectionnez un professeur", df_profs['nom'])
-    
-    if st.button("Afficher mon planning", type="primary"):
-        st.info("Planning personnalisé en cours de développement")
+        st.dataframe(df_planning, use_container_width=True, hide_index=True)
 
 def main():
     if 'page' not in st.session_state:
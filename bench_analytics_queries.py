@@ -0,0 +1,160 @@
+import argparse
+
+from db import get_connection
+
+# Requêtes du tableau de bord avant modules.nb_inscrits : COUNT sur inscriptions à chaque appel
+OLD_QUERIES = {
+    'liste examens': """
+        SELECT ex.id, m.nom as module, p.nom as professeur, s.nom as salle,
+               ex.date_heure, ex.duree_minutes, COUNT(i.etudiant_id) as nb_inscrits, s.capacite
+        FROM examens ex
+        JOIN modules m ON m.id = ex.module_id
+        JOIN professeurs p ON p.id = ex.prof_id
+        JOIN salles s ON s.id = ex.salle_id
+        LEFT JOIN inscriptions i ON i.module_id = ex.module_id
+        GROUP BY ex.id, m.nom, p.nom, s.nom, ex.date_heure, ex.duree_minutes, s.capacite
+        ORDER BY ex.date_heure
+    """,
+    'occupation salles': """
+        SELECT s.nom, s.type, s.capacite, COUNT(ex.id) as nb_examens,
+               ROUND(AVG(inscr_count.nb_inscrits * 100.0 / s.capacite), 2) as taux_occupation
+        FROM salles s
+        LEFT JOIN examens ex ON ex.salle_id = s.id
+        LEFT JOIN (
+            SELECT ex.id, COUNT(i.etudiant_id) as nb_inscrits
+            FROM examens ex
+            JOIN inscriptions i ON i.module_id = ex.module_id
+            GROUP BY ex.id
+        ) inscr_count ON inscr_count.id = ex.id
+        GROUP BY s.nom, s.type, s.capacite
+        ORDER BY taux_occupation DESC NULLS LAST
+        LIMIT 15
+    """,
+    'capacité': """
+        SELECT COUNT(*)
+        FROM (
+            SELECT ex.module_id, ex.date_heure, SUM(s.capacite) as places
+            FROM examens ex
+            JOIN salles s ON s.id = ex.salle_id
+            GROUP BY ex.module_id, ex.date_heure
+        ) t
+        JOIN (
+            SELECT module_id, COUNT(*) as nb_inscrits
+            FROM inscriptions
+            GROUP BY module_id
+        ) i ON i.module_id = t.module_id
+        WHERE i.nb_inscrits > t.places
+    """,
+}
+
+# Mêmes requêtes lisant modules.nb_inscrits (app.py ; la liste y est désormais paginée)
+NEW_QUERIES = {
+    'liste examens': """
+        SELECT ex.id, m.nom as module, p.nom as professeur, s.nom as salle,
+               ex.date_heure, ex.duree_minutes, m.nb_inscrits, s.capacite
+        FROM examens ex
+        JOIN modules m ON m.id = ex.module_id
+        JOIN professeurs p ON p.id = ex.prof_id
+        JOIN salles s ON s.id = ex.salle_id
+        ORDER BY ex.date_heure
+    """,
+    'occupation salles': """
+        WITH occupation AS (
+            SELECT ex.id, ex.salle_id, m.nb_inscrits,
+                   SUM(s.capacite) OVER (PARTITION BY ex.module_id, ex.date_heure) as places
+            FROM examens ex
+            JOIN salles s ON s.id = ex.salle_id
+            JOIN modules m ON m.id = ex.module_id
+        )
+        SELECT s.nom, s.type, s.capacite, COUNT(o.id) as nb_examens,
+               ROUND(AVG(LEAST(o.nb_inscrits, o.places) * 100.0 / o.places), 2) as taux_occupation
+        FROM salles s
+        LEFT JOIN occupation o ON o.salle_id = s.id
+        GROUP BY s.id, s.nom, s.type, s.capacite
+        ORDER BY taux_occupation DESC NULLS LAST
+        LIMIT 15
+    """,
+    'capacité': """
+        SELECT COUNT(*)
+        FROM (
+            SELECT ex.module_id, ex.date_heure,
+                   SUM(s.capacite) as places, MAX(m.nb_inscrits) as nb_inscrits
+            FROM examens ex
+            JOIN salles s ON s.id = ex.salle_id
+            JOIN modules m ON m.id = ex.module_id
+            GROUP BY ex.module_id, ex.date_heure
+        ) t
+        WHERE t.nb_inscrits > t.places
+    """,
+}
+
+
+def explain(cur, sql, repeat=3):
+    """Meilleur temps d'exécution (ms) sur repeat EXPLAIN ANALYZE, et noeud racine du plan"""
+    best, root = None, None
+    for _ in range(repeat):
+        cur.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")
+        plan = cur.fetchone()[0][0]
+        if best is None or plan['Execution Time'] < best:
+            best, root = plan['Execution Time'], plan['Plan']['Node Type']
+    return best, root
+
+
+def check_parity(cur):
+    """Les inscrits par examen et le nombre de conflits de capacité ne changent pas"""
+    cur.execute(OLD_QUERIES['liste examens'])
+    old = sorted((r[0], r[6]) for r in cur.fetchall())
+    cur.execute(NEW_QUERIES['liste examens'])
+    new = sorted((r[0], r[6]) for r in cur.fetchall())
+    assert old == new, "nb_inscrits diffère entre l'ancienne et la nouvelle liste d'examens"
+
+    cur.execute(OLD_QUERIES['capacité'])
+    old = cur.fetchone()[0]
+    cur.execute(NEW_QUERIES['capacité'])
+    assert old == cur.fetchone()[0], "nombre de conflits de capacité différent"
+
+
+def measure(label):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT (SELECT COUNT(*) FROM etudiants), (SELECT COUNT(*) FROM examens)")
+    nb_etudiants, nb_examens = cur.fetchone()
+    check_parity(cur)
+
+    print(f"\n{label} : {nb_etudiants:,} étudiants, {nb_examens:,} examens")
+    print(f"{'requête':<18} {'avant (ms)':>11} {'après (ms)':>11} {'gain':>7}  plans")
+    for name in OLD_QUERIES:
+        old_ms, old_root = explain(cur, OLD_QUERIES[name])
+        new_ms, new_root = explain(cur, NEW_QUERIES[name])
+        print(f"{name:<18} {old_ms:>11.1f} {new_ms:>11.1f} {old_ms / new_ms:>6.1f}x  {old_root} -> {new_root}")
+    conn.rollback()
+    cur.close()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE des requêtes d'analyse, avant/après nb_inscrits")
+    parser.add_argument("--regenerate", nargs="+", metavar="PRESET",
+                        help="régénère la base (ÉCRASE les données) pour chaque preset, ex. 13k 100k")
+    args = parser.parse_args()
+
+    if not args.regenerate:
+        measure("base actuelle")
+        return
+
+    from generate_data import generate
+    from scheduler import ExamScheduler
+
+    for preset in args.regenerate:
+        conn = get_connection()
+        try:
+            generate(conn, preset, clear=True)
+        finally:
+            conn.close()
+        ok, msg, _ = ExamScheduler().generate()
+        print(msg)
+        measure(f"preset {preset}")
+
+
+if __name__ == "__main__":
+    main()
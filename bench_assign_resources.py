@@ -0,0 +1,164 @@
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+
+import pandas as pd
+
+from bench_data import OfflineScheduler
+from scheduler import MAX_EXAMENS_PROF_JOUR
+
+# --quick : petit campus, contrôle en quelques secondes
+QUICK_ETUDIANTS = 2_000
+
+
+def assign_resources_legacy(scheduler, module_id, date_slot, time_slot_minutes, assigned_profs_count):
+    """Ancienne version : filtres pandas, sample(frac=1) et iterrows() à chaque appel"""
+    module = scheduler.modules[scheduler.modules['id'] == module_id].iloc[0]
+    nb_etudiants = module['nb_inscrits']
+    possible_salles = scheduler.salles[scheduler.salles['capacite'] >= nb_etudiants]
+    salle = scheduler.salles.iloc[-1] if possible_salles.empty else possible_salles.iloc[0]
+
+    dept_match_profs = scheduler.profs[scheduler.profs['dept_id'] == module['dept_id']]
+    other_profs = scheduler.profs[scheduler.profs['dept_id'] != module['dept_id']]
+    candidates = pd.concat([dept_match_profs.sample(frac=1), other_profs.sample(frac=1)])
+
+    chosen_prof = None
+    current_day_str = date_slot.strftime('%Y-%m-%d')
+    for _, prof in candidates.iterrows():
+        pid = prof['id']
+        if assigned_profs_count.get((pid, current_day_str), 0) < 3:
+            chosen_prof = prof
+            assigned_profs_count[(pid, current_day_str)] = assigned_profs_count.get((pid, current_day_str), 0) + 1
+            break
+    if chosen_prof is None:
+        chosen_prof = scheduler.profs.sample(1).iloc[0]
+    return salle['id'], chosen_prof['id']
+
+
+def make_calls(scheduler):
+    """Un appel par module, alterné sur les deux créneaux de 16 jours"""
+    module_ids = scheduler.modules['id'].tolist()
+    per_day = max(1, len(module_ids) // 16)
+    return [
+        (m, (scheduler.start_date + timedelta(days=i // per_day)).replace(hour=9 if i % 2 else 14))
+        for i, m in enumerate(module_ids)
+    ]
+
+
+def run(assign, scheduler, calls):
+    """Latence par appel (µs) sur une séquence de (module, créneau) réaliste"""
+    load = {}
+    latencies = []
+    scheduler.build_indexes()
+    for module_id, slot in calls:
+        t0 = time.perf_counter()
+        assign(module_id, slot, slot.hour * 60, load)
+        latencies.append((time.perf_counter() - t0) * 1e6)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)], sum(latencies) / 1e6
+
+
+def main():
+    print(f"{'étudiants':>10} {'appels':>7} {'version':<8} {'p50 (µs)':>9} {'p95 (µs)':>9} {'total (s)':>10}")
+    for nb in (13_000, 50_000):
+        scheduler = OfflineScheduler(nb)
+        scheduler.load_data()
+
+        random.seed(0)
+        calls = make_calls(scheduler)
+
+        legacy = lambda *args: assign_resources_legacy(scheduler, *args)
+        for label, assign in (("avant", legacy), ("après", scheduler.assign_resources)):
+            p50, p95, total = run(assign, scheduler, calls)
+            print(f"{nb:>10,} {len(calls):>7,} {label:<8} {p50:>9.1f} {p95:>9.1f} {total:>10.3f}")
+
+
+def quick_check(nb=QUICK_ETUDIANTS):
+    """Contrôle déterministe sur un petit campus : affectations reproductibles, sans
+    salle ni prof en double sur un créneau, capacité suffisante, limite journalière
+    des profs respectée, créneau sauté quand tous les surveillants sont pris, et index
+    précalculés nettement plus rapides que l'ancienne version"""
+    scheduler = OfflineScheduler(nb)
+    scheduler.load_data()
+    calls = make_calls(scheduler)
+
+    def affectations():
+        random.seed(0)
+        scheduler.build_indexes()
+        load = {}
+        return [scheduler.assign_resources(m, slot, slot.hour * 60, load) for m, slot in calls]
+
+    resultat = affectations()
+    assert affectations() == resultat, "affectation non reproductible"
+
+    capacite = dict(zip(scheduler.salle_ids, scheduler.salle_capacites))
+    salles, profs, profs_jour = Counter(), Counter(), Counter()
+    for (module_id, slot), paires in zip(calls, resultat):
+        if paires:
+            places = sum(capacite[s] for s, _ in paires)
+            assert places >= scheduler.module_index[module_id][0], f"capacité insuffisante (module {module_id})"
+        for salle_id, prof_id in paires:
+            salles[(salle_id, slot)] += 1
+            profs[(prof_id, slot)] += 1
+            profs_jour[(prof_id, slot.date())] += 1
+    assert max(salles.values()) == 1, "salle réservée deux fois sur un créneau"
+    assert max(profs.values()) == 1, "prof dans deux salles sur un même créneau"
+    assert max(profs_jour.values()) <= MAX_EXAMENS_PROF_JOUR, "limite journalière des profs dépassée"
+
+    # Tous les surveillants à la limite du jour : créneau sauté, salles rendues
+    module_id, slot = calls[0]
+    key = (slot.date(), slot.hour * 60)
+    scheduler.build_indexes()
+    libre = scheduler.rooms.free_capacity(key)
+    load = {(p, slot.date()): MAX_EXAMENS_PROF_JOUR for p in scheduler.prof_ids}
+    assert scheduler.assign_resources(module_id, slot, slot.hour * 60, dict(load)) == [], \
+        "créneau affecté sans surveillant libre"
+    assert scheduler.rooms.free_capacity(key) == libre, "salles non rendues (surveillants saturés)"
+
+    # Un seul surveillant libre pour un module sur plusieurs salles : sa surveillance est
+    # annulée avec le créneau, puis il reste disponible pour un module d'une salle
+    seul = scheduler.prof_ids[0]
+    del load[(seul, slot.date())]
+    scheduler.reset_occupancy()
+    nb_inscrits, dept_id = scheduler.module_index[module_id]
+    scheduler.module_index[module_id] = (sum(scheduler.salle_capacites), dept_id)
+    assert scheduler.assign_resources(module_id, slot, slot.hour * 60, load) == [], \
+        "module sur plusieurs salles affecté avec un seul surveillant"
+    assert load.get((seul, slot.date())) == 0 and (seul, slot.date(), slot.hour * 60) not in load, \
+        "surveillance non annulée"
+    assert scheduler.rooms.free_capacity(key) == libre, "salles non rendues (un seul surveillant)"
+    scheduler.module_index[module_id] = (min(nb_inscrits, 20), dept_id)
+    assert [p for _, p in scheduler.assign_resources(module_id, slot, slot.hour * 60, load)] == [seul], \
+        "surveillant libéré non réutilisé"
+    scheduler.module_index[module_id] = (nb_inscrits, dept_id)
+
+    # Sans aucun professeur : erreur explicite plutôt qu'un planning sans surveillants
+    sans_profs = OfflineScheduler(nb)
+    sans_profs.load_data()
+    sans_profs.profs = sans_profs.profs.iloc[:0]
+    sans_profs.build_indexes()
+    try:
+        sans_profs.plan_exams({m: 0 for m in sans_profs.module_index})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("planning généré sans professeur")
+
+    random.seed(0)
+    legacy = lambda *args: assign_resources_legacy(scheduler, *args)
+    p50_avant = run(legacy, scheduler, calls)[0]
+    p50_apres = run(scheduler.assign_resources, scheduler, calls)[0]
+    assert p50_apres * 10 < p50_avant, f"index précalculés pas plus rapides ({p50_apres:.1f} µs contre {p50_avant:.1f} µs)"
+    print(f"OK : {nb:,} étudiants, {len(calls):,} appels, {sum(map(bool, resultat)):,} modules placés, "
+          f"p50 {p50_avant:.1f} µs -> {p50_apres:.1f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latence de assign_resources avant / après les index")
+    parser.add_argument("--quick", action="store_true", help="contrôle rapide sur un petit campus")
+    if parser.parse_args().quick:
+        quick_check()
+    else:
+        main()
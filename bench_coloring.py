@@ -0,0 +1,104 @@
+import argparse
+import time
+import tracemalloc
+
+import networkx as nx
+
+from bench_data import synthetic_campus
+from coloring import STRATEGIES, NX_STRATEGIES, color_csr
+from conflict_graph import build_conflict_csr, to_networkx
+
+# Le DSATUR de networkx est quadratique : au-delà, seul le moteur CSR est mesuré
+NX_DSATUR_MAX = 50_000
+
+# --quick : petit campus, contrôle en quelques secondes
+QUICK_ETUDIANTS = 2_000
+
+
+def is_proper(graph, colors):
+    """Vérifie qu'aucune arête ne relie deux noeuds de même couleur"""
+    for v in range(len(graph.module_ids)):
+        nbr = graph.indices[graph.indptr[v]:graph.indptr[v + 1]]
+        if (colors[nbr] == colors[v]).any():
+            return False
+    return True
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def memory_of(fn):
+    """Pic mémoire Python (octets) pendant fn()"""
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+
+def campus_graph(nb):
+    modules, inscriptions, _, _ = synthetic_campus(nb)
+    return build_conflict_csr(
+        modules['id'].to_numpy(),
+        inscriptions['etudiant_id'].to_numpy(),
+        inscriptions['module_id'].to_numpy()
+    )
+
+
+def quick_check(nb=QUICK_ETUDIANTS):
+    """Contrôle déterministe sur un petit campus : colorations propres et reproductibles,
+    parité stricte avec networkx pour largest_first"""
+    graph = campus_graph(nb)
+    G = to_networkx(graph)
+    for strategy in STRATEGIES:
+        colors = color_csr(graph.indptr, graph.indices, strategy)
+        assert is_proper(graph, colors), f"coloration invalide ({strategy})"
+        assert (color_csr(graph.indptr, graph.indices, strategy) == colors).all(), \
+            f"coloration non reproductible ({strategy})"
+        if strategy == 'largest_first':
+            nx_coloring = nx.coloring.greedy_color(G, strategy=NX_STRATEGIES[strategy])
+            assert dict(zip(graph.module_ids.tolist(), colors.tolist())) == nx_coloring, \
+                "coloration différente de networkx (largest_first)"
+    print(f"OK : {nb:,} étudiants, {len(graph.module_ids):,} modules, {len(graph.indices) // 2:,} arêtes, "
+          f"{', '.join(STRATEGIES)} propres, largest_first identique à networkx")
+
+
+def main():
+    for nb in (13_000, 50_000, 200_000):
+        graph = campus_graph(nb)
+        G, nx_mem = memory_of(lambda: to_networkx(graph))
+        csr_mem = graph.indptr.nbytes + graph.indices.nbytes + graph.weights.nbytes
+
+        print(f"\n{nb:,} étudiants : {len(graph.module_ids):,} modules, {len(graph.indices) // 2:,} arêtes")
+        print(f"  mémoire graphe : networkx {nx_mem / 1e6:.1f} Mo, CSR {csr_mem / 1e6:.2f} Mo")
+        print(f"  {'stratégie':<14} {'nx (s)':>8} {'CSR (s)':>8} {'couleurs nx':>12} {'couleurs CSR':>13}")
+
+        for strategy in STRATEGIES:
+            if strategy == 'dsatur' and nb > NX_DSATUR_MAX:
+                colors, t_csr = timed(lambda: color_csr(graph.indptr, graph.indices, strategy))
+                assert is_proper(graph, colors), f"coloration invalide ({strategy})"
+                print(f"  {strategy:<14} {'-':>8} {t_csr:>8.3f} {'-':>12} {int(colors.max()) + 1:>13}")
+                continue
+
+            nx_coloring, t_nx = timed(lambda: nx.coloring.greedy_color(G, strategy=NX_STRATEGIES[strategy]))
+            colors, t_csr = timed(lambda: color_csr(graph.indptr, graph.indices, strategy))
+
+            assert is_proper(graph, colors), f"coloration invalide ({strategy})"
+            if strategy == 'largest_first':
+                # Parité stricte avec networkx : même ordre, même couleur par module
+                assert dict(zip(graph.module_ids.tolist(), colors.tolist())) == nx_coloring
+
+            print(f"  {strategy:<14} {t_nx:>8.3f} {t_csr:>8.3f} "
+                  f"{max(nx_coloring.values()) + 1:>12} {int(colors.max()) + 1:>13}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coloration : networkx contre moteur CSR")
+    parser.add_argument("--quick", action="store_true", help="contrôle de parité rapide sur un petit campus")
+    if parser.parse_args().quick:
+        quick_check()
+    else:
+        main()
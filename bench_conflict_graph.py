@@ -0,0 +1,60 @@
+import time
+
+import networkx as nx
+
+from bench_data import synthetic_campus
+from conflict_graph import build_conflict_csr, to_networkx
+
+
+def build_conflict_graph_legacy(modules, inscriptions):
+    """Ancien constructeur : une boucle Python et un add_edge par paire"""
+    G = nx.Graph()
+    G.add_nodes_from(modules['id'].tolist())
+    student_modules = inscriptions.groupby('etudiant_id')['module_id'].apply(list)
+    for mods in student_modules:
+        for i in range(len(mods)):
+            for j in range(i + 1, len(mods)):
+                G.add_edge(mods[i], mods[j])
+    return G
+
+
+def build_conflict_graph_sparse(modules, inscriptions):
+    graph = build_conflict_csr(
+        modules['id'].to_numpy(),
+        inscriptions['etudiant_id'].to_numpy(),
+        inscriptions['module_id'].to_numpy()
+    )
+    return graph, to_networkx(graph)
+
+
+def main():
+    print(f"{'étudiants':>10} {'inscriptions':>13} {'arêtes':>8} {'boucle (s)':>11} {'Aᵀ·A (s)':>9} {'CSR seul (s)':>13} {'gain':>6}")
+    for nb in (13_000, 50_000, 200_000):
+        modules, inscriptions, _, _ = synthetic_campus(nb)
+
+        t0 = time.perf_counter()
+        G_old = build_conflict_graph_legacy(modules, inscriptions)
+        t_old = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        graph, G_new = build_conflict_graph_sparse(modules, inscriptions)
+        t_new = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        build_conflict_csr(
+            modules['id'].to_numpy(),
+            inscriptions['etudiant_id'].to_numpy(),
+            inscriptions['module_id'].to_numpy()
+        )
+        t_csr = time.perf_counter() - t0
+
+        # Même graphe, poids en plus
+        assert set(map(frozenset, G_old.edges())) == set(map(frozenset, G_new.edges()))
+        assert list(G_old.nodes()) == list(G_new.nodes())
+
+        print(f"{nb:>10,} {len(inscriptions):>13,} {G_new.number_of_edges():>8,} "
+              f"{t_old:>11.3f} {t_new:>9.3f} {t_csr:>13.3f} {t_old / t_new:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
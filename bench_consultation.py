@@ -0,0 +1,60 @@
+import random
+import time
+
+from db import get_connection
+from consultation import find_students, find_profs, student_planning, prof_planning
+
+# Objectif de latence par requête de consultation
+OBJECTIF_MS = 10.0
+
+
+def latencies(fn, args_list):
+    """p50 / p95 (ms) de fn(*args) sur la liste d'arguments"""
+    durations = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        durations.append((time.perf_counter() - t0) * 1000)
+    durations.sort()
+    return durations[len(durations) // 2], durations[int(len(durations) * 0.95)]
+
+
+def main():
+    conn = get_connection()
+    cur = conn.cursor()
+    random.seed(0)
+
+    # Échantillons pris via index, sans lire les tables entières
+    cur.execute("SELECT MAX(id) FROM etudiants")
+    max_etudiant = cur.fetchone()[0] or 0
+    cur.execute("SELECT id FROM professeurs ORDER BY random() LIMIT 200")
+    prof_ids = [p for p, in cur.fetchall()]
+    cur.execute("SELECT nom FROM etudiants TABLESAMPLE SYSTEM (1) LIMIT 200")
+    noms = [n for n, in cur.fetchall()]
+    cur.execute("SELECT nom FROM professeurs ORDER BY random() LIMIT 200")
+    noms_profs = [n for n, in cur.fetchall()]
+    cur.close()
+
+    cas = [
+        ("planning étudiant", student_planning, [(conn, random.randint(1, max_etudiant)) for _ in range(500 if max_etudiant else 0)]),
+        ("planning professeur", prof_planning, [(conn, p) for p in prof_ids]),
+        ("recherche étudiant (3 lettres)", find_students, [(conn, n[:3]) for n in noms]),
+        ("recherche étudiant (nom)", find_students, [(conn, n) for n in noms]),
+        ("recherche professeur", find_profs, [(conn, n[:3]) for n in noms_profs]),
+    ]
+
+    print(f"{'requête':<32} {'appels':>7} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    for label, fn, args_list in cas:
+        if not args_list:
+            continue
+        fn(*args_list[0])  # chauffe du cache
+        p50, p95 = latencies(fn, args_list)
+        statut = "✅" if p95 < OBJECTIF_MS else "⚠️"
+        print(f"{label:<32} {len(args_list):>7} {p50:>9.2f} {p95:>9.2f} {statut}")
+
+    conn.rollback()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from scheduler import ExamScheduler, Inscriptions
+
+
+def synthetic_campus(nb_etudiants, seed=42, nb_depts=7, modules_par_etudiant=6, prerequis=0.0):
+    """Génère en mémoire un campus comparable à data.py (sans BDD) pour les benchmarks.
+
+    Retourne (modules, inscriptions, salles, profs) avec les mêmes colonnes que
+    ExamScheduler.load_data. Une fraction prerequis des modules reçoit un prérequis
+    d'id plus petit : pour moitié le module précédent de sa formation, sinon un
+    module quelconque (souvent d'un autre département).
+    """
+    rng = np.random.default_rng(seed)
+    echelle = max(1.0, nb_etudiants / 13250)
+
+    # Formations : 30 par département pour 13k étudiants, proportionnel au-delà
+    nb_formations = int(nb_depts * 30 * echelle)
+    formation_dept = rng.integers(1, nb_depts + 1, nb_formations)
+    nb_modules = rng.integers(6, 10, nb_formations)
+
+    # Modules : ids contigus par formation
+    module_formation = np.repeat(np.arange(nb_formations), nb_modules)
+    module_ids = np.arange(1, len(module_formation) + 1)
+    formation_start = np.concatenate(([0], np.cumsum(nb_modules)[:-1]))
+
+    # Étudiants : une formation chacun, modules_par_etudiant modules tirés sans remise
+    etudiant_formation = rng.integers(0, nb_formations, nb_etudiants)
+    k = nb_modules[etudiant_formation]
+    keys = rng.random((nb_etudiants, 9))
+    keys[np.arange(9)[None, :] >= k[:, None]] = np.inf
+    picks = np.argsort(keys, axis=1)[:, :modules_par_etudiant]
+    picks_valid = np.arange(modules_par_etudiant)[None, :] < k[:, None]
+
+    etudiant_ids = np.repeat(np.arange(1, nb_etudiants + 1), modules_par_etudiant)
+    insc_modules = module_ids[formation_start[etudiant_formation][:, None] + picks].ravel()
+    keep = picks_valid.ravel()
+    inscriptions = pd.DataFrame({
+        'etudiant_id': etudiant_ids[keep],
+        'module_id': insc_modules[keep],
+    })
+
+    nb_inscrits = np.bincount(inscriptions['module_id'], minlength=len(module_ids) + 1)[1:]
+    modules = pd.DataFrame({
+        'id': module_ids,
+        'nom': [f"Module {m}" for m in module_ids],
+        'credits': rng.integers(2, 7, len(module_ids)),
+        'formation_id': module_formation + 1,
+        'dept_id': formation_dept[module_formation],
+        'nb_inscrits': nb_inscrits,
+        'pre_req_id': _prerequisites(module_ids, module_formation, prerequis, seed),
+    }).sort_values('nb_inscrits', ascending=False, kind='stable').reset_index(drop=True)
+
+    # Salles : 60 salles de 20 places et 15 amphis pour 13k étudiants
+    nb_salles, nb_amphis = int(60 * echelle), int(15 * echelle)
+    salles = pd.DataFrame({
+        'id': np.arange(1, nb_salles + nb_amphis + 1),
+        'nom': [f"S{i}" for i in range(nb_salles)] + [f"A{i}" for i in range(nb_amphis)],
+        'capacite': np.concatenate((np.full(nb_salles, 20), rng.integers(100, 301, nb_amphis))),
+        'type': ['salle'] * nb_salles + ['amphi'] * nb_amphis,
+    }).sort_values('capacite', kind='stable').reset_index(drop=True)
+
+    nb_profs = int(120 * echelle)
+    profs = pd.DataFrame({
+        'id': np.arange(1, nb_profs + 1),
+        'nom': [f"Prof {p}" for p in range(nb_profs)],
+        'dept_id': rng.integers(1, nb_depts + 1, nb_profs),
+    })
+
+    return modules, inscriptions, salles, profs
+
+
+def _prerequisites(module_ids, module_formation, fraction, seed):
+    """pre_req_id de chaque module (NaN sans prérequis, comme NULL lu par pandas)"""
+    pre = np.full(len(module_ids), np.nan)
+    if fraction <= 0:
+        return pre
+    # Générateur séparé : le reste du campus ne dépend pas de fraction
+    rng = np.random.default_rng(seed + 1)
+    choisis = np.flatnonzero(rng.random(len(module_ids)) < fraction)
+    choisis = choisis[choisis > 0]
+    precedent = module_formation[choisis - 1] == module_formation[choisis]
+    meme_formation = precedent & (rng.random(len(choisis)) < 0.5)
+    quelconque = rng.integers(0, choisis)
+    pre[choisis] = module_ids[np.where(meme_formation, choisis - 1, quelconque)]
+    return pre
+
+
+class OfflineScheduler(ExamScheduler):
+    """ExamScheduler alimenté par synthetic_campus au lieu de la BDD"""
+
+    def __init__(self, nb_etudiants, seed=42, prerequis=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.nb_etudiants = nb_etudiants
+        self.seed = seed
+        self.prerequis = prerequis
+
+    def load_data(self):
+        self.modules, inscriptions, self.salles, self.profs = synthetic_campus(
+            self.nb_etudiants, self.seed, prerequis=self.prerequis)
+        inscriptions = inscriptions.sort_values(['etudiant_id', 'module_id'])
+        self.inscriptions = Inscriptions(
+            inscriptions['etudiant_id'].to_numpy(np.int32),
+            inscriptions['module_id'].to_numpy(np.int32),
+        )
+        self.build_indexes()
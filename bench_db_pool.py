@@ -0,0 +1,73 @@
+import argparse
+import time
+from contextlib import contextmanager
+
+import psycopg2
+
+from db import LOCAL_DB, create_pool, pooled_connection
+
+# Requêtes d'un chargement de la page d'accueil : test de connexion de main(),
+# puis une connexion par fonction get_* (cache Streamlit expiré)
+PAGE_QUERIES = [
+    "SELECT 1",
+    "SELECT COUNT(*) FROM etudiants",
+    "SELECT COUNT(*) FROM examens",
+    "SELECT d.nom, COUNT(f.id) FROM departements d LEFT JOIN formations f ON f.dept_id = d.id GROUP BY d.nom",
+    "SELECT COUNT(*) FROM student_day_load WHERE nb > 1",
+    "SELECT id, date_heure FROM examens ORDER BY date_heure LIMIT 100",
+]
+
+
+@contextmanager
+def fresh_connection():
+    """Ancien comportement de app.get_connection : connect() puis close() à chaque appel"""
+    conn = psycopg2.connect(**LOCAL_DB)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def page_load(connect):
+    for sql in PAGE_QUERIES:
+        with connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                cur.fetchall()
+
+
+def measure(connect, pages):
+    """Latence par page (ms) : p50, p95"""
+    durations = []
+    for _ in range(pages):
+        t0 = time.perf_counter()
+        page_load(connect)
+        durations.append((time.perf_counter() - t0) * 1000)
+    durations.sort()
+    return durations[len(durations) // 2], durations[int(len(durations) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence d'un chargement de page, avec et sans pool")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--host", default=LOCAL_DB["host"], help="tester une base distante (pooler cloud)")
+    args = parser.parse_args()
+    LOCAL_DB["host"] = args.host
+
+    pool = create_pool(1, 4, **LOCAL_DB)
+    variants = (
+        ("sans pool", fresh_connection),
+        ("pool", lambda: pooled_connection(pool)),
+    )
+
+    print(f"{len(PAGE_QUERIES)} connexions par page, {args.pages} pages")
+    print(f"{'version':<10} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    for label, connect in variants:
+        page_load(connect)  # chauffe (et ouverture du pool)
+        p50, p95 = measure(connect, args.pages)
+        print(f"{label:<10} {p50:>9.1f} {p95:>9.1f}")
+    pool.closeall()
+
+
+if __name__ == "__main__":
+    main()
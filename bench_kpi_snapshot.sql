@@ -0,0 +1,79 @@
+-- Benchmark de kpi_snapshot : 1000 instructions d'une ligne (comme deploy_to_cloud.py
+-- ou les écritures de l'application), puis lecture des KPI du tableau de bord.
+-- Vérifie que la table reste bornée (deltas repliés par replier_kpi) et que les
+-- compteurs restent exacts, puis qu'un chargement sous exam.sans_version ne replie
+-- rien avant compacter_kpi_snapshot.
+--
+-- Usage : psql -U postgres -d exam_scheduler -f bench_kpi_snapshot.sql
+-- Tout tourne dans une transaction annulée à la fin : la base n'est pas modifiée.
+
+\timing on
+
+BEGIN;
+
+SELECT COUNT(*) AS lignes_avant FROM kpi_snapshot;
+
+-- 1000 salles insérées une par une, dont la moitié agrandies puis supprimées
+DO $$
+DECLARE
+    v_id INT;
+BEGIN
+    FOR i IN 1..1000 LOOP
+        INSERT INTO salles (nom, capacite, type, batiment)
+        VALUES ('Bench ' || i, 10, 'salle', 'Bench')
+        RETURNING id INTO v_id;
+        IF i % 2 = 0 THEN
+            UPDATE salles SET capacite = 20 WHERE id = v_id;
+            DELETE FROM salles WHERE id = v_id;
+        END IF;
+    END LOOP;
+END $$;
+
+SELECT COUNT(*) AS lignes_apres FROM kpi_snapshot;
+
+-- Lecture du tableau de bord (get_global_kpis)
+EXPLAIN (ANALYZE, COSTS OFF)
+SELECT cle, SUM(valeur) FROM kpi_snapshot GROUP BY cle;
+
+-- Au plus 31 deltas par indicateur (replier_kpi replie à 32), compteurs exacts
+DO $$
+BEGIN
+    ASSERT (SELECT MAX(n) FROM (SELECT COUNT(*) AS n FROM kpi_snapshot GROUP BY cle) c) < 32,
+        'kpi_snapshot non bornée';
+    ASSERT (SELECT SUM(valeur) FROM kpi_snapshot WHERE cle = 'total_salles')
+        = (SELECT COUNT(*) FROM salles), 'total_salles faux';
+    ASSERT (SELECT SUM(valeur) FROM kpi_snapshot WHERE cle = 'capacite_totale')
+        = (SELECT SUM(capacite) FROM salles), 'capacite_totale faux';
+    RAISE NOTICE 'kpi_snapshot bornée et exacte';
+END $$;
+
+-- Chargement comme un worker de generate_data.py (exam.sans_version = on) :
+-- aucun repli, donc aucun verrou sur les deltas des autres workers ;
+-- compacter_kpi_snapshot rassemble ensuite les deltas
+SET LOCAL exam.sans_version = 'on';
+
+DO $$
+DECLARE
+    v_avant BIGINT := (SELECT COUNT(*) FROM kpi_snapshot WHERE cle = 'total_salles');
+BEGIN
+    FOR i IN 1..40 LOOP
+        INSERT INTO salles (nom, capacite, type, batiment)
+        VALUES ('Bench worker ' || i, 10, 'salle', 'Bench');
+    END LOOP;
+    ASSERT (SELECT COUNT(*) FROM kpi_snapshot WHERE cle = 'total_salles') = v_avant + 40,
+        'deltas repliés sous exam.sans_version';
+END $$;
+
+RESET exam.sans_version;
+CALL compacter_kpi_snapshot();
+
+DO $$
+BEGIN
+    ASSERT (SELECT MAX(n) FROM (SELECT COUNT(*) AS n FROM kpi_snapshot GROUP BY cle) c) = 1,
+        'kpi_snapshot non compactée';
+    ASSERT (SELECT SUM(valeur) FROM kpi_snapshot WHERE cle = 'total_salles')
+        = (SELECT COUNT(*) FROM salles), 'total_salles faux après compactage';
+    RAISE NOTICE 'aucun repli sous exam.sans_version, compactage exact';
+END $$;
+
+ROLLBACK;
@@ -0,0 +1,38 @@
+import time
+
+from bench_coloring import is_proper
+from bench_data import OfflineScheduler
+from coloring import color_csr
+from local_search import improve_coloring
+
+BUDGETS = (0.5, 2.0)
+
+
+def main():
+    for nb in (13_000, 50_000, 200_000):
+        scheduler = OfflineScheduler(nb)
+        scheduler.load_data()
+        graph = scheduler.build_conflict_matrix()
+        module_ids = graph.module_ids.tolist()
+        colors = color_csr(graph.indptr, graph.indices)
+        records, jours = scheduler.plan_exams(dict(zip(module_ids, colors.tolist())))
+
+        print(f"\n{nb:,} étudiants : {len(module_ids):,} modules, glouton {int(colors.max()) + 1} couleurs, "
+              f"{jours} jours, {len(records):,} examens")
+        print(f"  {'budget (s)':>10} {'recherche (s)':>14} {'couleurs':>9} {'charge max':>11} "
+              f"{'jours':>6} {'gagnés':>7}")
+        weights = scheduler.rooms_needed(module_ids)
+        capacity = len(scheduler.salle_ids) * len(scheduler.slots)
+        for budget in BUDGETS:
+            t0 = time.perf_counter()
+            improved, mesures = improve_coloring(graph.indptr, graph.indices, colors, weights, capacity, budget)
+            duree = time.perf_counter() - t0
+            assert is_proper(graph, improved), "coloration invalide après recherche locale"
+
+            _, jours_ls = scheduler.plan_exams(dict(zip(module_ids, improved.tolist())))
+            print(f"  {budget:>10.1f} {duree:>14.3f} {mesures['couleurs']:>9} {mesures['charge_max']:>11.0f} "
+                  f"{jours_ls:>6} {jours - jours_ls:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bench_coloring import is_proper, timed
+from bench_data import OfflineScheduler
+from coloring import color_csr
+from partition import PARTITIONS, partition_nodes, color_partitions, cross_edges, repair, subgraph
+
+PARTS = (2, 4)
+
+# --quick : petit campus, contrôle en quelques secondes
+QUICK_ETUDIANTS = 2_000
+
+
+def color_pool(graph, parts, strategy):
+    """Variante retirée du scheduler : une partition par processus (ProcessPoolExecutor)"""
+    subgraphs = [subgraph(graph, nodes) for nodes in parts]
+    with ProcessPoolExecutor(max_workers=len(parts)) as pool:
+        results = list(pool.map(
+            color_csr, [s[0] for s in subgraphs], [s[1] for s in subgraphs], [strategy] * len(parts)
+        ))
+    colors = np.empty(len(graph.module_ids), dtype=np.int32)
+    for nodes, sub_colors in zip(parts, results):
+        colors[nodes] = sub_colors
+    return repair(graph, colors)
+
+
+def quick_check(nb=QUICK_ETUDIANTS):
+    """Contrôle déterministe de ExamScheduler(partition=...) sur un petit campus :
+    coloration fusionnée propre après réparation, planning sans conflit étudiant.
+
+    Le campus synthétique garde chaque étudiant dans une formation, donc un
+    département : 'melange' redistribue les départements au hasard pour avoir des
+    arêtes transverses à réparer."""
+    rng = np.random.default_rng(0)
+    for by, melange in (('composantes', False), ('departement', False), ('departement', True)):
+        for nb_parts in PARTS:
+            scheduler = OfflineScheduler(nb, partition=by, partition_parts=nb_parts)
+            scheduler.load_data()
+            if melange:
+                scheduler.module_index = {mid: (nb_inscrits, int(rng.integers(1, 8)))
+                                          for mid, (nb_inscrits, _) in scheduler.module_index.items()}
+            graph = scheduler.build_conflict_matrix()
+            coloring, mesures = scheduler.color_partitioned(graph)
+            colors = np.array([coloring[mid] for mid in graph.module_ids.tolist()])
+            assert is_proper(graph, colors), f"coloration fusionnée invalide ({by}, {nb_parts})"
+            assert scheduler.color_partitioned(graph)[0] == coloring, f"coloration non reproductible ({by})"
+            if by == 'composantes':
+                assert mesures['aretes_transverses'] == mesures['repares'] == 0, "arêtes entre composantes"
+            elif melange:
+                assert mesures['repares'] > 0, "aucun module réparé"
+
+            # Même jour pour deux modules voisins : conflit étudiant dans le planning
+            exam_records, _ = scheduler.plan_exams(coloring)
+            jour = {}
+            for module_id, _, _, date_heure, _ in exam_records:
+                jour.setdefault(module_id, date_heure.date())
+            ids = graph.module_ids
+            for v in range(len(ids)):
+                for u in graph.indices[graph.indptr[v]:graph.indptr[v + 1]].tolist():
+                    a, b = jour.get(int(ids[v])), jour.get(int(ids[u]))
+                    assert a is None or a != b, f"conflit étudiant ({by}, {nb_parts})"
+            print(f"OK : {by + (' (mélange)' if melange else ''):<24} {mesures['parties']} parties, {mesures['aretes_transverses']:,} arêtes transverses, "
+                  f"{mesures['repares']} réparés, {len(exam_records):,} examens")
+
+
+def main():
+    for nb in (13_000, 50_000, 200_000):
+        scheduler = OfflineScheduler(nb)
+        scheduler.load_data()
+        graph = scheduler.build_conflict_matrix()
+        depts = [scheduler.module_index[mid][1] for mid in graph.module_ids.tolist()]
+
+        print(f"\n{nb:,} étudiants : {len(graph.module_ids):,} modules, {len(graph.indices) // 2:,} arêtes")
+        print(f"  {'stratégie':<14} {'partition':<12} {'parts':>6} {'transv.':>8} "
+              f"{'réparés':>8} {'couleurs':>9} {'séq. (s)':>9} {'pool (s)':>9}")
+        for strategy in ('largest_first', 'dsatur'):
+            seq, t_seq = timed(lambda: color_csr(graph.indptr, graph.indices, strategy))
+            print(f"  {strategy:<14} {'-':<12} {1:>6} {0:>8} {0:>8} {int(seq.max()) + 1:>9} "
+                  f"{t_seq:>9.3f} {'-':>9}")
+            for by in PARTITIONS:
+                for nb_parts in PARTS:
+                    t0 = time.perf_counter()
+                    parts = partition_nodes(graph, depts, nb_parts, by)
+                    colors, repares = color_partitions(graph, parts, strategy)
+                    duree = time.perf_counter() - t0
+
+                    t0 = time.perf_counter()
+                    pool_colors, _ = color_pool(graph, partition_nodes(graph, depts, nb_parts, by), strategy)
+                    duree_pool = time.perf_counter() - t0
+
+                    assert is_proper(graph, colors), f"coloration invalide ({strategy}, {by})"
+                    assert (pool_colors == colors).all(), f"pool différent du séquentiel ({strategy}, {by})"
+                    if by == 'composantes':
+                        # Composantes indépendantes : mêmes couleurs qu'en séquentiel
+                        assert (colors == seq).all(), f"coloration différente du séquentiel ({strategy})"
+                    print(f"  {strategy:<14} {by:<12} {len(parts):>6} {cross_edges(graph, parts):>8} "
+                          f"{repares:>8} {int(colors.max()) + 1:>9} {duree:>9.3f} {duree_pool:>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coloration du graphe entier vs par partition")
+    parser.add_argument("--quick", action="store_true", help="contrôle rapide de la coloration par partition")
+    if parser.parse_args().quick:
+        quick_check()
+    else:
+        main()
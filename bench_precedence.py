@@ -0,0 +1,37 @@
+from bench_coloring import is_proper, timed
+from bench_data import OfflineScheduler
+from coloring import color_csr, precedence_color
+
+# Part des modules ayant un prérequis
+PREREQUIS = 0.3
+
+
+def main():
+    for nb in (13_000, 50_000, 200_000):
+        scheduler = OfflineScheduler(nb, prerequis=PREREQUIS)
+        scheduler.load_data()
+        graph = scheduler.build_conflict_matrix()
+        module_ids = graph.module_ids.tolist()
+        prereq = scheduler._prereq_positions(module_ids)
+        a_prereq = prereq >= 0
+
+        print(f"\n{nb:,} étudiants : {len(module_ids):,} modules, {len(graph.indices) // 2:,} arêtes, "
+              f"{int(a_prereq.sum()):,} prérequis")
+        print(f"  {'coloration':<26} {'temps (s)':>10} {'ratio':>6} {'couleurs':>9} {'prérequis violés':>17}")
+        greedy, t_greedy = timed(lambda: color_csr(graph.indptr, graph.indices))
+        variantes = (
+            ("glouton (sans prérequis)", greedy, t_greedy),
+            ("précédence", *timed(lambda: precedence_color(graph.indptr, graph.indices, prereq))),
+            ("précédence smallest_last",
+             *timed(lambda: precedence_color(graph.indptr, graph.indices, prereq, 'smallest_last'))),
+        )
+        for label, colors, duree in variantes:
+            assert is_proper(graph, colors), f"coloration invalide ({label})"
+            violes = int((colors[prereq[a_prereq]] >= colors[a_prereq]).sum())
+            if label != variantes[0][0]:
+                assert violes == 0, f"prérequis après un dépendant ({label})"
+            print(f"  {label:<26} {duree:>10.3f} {duree / t_greedy:>5.1f}x {int(colors.max()) + 1:>9} {violes:>17}")
+
+
+if __name__ == "__main__":
+    main()
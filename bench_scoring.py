@@ -0,0 +1,99 @@
+import random
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from bench_data import OfflineScheduler
+from coloring import greedy_color
+from scoring import PENALITES_ECART, plan_arrays
+
+APPELS = 200
+# Déplacements (module -> jour) évalués par move_delta, dont un sur DEPLACEMENTS_APPLIQUES appliqué
+DEPLACEMENTS = 2000
+DEPLACEMENTS_APPLIQUES = 10
+
+
+def reference(scheduler, exam_records):
+    """Mêmes composantes en Python pur, pour la parité"""
+    origine = scheduler.start_date.toordinal()
+    jour = {m: d.toordinal() - origine for m, _, _, d, _ in exam_records}
+    jours_etudiant = defaultdict(list)
+    for e, m in zip(scheduler.inscriptions.etudiant_ids.tolist(), scheduler.inscriptions.module_ids.tolist()):
+        jours_etudiant[e].append(jour[m])
+    penalite = 0.0
+    for jours in jours_etudiant.values():
+        jours.sort()
+        for a, b in zip(jours, jours[1:]):
+            penalite += PENALITES_ECART[b - a] if b - a < len(PENALITES_ECART) else 0.0
+
+    charge = Counter(p for _, p, _, _, _ in exam_records)
+    charges = np.array([charge.get(p, 0) for p in scheduler.prof_ids], dtype=np.float64)
+
+    capacite = dict(zip(scheduler.salle_ids, scheduler.salle_capacites))
+    places = defaultdict(int)
+    for m, _, s, _, _ in exam_records:
+        places[m] += capacite[s]
+    remplissage = np.mean([min(scheduler.module_index[m][0], p) / p for m, p in places.items()])
+    return {
+        'ecarts': penalite / len(jours_etudiant),
+        'variance_profs': charges.var() / charges.mean() ** 2,
+        'remplissage': 1.0 - remplissage,
+    }
+
+
+def main():
+    for nb in (13_000, 50_000, 200_000):
+        scheduler = OfflineScheduler(nb)
+        scheduler.load_data()
+        exam_records, _ = scheduler.plan_exams(greedy_color(scheduler.build_conflict_matrix()))
+
+        t0 = time.perf_counter()
+        score = scheduler.score_plan(exam_records)
+        t_init = time.perf_counter() - t0
+        arrays = plan_arrays(exam_records, scheduler.start_date)
+
+        t0 = time.perf_counter()
+        for _ in range(APPELS):
+            scheduler._scorer.score(*arrays)
+        t_score = (time.perf_counter() - t0) / APPELS
+
+        t0 = time.perf_counter()
+        ref = reference(scheduler, exam_records)
+        t_ref = time.perf_counter() - t0
+        for k, v in ref.items():
+            assert abs(score[k] - v) < 1e-6, f"{k} : {score[k]} != {v}"
+
+        # Déplacements d'un module vers un autre jour : move_delta contre score() complet
+        scorer = scheduler._scorer
+        modules, jours, creneaux, salles, profs = arrays
+        scorer.start(*arrays)
+        rng = random.Random(0)
+        ids = np.unique(modules).tolist()
+        nb_jours = int(jours.max()) + 1
+        deplacements = [(rng.choice(ids), rng.randrange(nb_jours)) for _ in range(DEPLACEMENTS)]
+        t0 = time.perf_counter()
+        for module_id, jour in deplacements:
+            scorer.move_delta(module_id, jour)
+        t_delta = (time.perf_counter() - t0) / DEPLACEMENTS
+        jours = jours.copy()
+        for module_id, jour in deplacements[:50]:
+            attendu = jours.copy()
+            attendu[modules == module_id] = jour
+            total = scorer.score(modules, attendu, creneaux, salles, profs)['total']
+            assert abs(scorer.total + scorer.move_delta(module_id, jour) - total) < 1e-4, \
+                f"move_delta ({module_id} -> {jour}) != score()"
+            if rng.randrange(DEPLACEMENTS_APPLIQUES) == 0:
+                scorer.apply_move(module_id, jour)
+                jours = attendu
+
+        print(f"\n{nb:,} étudiants, {len(exam_records):,} examens")
+        print(f"  index + premier score {t_init * 1000:8.1f} ms")
+        print(f"  score()               {t_score * 1000:8.2f} ms  ({1 / t_score:,.0f} évaluations/s)")
+        print(f"  move_delta()          {t_delta * 1000:8.3f} ms  ({1 / t_delta:,.0f} évaluations/s)")
+        print(f"  référence Python      {t_ref * 1000:8.1f} ms")
+        print("  " + "  ".join(f"{k}={v}" for k, v in score.items()))
+
+
+if __name__ == "__main__":
+    main()
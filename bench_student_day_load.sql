@@ -0,0 +1,67 @@
+-- Benchmark de student_day_load : coût de maintenance par lot, recalcul complet
+-- et requête de conflits du tableau de bord (avant / après).
+--
+-- Prérequis : un planning dans examens (python scheduler.py).
+-- Usage : psql -U postgres -d exam_scheduler -f bench_student_day_load.sql
+-- Tout tourne dans une transaction annulée à la fin : la base n'est pas modifiée.
+
+\timing on
+
+BEGIN;
+
+CREATE TEMP TABLE lot AS
+SELECT module_id, prof_id, salle_id, date_heure, duree_minutes FROM examens;
+
+SELECT (SELECT COUNT(*) FROM lot) AS examens,
+       (SELECT COUNT(*) FROM inscriptions) AS inscriptions,
+       (SELECT COUNT(*) FROM student_day_load) AS lignes_charge;
+
+-- ===== Recalcul complet =====
+CALL refresh_student_day_load();
+
+-- ===== Maintenance incrémentale (temps des triggers dans les plans) =====
+
+-- Planning complet inséré en un lot
+TRUNCATE examens;
+EXPLAIN (ANALYZE, COSTS OFF)
+INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes)
+SELECT module_id, prof_id, salle_id, date_heure, duree_minutes FROM lot;
+
+-- Mise à jour d'un examen sans changement de jour (aucun delta)
+EXPLAIN (ANALYZE, COSTS OFF)
+UPDATE examens SET salle_id = salle_id
+WHERE id = (SELECT MIN(id) FROM examens);
+
+-- Suppression des examens d'un jour
+EXPLAIN (ANALYZE, COSTS OFF)
+DELETE FROM examens
+WHERE DATE(date_heure) = (SELECT MIN(DATE(date_heure)) FROM examens);
+
+-- 1000 inscriptions retirées puis réinsérées
+CREATE TEMP TABLE insc_lot AS
+SELECT etudiant_id, module_id, note FROM inscriptions LIMIT 1000;
+
+EXPLAIN (ANALYZE, COSTS OFF)
+DELETE FROM inscriptions i
+USING insc_lot l
+WHERE i.etudiant_id = l.etudiant_id AND i.module_id = l.module_id;
+
+EXPLAIN (ANALYZE, COSTS OFF)
+INSERT INTO inscriptions SELECT * FROM insc_lot;
+
+-- ===== Requête de conflits du tableau de bord =====
+
+-- Avant : jointure complète étudiants x inscriptions x examens
+EXPLAIN (ANALYZE, COSTS OFF)
+SELECT COUNT(DISTINCT e.id)
+FROM etudiants e
+JOIN inscriptions i ON i.etudiant_id = e.id
+JOIN examens ex ON ex.module_id = i.module_id
+GROUP BY e.id, DATE(ex.date_heure)
+HAVING COUNT(*) > 1;
+
+-- Après : lookup sur l'index partiel
+EXPLAIN (ANALYZE, COSTS OFF)
+SELECT COUNT(*) FROM student_day_load WHERE nb > 1;
+
+ROLLBACK;
@@ -0,0 +1,164 @@
+-- Benchmark du trigger check_exam_etudiant : coût par lot, ancien (FOR EACH ROW)
+-- contre nouveau (FOR EACH STATEMENT + transition table, conflits contrôlés par
+-- trg_conflit_etudiant), puis échange de deux jours comme le fait reschedule.
+--
+-- Prérequis : un planning valide dans examens (python scheduler.py).
+-- Usage : psql -U postgres -d exam_scheduler -f bench_trigger.sql
+-- Tout tourne dans une transaction annulée à la fin : la base n'est pas modifiée.
+-- Lire les lignes "Trigger trg_exam_etudiant...: time=... calls=..." des plans.
+-- trg_conflit_etudiant est différé au COMMIT : il est rendu immédiat ici pour
+-- que son coût apparaisse dans les mesures.
+
+\timing on
+
+BEGIN;
+
+-- Le planning actuel sert de lot réaliste (sans conflit)
+CREATE TEMP TABLE lot AS
+SELECT row_number() OVER (ORDER BY date_heure, id) AS rn,
+       module_id, prof_id, salle_id, date_heure, duree_minutes
+FROM examens;
+
+SELECT COUNT(*) AS taille_lot,
+       (SELECT COUNT(*) FROM inscriptions) AS inscriptions
+FROM lot;
+
+-- ===== Nouveau trigger : un contrôle ensembliste par instruction =====
+
+SET CONSTRAINTS trg_conflit_etudiant IMMEDIATE;
+
+TRUNCATE examens;
+EXPLAIN (ANALYZE, COSTS OFF)
+INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes)
+SELECT module_id, prof_id, salle_id, date_heure, duree_minutes FROM lot WHERE rn <= 100;
+
+TRUNCATE examens;
+EXPLAIN (ANALYZE, COSTS OFF)
+INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes)
+SELECT module_id, prof_id, salle_id, date_heure, duree_minutes FROM lot WHERE rn <= 1000;
+
+TRUNCATE examens;
+EXPLAIN (ANALYZE, COSTS OFF)
+INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes)
+SELECT module_id, prof_id, salle_id, date_heure, duree_minutes FROM lot;
+
+-- Ligne en conflit rejetée seule, comme dans examens.py (contrôle immédiat +
+-- sous-transaction) : les examens déjà chargés restent
+DO $$
+DECLARE
+    v_avant BIGINT;
+    v_rejetee BOOLEAN := FALSE;
+    v_module INT;
+    v_date TIMESTAMP;
+BEGIN
+    -- Un module B partageant un étudiant avec le module d'un examen, placé ailleurs
+    SELECT i2.module_id, e.date_heure INTO v_module, v_date
+    FROM examens e
+    JOIN inscriptions i1 ON i1.module_id = e.module_id
+    JOIN inscriptions i2 ON i2.etudiant_id = i1.etudiant_id AND i2.module_id <> e.module_id
+    WHERE NOT EXISTS (SELECT 1 FROM examens b
+                      WHERE b.module_id = i2.module_id AND DATE(b.date_heure) = DATE(e.date_heure))
+    LIMIT 1;
+    SELECT COUNT(*) INTO v_avant FROM examens;
+    BEGIN
+        -- Prof sans examen ce jour-là : seul le trigger étudiant peut rejeter la ligne
+        INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes)
+        SELECT v_module, p.id, (SELECT MIN(id) FROM salles), v_date, 90
+        FROM professeurs p
+        WHERE NOT EXISTS (SELECT 1 FROM examens x
+                          WHERE x.prof_id = p.id AND DATE(x.date_heure) = DATE(v_date))
+        LIMIT 1;
+    EXCEPTION WHEN raise_exception THEN
+        v_rejetee := SQLERRM = 'Conflit étudiant';
+    END;
+    ASSERT v_rejetee, 'ligne en conflit acceptée';
+    ASSERT (SELECT COUNT(*) FROM examens) = v_avant, 'examens perdus après le rejet';
+    RAISE NOTICE 'conflit rejeté, % examens conservés', v_avant;
+END $$;
+
+-- ===== Échange de deux jours (reschedule) =====
+-- Les examens du premier jour passent au deuxième et inversement : le planning
+-- final est sans conflit, mais pas l'état après un seul des deux déplacements.
+
+SET CONSTRAINTS trg_conflit_etudiant DEFERRED;
+
+CREATE TEMP TABLE echange AS
+SELECT e.id,
+       DATE(e.date_heure) = j.j1 AS premier,
+       e.date_heure + CASE WHEN DATE(e.date_heure) = j.j1 THEN 1 ELSE -1 END
+                      * (j.j2 - j.j1) * INTERVAL '1 day' AS nouvelle
+FROM examens e,
+     (SELECT MIN(jour) AS j1, MAX(jour) AS j2
+      FROM (SELECT DISTINCT DATE(date_heure) AS jour FROM examens ORDER BY 1 LIMIT 2) d) j
+WHERE DATE(e.date_heure) IN (j.j1, j.j2);
+
+SELECT COUNT(*) AS examens_deplaces FROM echange;
+
+SAVEPOINT avant_echange;
+
+-- En une instruction (UPDATE ... FROM, comme plan_changes)
+EXPLAIN (ANALYZE, COSTS OFF)
+UPDATE examens e SET date_heure = x.nouvelle FROM echange x WHERE e.id = x.id;
+-- Exécute le contrôle différé (ce que ferait le COMMIT)
+SET CONSTRAINTS trg_conflit_etudiant IMMEDIATE;
+SET CONSTRAINTS trg_conflit_etudiant DEFERRED;
+
+ROLLBACK TO SAVEPOINT avant_echange;
+
+-- En deux instructions : conflits transitoires après la première, acceptés car
+-- le contrôle relit student_day_load en fin de transaction
+EXPLAIN (ANALYZE, COSTS OFF)
+UPDATE examens e SET date_heure = x.nouvelle FROM echange x WHERE e.id = x.id AND x.premier;
+EXPLAIN (ANALYZE, COSTS OFF)
+UPDATE examens e SET date_heure = x.nouvelle FROM echange x WHERE e.id = x.id AND NOT x.premier;
+SET CONSTRAINTS trg_conflit_etudiant IMMEDIATE;
+SET CONSTRAINTS trg_conflit_etudiant DEFERRED;
+
+ROLLBACK TO SAVEPOINT avant_echange;
+
+-- ===== Ancien trigger : une sous-requête IN (...) par ligne =====
+
+DROP TRIGGER trg_exam_etudiant ON examens;
+DROP TRIGGER trg_exam_etudiant_maj ON examens;
+
+CREATE FUNCTION check_exam_etudiant_ligne()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM inscriptions i
+        JOIN examens e ON e.module_id = i.module_id
+        WHERE i.etudiant_id IN (
+            SELECT etudiant_id
+            FROM inscriptions
+            WHERE module_id = NEW.module_id
+        )
+        AND DATE(e.date_heure) = DATE(NEW.date_heure)
+        AND e.module_id <> NEW.module_id
+    ) THEN
+        RAISE EXCEPTION 'Conflit étudiant';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_exam_etudiant
+BEFORE INSERT ON examens
+FOR EACH ROW EXECUTE FUNCTION check_exam_etudiant_ligne();
+
+TRUNCATE examens;
+EXPLAIN (ANALYZE, COSTS OFF)
+INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes)
+SELECT module_id, prof_id, salle_id, date_heure, duree_minutes FROM lot WHERE rn <= 100;
+
+TRUNCATE examens;
+EXPLAIN (ANALYZE, COSTS OFF)
+INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes)
+SELECT module_id, prof_id, salle_id, date_heure, duree_minutes FROM lot WHERE rn <= 1000;
+
+TRUNCATE examens;
+EXPLAIN (ANALYZE, COSTS OFF)
+INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes)
+SELECT module_id, prof_id, salle_id, date_heure, duree_minutes FROM lot;
+
+ROLLBACK;
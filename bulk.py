@@ -0,0 +1,94 @@
+import csv
+import io
+import time
+
+# Nombre de lignes par COPY : borne la mémoire du buffer
+CHUNK_SIZE = 50000
+
+
+def _flush(cur, table, columns, buf):
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def copy_rows(cur, table, columns, rows, chunk_size=CHUNK_SIZE):
+    """Charge rows (itérable de tuples) dans table via COPY ... FROM STDIN.
+
+    Les lignes sont écrites en CSV dans un buffer mémoire vidé tous les chunk_size
+    lignes. None devient NULL. Retourne le nombre de lignes chargées.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator='\n')
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % chunk_size == 0:
+            _flush(cur, table, columns, buf)
+            buf = io.StringIO()
+            writer = csv.writer(buf, lineterminator='\n')
+    if buf.tell():
+        _flush(cur, table, columns, buf)
+    return count
+
+
+def report_throughput(label, count, start_time):
+    """Affiche le temps écoulé et le débit depuis start_time"""
+    execution_time = time.time() - start_time
+    print(f"✅ {count:,} {label} insérés en {execution_time:.2f} secondes "
+          f"({count / execution_time if execution_time > 0 else 0:,.0f} lignes/seconde)")
+    return execution_time
+
+
+# En-tête et fin du format binaire de COPY
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + b"\x00\x00\x00\x00" + b"\x00\x00\x00\x00"
+_PGCOPY_TRAILER = b"\xff\xff"
+
+
+def copy_int_columns(cur, table, columns, arrays):
+    """Charge des colonnes entières (tableaux NumPy de même longueur) en un seul COPY binaire.
+
+    Les tuples sont construits d'un bloc dans un tableau structuré big-endian :
+    aucune boucle Python par ligne.
+    """
+    import numpy as np
+
+    n = len(arrays[0])
+    fields = [('nb', '>i2')]
+    for k in range(len(columns)):
+        fields += [(f'len{k}', '>i4'), (f'val{k}', '>i4')]
+    rows = np.empty(n, dtype=fields)
+    rows['nb'] = len(columns)
+    for k, values in enumerate(arrays):
+        rows[f'len{k}'] = 4
+        rows[f'val{k}'] = values
+
+    buf = io.BytesIO(_PGCOPY_HEADER + rows.tobytes() + _PGCOPY_TRAILER)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary)", buf)
+    return n
+
+
+def read_int_columns(cur, query, ncols):
+    """Exécute COPY (query) TO STDOUT en binaire ; query doit rendre ncols colonnes
+    entières non NULL. Retourne une liste de ncols tableaux NumPy int32.
+
+    Le flux est lu d'un bloc dans un buffer puis découpé par un dtype structuré,
+    sans objet Python par ligne : appeler par tranches pour borner la mémoire.
+    """
+    import numpy as np
+
+    fields = [('nb', '>i2')]
+    for k in range(ncols):
+        fields += [(f'len{k}', '>i4'), (f'val{k}', '>i4')]
+
+    buf = io.BytesIO()
+    cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT binary)", buf)
+    data = buf.getbuffer()
+    # En-tête : signature (11 octets), drapeaux (4), longueur d'extension (4) + extension
+    debut = 19 + int.from_bytes(data[15:19], 'big')
+    rows = np.frombuffer(data[debut:len(data) - len(_PGCOPY_TRAILER)], dtype=fields)
+    if len(rows) and ((rows['nb'] != ncols).any() or any((rows[f'len{k}'] != 4).any() for k in range(ncols))):
+        raise ValueError("COPY binaire : colonnes attendues int4 non NULL")
+    columns = [rows[f'val{k}'].astype(np.int32) for k in range(ncols)]
+    del rows, data
+    return columns
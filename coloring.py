@@ -0,0 +1,175 @@
+import heapq
+
+import numpy as np
+import networkx as nx
+
+STRATEGIES = ('largest_first', 'dsatur', 'smallest_last')
+# Ordres statiques, seuls compatibles avec la coloration par niveaux (precedence_color)
+PRECEDENCE_STRATEGIES = ('largest_first', 'smallest_last')
+
+# Équivalents networkx pour le moteur de référence
+NX_STRATEGIES = {
+    'largest_first': 'largest_first',
+    'dsatur': 'saturation_largest_first',
+    'smallest_last': 'smallest_last',
+}
+
+
+def _greedy_in_order(indptr, indices, order):
+    """Coloration gloutonne : chaque noeud prend la plus petite couleur libre"""
+    ptr = indptr.tolist()
+    idx = indices.tolist()
+    colors = [-1] * (len(ptr) - 1)
+    for v in order:
+        used = {colors[u] for u in idx[ptr[v]:ptr[v + 1]]}
+        c = 0
+        while c in used:
+            c += 1
+        colors[v] = c
+    return np.asarray(colors, dtype=np.int32)
+
+
+def _largest_first_order(indptr):
+    # Tri stable : à degré égal, l'ordre des noeuds est conservé (comme networkx)
+    return np.argsort(-np.diff(indptr), kind='stable').tolist()
+
+
+def _smallest_last_order(indptr, indices):
+    """Retire itérativement le noeud de plus petit degré ; ordre inversé"""
+    n = len(indptr) - 1
+    deg = np.diff(indptr).tolist()
+    ptr = indptr.tolist()
+    idx = indices.tolist()
+    buckets = [set() for _ in range(max(deg, default=0) + 1)]
+    for v, d in enumerate(deg):
+        buckets[d].add(v)
+
+    removed = [False] * n
+    order = []
+    min_deg = 0
+    for _ in range(n):
+        while not buckets[min_deg]:
+            min_deg += 1
+        v = buckets[min_deg].pop()
+        removed[v] = True
+        order.append(v)
+        for u in idx[ptr[v]:ptr[v + 1]]:
+            if not removed[u]:
+                buckets[deg[u]].discard(u)
+                deg[u] -= 1
+                buckets[deg[u]].add(u)
+        min_deg = max(0, min_deg - 1)
+    order.reverse()
+    return order
+
+
+def _dsatur(indptr, indices):
+    """DSATUR : on colore d'abord le noeud au plus grand nombre de couleurs voisines distinctes"""
+    n = len(indptr) - 1
+    ptr = indptr.tolist()
+    idx = indices.tolist()
+    deg = np.diff(indptr).tolist()
+    colors = [-1] * n
+    nbr_colors = [set() for _ in range(n)]
+
+    # Tas (-saturation, -degré, noeud) avec suppression paresseuse
+    heap = [(0, -d, v) for v, d in enumerate(deg)]
+    heapq.heapify(heap)
+    while heap:
+        neg_sat, _, v = heapq.heappop(heap)
+        if colors[v] >= 0 or -neg_sat != len(nbr_colors[v]):
+            continue
+        used = nbr_colors[v]
+        c = 0
+        while c in used:
+            c += 1
+        colors[v] = c
+        for u in idx[ptr[v]:ptr[v + 1]]:
+            if colors[u] < 0 and c not in nbr_colors[u]:
+                nbr_colors[u].add(c)
+                heapq.heappush(heap, (-len(nbr_colors[u]), -deg[u], u))
+    return np.asarray(colors, dtype=np.int32)
+
+
+def color_csr(indptr, indices, strategy='largest_first'):
+    """Colore un graphe donné en CSR (indptr/indices int32), retourne une couleur par noeud"""
+    if strategy == 'largest_first':
+        return _greedy_in_order(indptr, indices, _largest_first_order(indptr))
+    if strategy == 'smallest_last':
+        return _greedy_in_order(indptr, indices, _smallest_last_order(indptr, indices))
+    if strategy == 'dsatur':
+        return _dsatur(indptr, indices)
+    raise ValueError(f"Stratégie de coloration inconnue : {strategy} (attendu : {', '.join(STRATEGIES)})")
+
+
+def greedy_color(graph, strategy='largest_first', engine='native'):
+    """Colore un ConflictGraph et retourne {module_id: couleur} comme nx.coloring.greedy_color"""
+    if engine == 'networkx':
+        from conflict_graph import to_networkx
+        return nx.coloring.greedy_color(to_networkx(graph), strategy=NX_STRATEGIES[strategy])
+    if engine != 'native':
+        raise ValueError(f"Moteur de coloration inconnu : {engine}")
+    colors = color_csr(graph.indptr, graph.indices, strategy)
+    return dict(zip(graph.module_ids.tolist(), colors.tolist()))
+
+
+def precedence_levels(prereq):
+    """Niveau topologique de chaque noeud : 0 sans prérequis, sinon niveau du prérequis + 1.
+
+    prereq[v] est la position du prérequis de v, ou -1. Parcours en largeur depuis
+    les noeuds sans prérequis, un niveau à la fois ; ValueError si des prérequis
+    forment un cycle.
+    """
+    prereq = np.asarray(prereq, dtype=np.int64)
+    n = len(prereq)
+    # Enfants de chaque noeud en CSR (un seul prérequis par noeud)
+    enfants = np.argsort(prereq, kind='stable')
+    enfants = enfants[prereq[enfants] >= 0]
+    debut = np.searchsorted(prereq[enfants], np.arange(n + 1))
+
+    levels = np.full(n, -1, dtype=np.int32)
+    frontier = np.flatnonzero(prereq < 0)
+    level = 0
+    while len(frontier):
+        levels[frontier] = level
+        nb = debut[frontier + 1] - debut[frontier]
+        offsets = np.arange(nb.sum()) - np.repeat(np.cumsum(nb) - nb, nb)
+        frontier = enfants[np.repeat(debut[frontier], nb) + offsets]
+        level += 1
+    if (levels < 0).any():
+        raise ValueError(f"Prérequis circulaires entre les noeuds {np.flatnonzero(levels < 0).tolist()[:10]}")
+    return levels
+
+
+def precedence_color(indptr, indices, prereq, strategy='largest_first'):
+    """Coloration gloutonne où chaque noeud a une couleur plus grande que celle de son prérequis.
+
+    Les couleurs sont des indices de temps (jours) : les noeuds sont colorés par
+    niveau topologique (precedence_levels), dans l'ordre de la stratégie à
+    l'intérieur d'un niveau, et chacun prend la plus petite couleur libre au-delà
+    de celle de son prérequis. Seuls les ordres statiques (PRECEDENCE_STRATEGIES)
+    sont acceptés : l'ordre de DSATUR dépend des couleurs déjà posées.
+    """
+    levels = precedence_levels(prereq)
+    if strategy == 'smallest_last':
+        base = _smallest_last_order(indptr, indices)
+    elif strategy == 'largest_first':
+        base = _largest_first_order(indptr)
+    else:
+        raise ValueError(f"Stratégie non prise en charge avec prérequis : {strategy} "
+                         f"(attendu : {', '.join(PRECEDENCE_STRATEGIES)})")
+    rank = np.empty(len(levels), dtype=np.int64)
+    rank[base] = np.arange(len(levels))
+    order = np.lexsort((rank, levels)).tolist()
+
+    ptr = indptr.tolist()
+    idx = indices.tolist()
+    pre = np.asarray(prereq).tolist()
+    colors = [-1] * len(pre)
+    for v in order:
+        used = {colors[u] for u in idx[ptr[v]:ptr[v + 1]]}
+        c = colors[pre[v]] + 1 if pre[v] >= 0 else 0
+        while c in used:
+            c += 1
+        colors[v] = c
+    return np.asarray(colors, dtype=np.int32)
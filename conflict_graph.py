@@ -0,0 +1,79 @@
+from collections import namedtuple
+
+import numpy as np
+import scipy.sparse as sp
+import networkx as nx
+
+# Graphe de conflits en CSR : les noeuds sont les positions dans module_ids,
+# weights[k] = nombre d'étudiants communs entre le noeud et indices[k]
+ConflictGraph = namedtuple("ConflictGraph", ["module_ids", "indptr", "indices", "weights"])
+
+
+def build_conflict_csr(module_ids, etudiant_ids, insc_module_ids):
+    """Construit la matrice de co-inscription module x module (Aᵀ·A) en une seule passe.
+
+    A est la matrice d'incidence creuse étudiant x module. Le résultat garde
+    l'ordre des noeuds de module_ids ; les inscriptions vers un module inconnu
+    sont ignorées.
+    """
+    module_ids = np.asarray(module_ids, dtype=np.int64)
+    # Entiers gardés tels quels (int32 depuis load_inscriptions) : pas de copie en int64
+    etudiant_ids = np.asarray(etudiant_ids)
+    insc_module_ids = np.asarray(insc_module_ids)
+    n = len(module_ids)
+
+    # Position de chaque module d'inscription dans module_ids
+    order = np.argsort(module_ids, kind="stable")
+    sorted_ids = module_ids[order]
+    pos = np.searchsorted(sorted_ids, insc_module_ids)
+    pos_ok = np.minimum(pos, max(n - 1, 0))
+    valid = (pos < n) & (sorted_ids[pos_ok] == insc_module_ids) if n else np.zeros(len(pos), dtype=bool)
+    cols = order[pos[valid]]
+
+    # Lignes compactes : un numéro par étudiant. Entrée déjà triée par étudiant
+    # (load_inscriptions) : les lignes se lisent d'une passe et A se construit
+    # directement en CSR, sans tri ni copie COO
+    etudiants = etudiant_ids[valid]
+    if len(etudiants) and (etudiants[1:] >= etudiants[:-1]).all():
+        debut_ligne = np.flatnonzero(np.concatenate(([True], etudiants[1:] != etudiants[:-1])))
+        indptr = np.append(debut_ligne, len(etudiants)).astype(np.int32)
+        A = sp.csr_matrix(
+            (np.ones(len(cols), dtype=np.int32), cols.astype(np.int32), indptr),
+            shape=(len(debut_ligne), n),
+        )
+    else:
+        _, rows = np.unique(etudiants, return_inverse=True)
+        nb_etudiants = int(rows.max()) + 1 if len(rows) else 0
+        A = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(nb_etudiants, n),
+        )
+    C = (A.T @ A).tocoo()
+
+    # Retirer la diagonale (nb d'inscrits du module lui-même)
+    off_diag = C.row != C.col
+    C = sp.csr_matrix((C.data[off_diag], (C.row[off_diag], C.col[off_diag])), shape=(n, n))
+    C.sort_indices()
+
+    return ConflictGraph(
+        module_ids,
+        C.indptr.astype(np.int32),
+        C.indices.astype(np.int32),
+        C.data.astype(np.int32),
+    )
+
+
+def to_networkx(graph):
+    """Convertit un ConflictGraph en nx.Graph pondéré (attribut 'weight')"""
+    G = nx.Graph()
+    ids = graph.module_ids.tolist()
+    G.add_nodes_from(ids)
+
+    rows = np.repeat(np.arange(len(ids), dtype=np.int32), np.diff(graph.indptr))
+    upper = rows < graph.indices
+    G.add_weighted_edges_from(zip(
+        graph.module_ids[rows[upper]].tolist(),
+        graph.module_ids[graph.indices[upper]].tolist(),
+        graph.weights[upper].tolist(),
+    ))
+    return G
@@ -0,0 +1,89 @@
+import pandas as pd
+
+# Résultats affichés par la recherche
+LIMITE_RECHERCHE = 20
+
+PLANNING_COLONNES = ["date_heure", "duree_minutes", "module", "salles", "batiment"]
+
+
+def _fetch_df(conn, sql, params, columns):
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    cur.close()
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _prefixe(texte):
+    """Motif LIKE 'texte%' en minuscules, avec les jokers de l'utilisateur échappés"""
+    texte = texte.strip().lower()
+    return texte.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def find_students(conn, texte, limit=LIMITE_RECHERCHE):
+    """Étudiants dont « nom prénom » commence par texte (ou dont l'id vaut texte).
+
+    La recherche par préfixe parcourt l'index idx_etudiants_recherche dans l'ordre
+    du tri : seules les limit premières lignes sont lues.
+    """
+    texte = texte.strip()
+    if not texte:
+        return pd.DataFrame(columns=["id", "nom", "prenom", "formation"])
+    if texte.isdigit():
+        where, params = "e.id = %s", (int(texte),)
+    else:
+        where, params = """lower(e.nom || ' ' || e.prenom) COLLATE "C" LIKE %s""", (_prefixe(texte),)
+    return _fetch_df(conn, f"""
+        SELECT e.id, e.nom, e.prenom, f.nom
+        FROM etudiants e
+        JOIN formations f ON f.id = e.formation_id
+        WHERE {where}
+        ORDER BY lower(e.nom || ' ' || e.prenom) COLLATE "C", e.id
+        LIMIT %s
+    """, params + (limit,), ["id", "nom", "prenom", "formation"])
+
+
+def find_profs(conn, texte, limit=LIMITE_RECHERCHE):
+    """Professeurs dont le nom commence par texte (index idx_professeurs_recherche)"""
+    texte = texte.strip()
+    if not texte:
+        return pd.DataFrame(columns=["id", "nom", "departement"])
+    return _fetch_df(conn, """
+        SELECT p.id, p.nom, d.nom
+        FROM professeurs p
+        JOIN departements d ON d.id = p.dept_id
+        WHERE lower(p.nom) COLLATE "C" LIKE %s
+        ORDER BY lower(p.nom) COLLATE "C", p.id
+        LIMIT %s
+    """, (_prefixe(texte), limit), ["id", "nom", "departement"])
+
+
+def student_planning(conn, etudiant_id):
+    """Examens d'un étudiant, un par ligne (salles regroupées si l'examen est réparti).
+
+    Clé primaire d'inscriptions (etudiant_id, module_id) puis idx_examens_module_date :
+    deux parcours d'index, sans lire d'autres étudiants.
+    """
+    return _fetch_df(conn, """
+        SELECT ex.date_heure, ex.duree_minutes, m.nom,
+               string_agg(s.nom, ', ' ORDER BY s.nom), string_agg(DISTINCT s.batiment, ', ')
+        FROM inscriptions i
+        JOIN examens ex ON ex.module_id = i.module_id
+        JOIN modules m ON m.id = i.module_id
+        JOIN salles s ON s.id = ex.salle_id
+        WHERE i.etudiant_id = %s
+        GROUP BY ex.date_heure, ex.duree_minutes, m.id, m.nom
+        ORDER BY ex.date_heure
+    """, (etudiant_id,), PLANNING_COLONNES)
+
+
+def prof_planning(conn, prof_id):
+    """Surveillances d'un professeur (index idx_examens_prof_date)"""
+    return _fetch_df(conn, """
+        SELECT ex.date_heure, ex.duree_minutes, m.nom, s.nom, s.batiment
+        FROM examens ex
+        JOIN modules m ON m.id = ex.module_id
+        JOIN salles s ON s.id = ex.salle_id
+        WHERE ex.prof_id = %s
+        ORDER BY ex.date_heure
+    """, (prof_id,), PLANNING_COLONNES)
@@ -1,26 +1,337 @@
+-- Migration d'une base créée avec un creation.sql antérieur (sans effet sur une base
+-- neuve) : colonnes et tables maintenues par les triggers ci-dessous. Elles sont
+-- remplies par les CALL refresh_* qui suivent leurs triggers, et data_version par
+-- la boucle de trg_data_version.
+ALTER TABLE modules ADD COLUMN IF NOT EXISTS nb_inscrits INT NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS student_day_load (
+    etudiant_id INT NOT NULL,
+    jour DATE NOT NULL,
+    nb INT NOT NULL,
+    PRIMARY KEY (etudiant_id, jour),
+    FOREIGN KEY (etudiant_id) REFERENCES etudiants(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS kpi_snapshot (
+    cle VARCHAR(30) NOT NULL,
+    valeur BIGINT NOT NULL
+);
+
+-- Ancien format de data_version (une ligne par instruction, version BIGSERIAL) :
+-- remplacé par un compteur par table
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_schema = current_schema() AND table_name = 'data_version'
+                 AND column_name = 'version' AND column_default LIKE 'nextval%') THEN
+        DROP TABLE data_version;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS data_version (
+    source VARCHAR(30) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+-- Applique des apparitions (+1) / disparitions (-1) de couples (module, jour)
+-- aux étudiants inscrits, en une seule requête ensembliste
+CREATE OR REPLACE FUNCTION appliquer_charge_modules(p_modules INT[], p_jours DATE[], p_signes INT[])
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO student_day_load AS l (etudiant_id, jour, nb)
+    SELECT i.etudiant_id, d.jour, SUM(d.signe)
+    FROM unnest(p_modules, p_jours, p_signes) AS d(module_id, jour, signe)
+    JOIN inscriptions i ON i.module_id = d.module_id
+    GROUP BY i.etudiant_id, d.jour
+    ON CONFLICT (etudiant_id, jour) DO UPDATE SET nb = l.nb + EXCLUDED.nb;
+
+    DELETE FROM student_day_load
+    WHERE nb = 0 AND jour = ANY (p_jours);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Maintient student_day_load pour chaque lot sur examens (transition tables
+-- 'nouveaux' / 'anciens'). Le contrôle des conflits est fait sur student_day_load
+-- en fin de transaction (trg_conflit_etudiant).
 CREATE OR REPLACE FUNCTION check_exam_etudiant()
 RETURNS TRIGGER AS $$
+DECLARE
+    v_modules INT[];
+    v_jours DATE[];
+    v_signes INT[];
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE student_day_load;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        -- Couples (module, jour) nouveaux : toutes leurs lignes viennent du lot
+        SELECT array_agg(n.module_id), array_agg(n.jour), array_agg(1)
+        INTO v_modules, v_jours, v_signes
+        FROM (SELECT module_id, DATE(date_heure) AS jour, COUNT(*) AS nb
+              FROM nouveaux GROUP BY module_id, DATE(date_heure)) n
+        WHERE n.nb = (SELECT COUNT(*) FROM examens e
+                      WHERE e.module_id = n.module_id AND DATE(e.date_heure) = n.jour);
+    ELSIF TG_OP = 'DELETE' THEN
+        -- Couples (module, jour) qui n'ont plus aucune ligne
+        SELECT array_agg(a.module_id), array_agg(a.jour), array_agg(-1)
+        INTO v_modules, v_jours, v_signes
+        FROM (SELECT DISTINCT module_id, DATE(date_heure) AS jour FROM anciens) a
+        WHERE NOT EXISTS (SELECT 1 FROM examens e
+                          WHERE e.module_id = a.module_id AND DATE(e.date_heure) = a.jour);
+    ELSE
+        -- UPDATE : avant = après - lignes du lot + anciennes lignes ;
+        -- le couple change si exactement l'un des deux vaut 0
+        SELECT array_agg(c.module_id), array_agg(c.jour),
+               array_agg(CASE WHEN c.apres > 0 THEN 1 ELSE -1 END)
+        INTO v_modules, v_jours, v_signes
+        FROM (
+            SELECT p.module_id, p.jour, p.nb_nouveaux, p.nb_anciens,
+                   (SELECT COUNT(*) FROM examens e
+                    WHERE e.module_id = p.module_id AND DATE(e.date_heure) = p.jour) AS apres
+            FROM (
+                SELECT module_id, jour,
+                       COALESCE(n.nb, 0) AS nb_nouveaux, COALESCE(a.nb, 0) AS nb_anciens
+                FROM (SELECT module_id, DATE(date_heure) AS jour, COUNT(*) AS nb
+                      FROM nouveaux GROUP BY module_id, DATE(date_heure)) n
+                FULL JOIN (SELECT module_id, DATE(date_heure) AS jour, COUNT(*) AS nb
+                           FROM anciens GROUP BY module_id, DATE(date_heure)) a
+                USING (module_id, jour)
+            ) p
+        ) c
+        WHERE (c.apres - c.nb_nouveaux + c.nb_anciens = 0) <> (c.apres = 0);
+    END IF;
+
+    PERFORM appliquer_charge_modules(v_modules, v_jours, v_signes);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_exam_etudiant ON examens;
+DROP TRIGGER IF EXISTS trg_exam_etudiant_maj ON examens;
+DROP TRIGGER IF EXISTS trg_exam_etudiant_suppr ON examens;
+DROP TRIGGER IF EXISTS trg_exam_etudiant_vider ON examens;
+
+CREATE TRIGGER trg_exam_etudiant
+AFTER INSERT ON examens
+REFERENCING NEW TABLE AS nouveaux
+FOR EACH STATEMENT EXECUTE FUNCTION check_exam_etudiant();
+
+CREATE TRIGGER trg_exam_etudiant_maj
+AFTER UPDATE ON examens
+REFERENCING OLD TABLE AS anciens NEW TABLE AS nouveaux
+FOR EACH STATEMENT EXECUTE FUNCTION check_exam_etudiant();
+
+CREATE TRIGGER trg_exam_etudiant_suppr
+AFTER DELETE ON examens
+REFERENCING OLD TABLE AS anciens
+FOR EACH STATEMENT EXECUTE FUNCTION check_exam_etudiant();
+
+CREATE TRIGGER trg_exam_etudiant_vider
+AFTER TRUNCATE ON examens
+FOR EACH STATEMENT EXECUTE FUNCTION check_exam_etudiant();
+
+-- Inscriptions ajoutées (+1) / retirées (-1) : pour chaque jour d'examen du module
+CREATE OR REPLACE FUNCTION appliquer_charge_inscriptions(p_etudiants INT[], p_modules INT[], p_signes INT[])
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO student_day_load AS l (etudiant_id, jour, nb)
+    SELECT d.etudiant_id, j.jour, SUM(d.signe)
+    FROM unnest(p_etudiants, p_modules, p_signes) AS d(etudiant_id, module_id, signe)
+    JOIN LATERAL (SELECT DISTINCT DATE(e.date_heure) AS jour
+                  FROM examens e WHERE e.module_id = d.module_id) j ON TRUE
+    GROUP BY d.etudiant_id, j.jour
+    ON CONFLICT (etudiant_id, jour) DO UPDATE SET nb = l.nb + EXCLUDED.nb;
+
+    DELETE FROM student_day_load
+    WHERE nb = 0 AND etudiant_id = ANY (p_etudiants);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maj_charge_inscriptions()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_etudiants INT[];
+    v_modules INT[];
+    v_signes INT[];
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        TRUNCATE student_day_load;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(etudiant_id), array_agg(module_id), array_agg(1)
+        INTO v_etudiants, v_modules, v_signes
+        FROM nouvelles;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(etudiant_id), array_agg(module_id), array_agg(-1)
+        INTO v_etudiants, v_modules, v_signes
+        FROM anciennes;
+    ELSE
+        -- UPDATE : seules les lignes dont (etudiant_id, module_id) change comptent
+        -- (une mise à jour de note ne produit aucun delta)
+        SELECT array_agg(etudiant_id), array_agg(module_id), array_agg(signe)
+        INTO v_etudiants, v_modules, v_signes
+        FROM (
+            (SELECT etudiant_id, module_id, 1 AS signe FROM nouvelles
+             EXCEPT ALL
+             SELECT etudiant_id, module_id, 1 FROM anciennes)
+            UNION ALL
+            (SELECT etudiant_id, module_id, -1 FROM anciennes
+             EXCEPT ALL
+             SELECT etudiant_id, module_id, -1 FROM nouvelles)
+        ) d;
+    END IF;
+
+    PERFORM appliquer_charge_inscriptions(v_etudiants, v_modules, v_signes);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_insc_charge ON inscriptions;
+DROP TRIGGER IF EXISTS trg_insc_charge_maj ON inscriptions;
+DROP TRIGGER IF EXISTS trg_insc_charge_suppr ON inscriptions;
+DROP TRIGGER IF EXISTS trg_insc_charge_vider ON inscriptions;
+
+CREATE TRIGGER trg_insc_charge
+AFTER INSERT ON inscriptions
+REFERENCING NEW TABLE AS nouvelles
+FOR EACH STATEMENT EXECUTE FUNCTION maj_charge_inscriptions();
+
+CREATE TRIGGER trg_insc_charge_maj
+AFTER UPDATE ON inscriptions
+REFERENCING OLD TABLE AS anciennes NEW TABLE AS nouvelles
+FOR EACH STATEMENT EXECUTE FUNCTION maj_charge_inscriptions();
+
+CREATE TRIGGER trg_insc_charge_suppr
+AFTER DELETE ON inscriptions
+REFERENCING OLD TABLE AS anciennes
+FOR EACH STATEMENT EXECUTE FUNCTION maj_charge_inscriptions();
+
+CREATE TRIGGER trg_insc_charge_vider
+AFTER TRUNCATE ON inscriptions
+FOR EACH STATEMENT EXECUTE FUNCTION maj_charge_inscriptions();
+
+-- Conflit étudiant : contrôlé au COMMIT, une fois par ligne de student_day_load
+-- passée à nb > 1 dans la transaction (lot d'examens ou d'inscriptions). Seuls
+-- les étudiants touchés sont vérifiés, et un déplacement en plusieurs
+-- instructions (échange de jours entre deux modules) n'échoue pas sur un état
+-- intermédiaire : on relit nb tel qu'il est en fin de transaction.
+CREATE OR REPLACE FUNCTION check_conflit_etudiant()
+RETURNS TRIGGER AS $$
 BEGIN
     IF EXISTS (
         SELECT 1
-        FROM inscriptions i
-        JOIN examens e ON e.module_id = i.module_id
-        WHERE i.etudiant_id IN (
-            SELECT etudiant_id
-            FROM inscriptions
-            WHERE module_id = NEW.module_id
-        )
-        AND DATE(e.date_heure) = DATE(NEW.date_heure)
+        FROM student_day_load
+        WHERE etudiant_id = NEW.etudiant_id
+        AND jour = NEW.jour
+        AND nb > 1
     ) THEN
         RAISE EXCEPTION 'Conflit étudiant';
     END IF;
-    RETURN NEW;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_exam_etudiant
-BEFORE INSERT ON examens
-FOR EACH ROW EXECUTE FUNCTION check_exam_etudiant();
+DROP TRIGGER IF EXISTS trg_conflit_etudiant ON student_day_load;
+
+CREATE CONSTRAINT TRIGGER trg_conflit_etudiant
+AFTER INSERT OR UPDATE ON student_day_load
+DEFERRABLE INITIALLY DEFERRED
+FOR EACH ROW
+WHEN (NEW.nb > 1)
+EXECUTE FUNCTION check_conflit_etudiant();
+
+-- Recalcul complet (initialisation ou resynchronisation)
+CREATE OR REPLACE PROCEDURE refresh_student_day_load()
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    TRUNCATE student_day_load;
+    INSERT INTO student_day_load (etudiant_id, jour, nb)
+    SELECT i.etudiant_id, j.jour, COUNT(*)
+    FROM inscriptions i
+    JOIN (SELECT DISTINCT module_id, DATE(date_heure) AS jour FROM examens) j
+      ON j.module_id = i.module_id
+    GROUP BY i.etudiant_id, j.jour;
+END;
+$$;
+
+CALL refresh_student_day_load();
+
+-- modules.nb_inscrits : delta d'inscrits par module pour chaque instruction
+CREATE OR REPLACE FUNCTION maj_nb_inscrits()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE modules SET nb_inscrits = 0 WHERE nb_inscrits <> 0;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        UPDATE modules m SET nb_inscrits = m.nb_inscrits + d.n
+        FROM (SELECT module_id, COUNT(*) AS n FROM nouvelles GROUP BY module_id) d
+        WHERE m.id = d.module_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE modules m SET nb_inscrits = m.nb_inscrits - d.n
+        FROM (SELECT module_id, COUNT(*) AS n FROM anciennes GROUP BY module_id) d
+        WHERE m.id = d.module_id;
+    ELSE
+        UPDATE modules m SET nb_inscrits = m.nb_inscrits + d.n
+        FROM (
+            SELECT module_id, SUM(signe) AS n
+            FROM (SELECT module_id, 1 AS signe FROM nouvelles
+                  UNION ALL
+                  SELECT module_id, -1 FROM anciennes) t
+            GROUP BY module_id
+            HAVING SUM(signe) <> 0
+        ) d
+        WHERE m.id = d.module_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_insc_nb ON inscriptions;
+DROP TRIGGER IF EXISTS trg_insc_nb_maj ON inscriptions;
+DROP TRIGGER IF EXISTS trg_insc_nb_suppr ON inscriptions;
+DROP TRIGGER IF EXISTS trg_insc_nb_vider ON inscriptions;
+
+CREATE TRIGGER trg_insc_nb
+AFTER INSERT ON inscriptions
+REFERENCING NEW TABLE AS nouvelles
+FOR EACH STATEMENT EXECUTE FUNCTION maj_nb_inscrits();
+
+CREATE TRIGGER trg_insc_nb_maj
+AFTER UPDATE ON inscriptions
+REFERENCING OLD TABLE AS anciennes NEW TABLE AS nouvelles
+FOR EACH STATEMENT EXECUTE FUNCTION maj_nb_inscrits();
+
+CREATE TRIGGER trg_insc_nb_suppr
+AFTER DELETE ON inscriptions
+REFERENCING OLD TABLE AS anciennes
+FOR EACH STATEMENT EXECUTE FUNCTION maj_nb_inscrits();
+
+CREATE TRIGGER trg_insc_nb_vider
+AFTER TRUNCATE ON inscriptions
+FOR EACH STATEMENT EXECUTE FUNCTION maj_nb_inscrits();
+
+-- Recalcul complet (initialisation ou resynchronisation)
+CREATE OR REPLACE PROCEDURE refresh_nb_inscrits()
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE modules m SET nb_inscrits = COALESCE(i.n, 0)
+    FROM modules m2
+    LEFT JOIN (SELECT module_id, COUNT(*) AS n FROM inscriptions GROUP BY module_id) i
+      ON i.module_id = m2.id
+    WHERE m.id = m2.id AND m.nb_inscrits IS DISTINCT FROM COALESCE(i.n, 0);
+END;
+$$;
+
+CALL refresh_nb_inscrits();
 
 CREATE OR REPLACE FUNCTION check_exam_prof()
 RETURNS TRIGGER AS $$
@@ -36,6 +347,206 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+DROP TRIGGER IF EXISTS trg_exam_prof ON examens;
+
 CREATE TRIGGER trg_exam_prof
 BEFORE INSERT ON examens
 FOR EACH ROW EXECUTE FUNCTION check_exam_prof();
+
+-- Replie les deltas d'un indicateur en une seule ligne dès qu'il en a 32 : la
+-- lecture des KPI (SUM ... GROUP BY cle) reste bornée quel que soit le nombre
+-- d'instructions exécutées. Seules les lignes libres sont reprises (SKIP LOCKED) :
+-- une transaction longue ne garde pas verrouillés jusqu'à son COMMIT les deltas
+-- des autres, qui ne l'attendent jamais. Rien n'est replié sous exam.sans_version
+-- = on : les workers de generate_data.py se bloqueraient entre eux, et le processus
+-- principal appelle compacter_kpi_snapshot une fois tous les shards validés.
+CREATE OR REPLACE FUNCTION replier_kpi(p_cle TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF current_setting('exam.sans_version', true) = 'on' THEN
+        RETURN;
+    END IF;
+    IF (SELECT COUNT(*) FROM kpi_snapshot WHERE cle = p_cle) >= 32 THEN
+        WITH libres AS (
+            SELECT ctid FROM kpi_snapshot WHERE cle = p_cle FOR UPDATE SKIP LOCKED
+        ), deltas AS (
+            DELETE FROM kpi_snapshot WHERE ctid IN (SELECT ctid FROM libres) RETURNING valeur
+        )
+        INSERT INTO kpi_snapshot (cle, valeur)
+        SELECT p_cle, SUM(valeur) FROM deltas HAVING COUNT(*) > 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Indicateurs de kpi_snapshot : TG_ARGV[0] = indicateur (nombre de lignes de la table)
+CREATE OR REPLACE FUNCTION maj_kpi_compteur()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM kpi_snapshot WHERE cle = TG_ARGV[0];
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO kpi_snapshot (cle, valeur)
+        SELECT TG_ARGV[0], COUNT(*) FROM nouvelles HAVING COUNT(*) > 0;
+    ELSE
+        INSERT INTO kpi_snapshot (cle, valeur)
+        SELECT TG_ARGV[0], -COUNT(*) FROM anciennes HAVING COUNT(*) > 0;
+    END IF;
+    PERFORM replier_kpi(TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t RECORD;
+BEGIN
+    FOR t IN SELECT * FROM (VALUES
+        ('departements', 'total_departements'),
+        ('formations', 'total_formations'),
+        ('etudiants', 'total_etudiants'),
+        ('professeurs', 'total_professeurs'),
+        ('modules', 'total_modules'),
+        ('salles', 'total_salles'),
+        ('inscriptions', 'total_inscriptions'),
+        ('examens', 'total_examens')
+    ) AS v(tbl, cle)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_kpi ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_kpi_suppr ON %I', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_kpi_vider ON %I', t.tbl);
+
+        EXECUTE format('CREATE TRIGGER trg_kpi AFTER INSERT ON %I
+                        REFERENCING NEW TABLE AS nouvelles
+                        FOR EACH STATEMENT EXECUTE FUNCTION maj_kpi_compteur(%L)', t.tbl, t.cle);
+        EXECUTE format('CREATE TRIGGER trg_kpi_suppr AFTER DELETE ON %I
+                        REFERENCING OLD TABLE AS anciennes
+                        FOR EACH STATEMENT EXECUTE FUNCTION maj_kpi_compteur(%L)', t.tbl, t.cle);
+        EXECUTE format('CREATE TRIGGER trg_kpi_vider AFTER TRUNCATE ON %I
+                        FOR EACH STATEMENT EXECUTE FUNCTION maj_kpi_compteur(%L)', t.tbl, t.cle);
+    END LOOP;
+END $$;
+
+-- Capacité totale : seule valeur sensible aux UPDATE
+CREATE OR REPLACE FUNCTION maj_kpi_capacite()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM kpi_snapshot WHERE cle = 'capacite_totale';
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO kpi_snapshot (cle, valeur)
+        SELECT 'capacite_totale', SUM(capacite) FROM nouvelles HAVING SUM(capacite) <> 0;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO kpi_snapshot (cle, valeur)
+        SELECT 'capacite_totale', -SUM(capacite) FROM anciennes HAVING SUM(capacite) <> 0;
+    ELSE
+        INSERT INTO kpi_snapshot (cle, valeur)
+        SELECT 'capacite_totale', d.delta
+        FROM (SELECT COALESCE((SELECT SUM(capacite) FROM nouvelles), 0)
+                   - COALESCE((SELECT SUM(capacite) FROM anciennes), 0) AS delta) d
+        WHERE d.delta <> 0;
+    END IF;
+    PERFORM replier_kpi('capacite_totale');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_kpi_capacite ON salles;
+DROP TRIGGER IF EXISTS trg_kpi_capacite_maj ON salles;
+DROP TRIGGER IF EXISTS trg_kpi_capacite_suppr ON salles;
+DROP TRIGGER IF EXISTS trg_kpi_capacite_vider ON salles;
+
+CREATE TRIGGER trg_kpi_capacite
+AFTER INSERT ON salles
+REFERENCING NEW TABLE AS nouvelles
+FOR EACH STATEMENT EXECUTE FUNCTION maj_kpi_capacite();
+
+CREATE TRIGGER trg_kpi_capacite_maj
+AFTER UPDATE ON salles
+REFERENCING OLD TABLE AS anciennes NEW TABLE AS nouvelles
+FOR EACH STATEMENT EXECUTE FUNCTION maj_kpi_capacite();
+
+CREATE TRIGGER trg_kpi_capacite_suppr
+AFTER DELETE ON salles
+REFERENCING OLD TABLE AS anciennes
+FOR EACH STATEMENT EXECUTE FUNCTION maj_kpi_capacite();
+
+CREATE TRIGGER trg_kpi_capacite_vider
+AFTER TRUNCATE ON salles
+FOR EACH STATEMENT EXECUTE FUNCTION maj_kpi_capacite();
+
+-- Regroupe tous les deltas en une ligne par indicateur (après un gros chargement)
+CREATE OR REPLACE PROCEDURE compacter_kpi_snapshot()
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    WITH deltas AS (
+        DELETE FROM kpi_snapshot RETURNING cle, valeur
+    )
+    INSERT INTO kpi_snapshot (cle, valeur)
+    SELECT cle, SUM(valeur) FROM deltas GROUP BY cle;
+END;
+$$;
+
+-- Recalcul complet (initialisation ou resynchronisation)
+CREATE OR REPLACE PROCEDURE refresh_kpi_snapshot()
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    LOCK TABLE kpi_snapshot IN EXCLUSIVE MODE;
+    DELETE FROM kpi_snapshot;
+    INSERT INTO kpi_snapshot (cle, valeur)
+    SELECT 'total_departements', COUNT(*) FROM departements
+    UNION ALL SELECT 'total_formations', COUNT(*) FROM formations
+    UNION ALL SELECT 'total_etudiants', COUNT(*) FROM etudiants
+    UNION ALL SELECT 'total_professeurs', COUNT(*) FROM professeurs
+    UNION ALL SELECT 'total_modules', COUNT(*) FROM modules
+    UNION ALL SELECT 'total_salles', COUNT(*) FROM salles
+    UNION ALL SELECT 'capacite_totale', COALESCE(SUM(capacite), 0) FROM salles
+    UNION ALL SELECT 'total_inscriptions', COUNT(*) FROM inscriptions
+    UNION ALL SELECT 'total_examens', COUNT(*) FROM examens;
+END;
+$$;
+
+CALL refresh_kpi_snapshot();
+
+-- Incrémente le compteur data_version de chaque table de p_sources
+CREATE OR REPLACE PROCEDURE marquer_data_version(p_sources TEXT[])
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO data_version AS d (source, version)
+    SELECT s, 1 FROM unnest(p_sources) AS s
+    ON CONFLICT (source) DO UPDATE SET version = d.version + 1;
+END;
+$$;
+
+-- data_version : version + 1 par instruction modifiant la table. Les workers de
+-- generate_data.py posent exam.sans_version = on (sinon ils s'attendraient sur le
+-- verrou du compteur jusqu'au COMMIT de leur shard) ; le processus principal
+-- appelle marquer_data_version une fois tous les shards validés.
+CREATE OR REPLACE FUNCTION maj_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('exam.sans_version', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    CALL marquer_data_version(ARRAY[TG_TABLE_NAME::TEXT]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['departements', 'formations', 'etudiants', 'professeurs',
+                             'modules', 'salles', 'inscriptions', 'examens']
+    LOOP
+        -- Version 0 pour chaque table, conservée si elle existe déjà
+        INSERT INTO data_version (source) VALUES (t) ON CONFLICT (source) DO NOTHING;
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_data_version ON %I', t);
+        EXECUTE format('CREATE TRIGGER trg_data_version
+                        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+                        FOR EACH STATEMENT EXECUTE FUNCTION maj_data_version()', t);
+    END LOOP;
+END $$;
@@ -35,6 +35,8 @@ CREATE TABLE modules (
     credits INT CHECK (credits BETWEEN 2 AND 6),
     formation_id INT NOT NULL,
     pre_req_id INT,
+    -- Nombre d'inscrits, maintenu par les triggers de contrainte.sql
+    nb_inscrits INT NOT NULL DEFAULT 0,
     FOREIGN KEY (formation_id) REFERENCES formations(id),
     FOREIGN KEY (pre_req_id) REFERENCES modules(id)
 );
@@ -70,3 +72,31 @@ CREATE TABLE examens (
     FOREIGN KEY (prof_id) REFERENCES professeurs(id),
     FOREIGN KEY (salle_id) REFERENCES salles(id)
 );
+
+-- Nombre de modules examinés par étudiant et par jour, maintenu par les triggers
+-- de contrainte.sql (un examen réparti sur plusieurs salles compte une fois)
+CREATE TABLE student_day_load (
+    etudiant_id INT NOT NULL,
+    jour DATE NOT NULL,
+    nb INT NOT NULL,
+    PRIMARY KEY (etudiant_id, jour),
+    FOREIGN KEY (etudiant_id) REFERENCES etudiants(id) ON DELETE CASCADE
+);
+
+-- Compteurs du tableau de bord (get_global_kpis), maintenus par les triggers de
+-- contrainte.sql : chaque instruction ajoute une ligne de delta et un indicateur vaut
+-- la somme de ses lignes, ce qui évite une ligne unique verrouillée par les
+-- chargements parallèles. compacter_kpi_snapshot() regroupe les deltas.
+CREATE TABLE kpi_snapshot (
+    cle VARCHAR(30) NOT NULL,
+    valeur BIGINT NOT NULL
+);
+
+-- Versions des données pour le cache du tableau de bord : un compteur par table,
+-- incrémenté par chaque instruction qui la modifie (triggers de contrainte.sql).
+-- Le verrou de la ligne ordonne les incréments comme les COMMIT : une écriture
+-- validée après une lecture donne toujours une version plus grande.
+CREATE TABLE data_version (
+    source VARCHAR(30) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
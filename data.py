@@ -1,35 +1,40 @@
 from faker import Faker
 import random
+import time
 from db import get_connection
+from bulk import copy_rows, report_throughput
 
 fake = Faker("fr_FR")
 conn = get_connection()
 cur = conn.cursor()
 
-for i in range(1,8):
-    cur.execute("INSERT INTO departements (nom) VALUES (%s)", (f"Departement {i}",))
+start_time = time.time()
+n = copy_rows(cur, "departements", ["nom"], ((f"Departement {i}",) for i in range(1,8)))
+report_throughput("départements", n, start_time)
 
 cur.execute("SELECT id FROM departements")
 dept_ids = [x[0] for x in cur.fetchall()]
 
-for d in dept_ids:
-    for _ in range(30):
-        cur.execute("""
-        INSERT INTO formations (nom, dept_id, nb_modules)
-        VALUES (%s,%s,%s)
-        """, (f"Licence {fake.word()}", d, random.randint(6,9)))
+start_time = time.time()
+n = copy_rows(cur, "formations", ["nom", "dept_id", "nb_modules"], (
+    (f"Licence {fake.word()}", d, random.randint(6,9))
+    for d in dept_ids
+    for _ in range(30)
+))
+report_throughput("formations", n, start_time)
 
-for _ in range(120):
-    cur.execute("""
-    INSERT INTO professeurs (nom, dept_id, specialite)
-    VALUES (%s,%s,%s)
-    """, (fake.last_name(), random.choice(dept_ids), fake.job()))
+start_time = time.time()
+n = copy_rows(cur, "professeurs", ["nom", "dept_id", "specialite"], (
+    (fake.last_name(), random.choice(dept_ids), fake.job())
+    for _ in range(120)
+))
+report_throughput("professeurs", n, start_time)
 
-for i in range(60):
-    cur.execute("INSERT INTO salles VALUES (DEFAULT,%s,20,'salle','Bloc A')",(f"S{i}",))
-for i in range(15):
-    cur.execute("INSERT INTO salles VALUES (DEFAULT,%s,%s,'amphi','Bloc B')",
-                (f"A{i}", random.randint(100,300)))
+start_time = time.time()
+salles = [(f"S{i}", 20, 'salle', 'Bloc A') for i in range(60)]
+salles += [(f"A{i}", random.randint(100,300), 'amphi', 'Bloc B') for i in range(15)]
+n = copy_rows(cur, "salles", ["nom", "capacite", "type", "batiment"], salles)
+report_throughput("salles", n, start_time)
 
 conn.commit()
 cur.close()
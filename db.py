@@ -1,17 +1,104 @@
+import threading
+from contextlib import contextmanager
+
 import psycopg2
+from psycopg2 import pool as pg_pool
+
+# Base locale par défaut
+LOCAL_DB = dict(
+    dbname="exam_scheduler",
+    user="postgres",
+    password="yassinopostgresql",
+    host="localhost",
+    port="5432"
+)
 
 def get_connection():
     try:
-        conn = psycopg2.connect(
-           dbname="exam_scheduler",
-            user="postgres",
-            password="yassinopostgresql",
-            host="localhost",
-            port="5432"
-        )
+        conn = psycopg2.connect(**LOCAL_DB)
         print("Connexion PostgreSQL OK")
         return conn
 
     except Exception as e:
         print("Erreur connexion PostgreSQL :", e)
         raise
+
+
+# Attente maximale (s) d'une connexion libre quand le pool est plein
+POOL_TIMEOUT = 30
+
+
+class BlockingConnectionPool(pg_pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool dont getconn attend qu'une connexion se libère au lieu
+    de lever PoolError dès que maxconn connexions sont prêtées"""
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self._libres = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None, timeout=POOL_TIMEOUT):
+        if not self._libres.acquire(timeout=timeout):
+            raise pg_pool.PoolError(f"Aucune connexion libre après {timeout} s")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._libres.release()
+            raise
+
+    def putconn(self, conn, key=None, close=False):
+        super().putconn(conn, key, close)
+        self._libres.release()
+
+
+def create_pool(minconn=1, maxconn=10, **params):
+    """Pool de connexions partagé entre threads (sessions Streamlit) ; params = ceux de psycopg2.connect"""
+    return BlockingConnectionPool(minconn, maxconn, **(params or LOCAL_DB))
+
+
+def _is_healthy(conn):
+    """Vérifie une connexion avant de la prêter : fermée ou serveur injoignable -> False"""
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+
+def checkout(pool, retries=3, timeout=POOL_TIMEOUT):
+    """Emprunte une connexion saine au pool ; les connexions cassées (redémarrage
+    serveur, timeout du pooler...) sont fermées et remplacées.
+
+    Pool plein : attend au plus timeout s qu'une connexion soit rendue (PoolError
+    sinon). OperationalError si aucune des retries connexions n'est saine.
+    """
+    for _ in range(retries):
+        conn = pool.getconn(timeout=timeout)
+        if _is_healthy(conn):
+            return conn
+        pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError(f"Aucune connexion saine après {retries} essais")
+
+
+def checkin(pool, conn):
+    """Rend une connexion au pool après avoir annulé sa transaction ; une connexion
+    cassée pendant l'utilisation est fermée au lieu d'être remise dans le pool"""
+    broken = bool(conn.closed)
+    if not broken:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
+    pool.putconn(conn, close=broken)
+
+
+@contextmanager
+def pooled_connection(pool):
+    conn = checkout(pool)
+    try:
+        yield conn
+    finally:
+        checkin(pool, conn)
@@ -1,9 +1,18 @@
 import random
+import time
 from datetime import datetime, timedelta
+import psycopg2
 from db import get_connection
+from bulk import copy_rows, report_throughput
+
+# Petits lots : un conflit (trigger) rejette tout le lot, repris ligne par ligne
+CHUNK_SIZE = 100
 
 conn = get_connection()
 cur = conn.cursor()
+# Contrôle des conflits étudiants à chaque instruction (différé au COMMIT par défaut) :
+# sinon un conflit ne ferait échouer ni le lot ni la ligne, mais le COMMIT final
+cur.execute("SET CONSTRAINTS trg_conflit_etudiant IMMEDIATE")
 
 cur.execute("SELECT id FROM modules")
 modules = [x[0] for x in cur.fetchall()]
@@ -15,21 +24,35 @@ cur.execute("SELECT id FROM salles")
 salles = [x[0] for x in cur.fetchall()]
 
 start = datetime(2026,1,10,8,0)
+columns = ["module_id", "prof_id", "salle_id", "date_heure", "duree_minutes"]
+
+rows = [(
+    m,
+    random.choice(profs),
+    random.choice(salles),
+    start + timedelta(days=random.randint(0,12)),
+    random.choice([60,90,120])
+) for m in modules]
 
-for m in modules:
+start_time = time.time()
+inserted = 0
+for i in range(0, len(rows), CHUNK_SIZE):
+    chunk = rows[i:i + CHUNK_SIZE]
+    cur.execute("SAVEPOINT lot")
     try:
-        cur.execute("""
-        INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes)
-        VALUES (%s,%s,%s,%s,%s)
-        """, (
-            m,
-            random.choice(profs),
-            random.choice(salles),
-            start + timedelta(days=random.randint(0,12)),
-            random.choice([60,90,120])
-        ))
-    except:
-        conn.rollback()
+        inserted += copy_rows(cur, "examens", columns, chunk)
+        cur.execute("RELEASE SAVEPOINT lot")
+    except psycopg2.Error:
+        # Conflit dans le lot : on garde les lignes valides une par une
+        cur.execute("ROLLBACK TO SAVEPOINT lot")
+        for row in chunk:
+            cur.execute("SAVEPOINT ligne")
+            try:
+                inserted += copy_rows(cur, "examens", columns, [row])
+                cur.execute("RELEASE SAVEPOINT ligne")
+            except psycopg2.Error:
+                cur.execute("ROLLBACK TO SAVEPOINT ligne")
+report_throughput("examens", inserted, start_time)
 
 conn.commit()
 cur.close()
@@ -0,0 +1,250 @@
+import argparse
+import os
+import random
+import time
+from multiprocessing import Pool
+from multiprocessing.util import Finalize
+
+import numpy as np
+from faker import Faker
+
+from db import get_connection
+from bulk import copy_int_columns, copy_rows, report_throughput
+from inscription import sample_inscriptions
+
+# Tailles de campus : 'etudiants_par_formation' garde le ratio de data.py (~63)
+PRESETS = {
+    'small': dict(departements=3, formations_par_dept=10, professeurs=20, salles=10, amphis=3, etudiants=1_000),
+    '13k': dict(departements=7, formations_par_dept=30, professeurs=120, salles=60, amphis=15, etudiants=13_250),
+    '100k': dict(departements=16, formations_par_dept=100, professeurs=900, salles=450, amphis=115, etudiants=100_000),
+    '1m': dict(departements=40, formations_par_dept=400, professeurs=9_000, salles=4_500, amphis=1_130, etudiants=1_000_000),
+}
+
+TABLES = ["examens", "inscriptions", "etudiants", "modules", "salles", "professeurs", "formations", "departements"]
+
+
+def reset(cur):
+    """Vide toutes les tables et remet les séquences à 1"""
+    cur.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+
+
+def fetch_ids(cur, sql):
+    cur.execute(sql)
+    return cur.fetchall()
+
+
+def gen_departements(cur, size, rng, fake):
+    return copy_rows(cur, "departements", ["nom"], (
+        (f"Departement {i}",) for i in range(1, size['departements'] + 1)
+    ))
+
+
+def gen_formations(cur, size, rng, fake):
+    dept_ids = [d for d, in fetch_ids(cur, "SELECT id FROM departements ORDER BY id")]
+    return copy_rows(cur, "formations", ["nom", "dept_id", "nb_modules"], (
+        (f"Licence {fake.word()} {k}", d, rng.randint(6, 9))
+        for d in dept_ids
+        for k in range(size['formations_par_dept'])
+    ))
+
+
+def gen_professeurs(cur, size, rng, fake):
+    dept_ids = [d for d, in fetch_ids(cur, "SELECT id FROM departements ORDER BY id")]
+    return copy_rows(cur, "professeurs", ["nom", "dept_id", "specialite"], (
+        (fake.last_name(), rng.choice(dept_ids), fake.job())
+        for _ in range(size['professeurs'])
+    ))
+
+
+def gen_salles(cur, size, rng, fake):
+    salles = [(f"S{i}", 20, 'salle', 'Bloc A') for i in range(size['salles'])]
+    salles += [(f"A{i}", rng.randint(100, 300), 'amphi', 'Bloc B') for i in range(size['amphis'])]
+    return copy_rows(cur, "salles", ["nom", "capacite", "type", "batiment"], salles)
+
+
+def gen_modules(cur, size, rng, fake):
+    formations = fetch_ids(cur, "SELECT id, nb_modules FROM formations ORDER BY id")
+    return copy_rows(cur, "modules", ["nom", "credits", "formation_id"], (
+        (f"{fake.word()} {k}", rng.randint(2, 6), fid)
+        for fid, nb in formations
+        for k in range(nb)
+    ))
+
+
+# Étudiants par shard : le découpage ne dépend pas du nombre de workers, donc un même
+# seed donne les mêmes données en séquentiel comme en parallèle
+SHARD_ETUDIANTS = 10_000
+
+
+def plan_shards(cur, size, rng, skew):
+    """Répartit les étudiants entre les formations puis regroupe des formations consécutives
+    en shards d'environ SHARD_ETUDIANTS étudiants, avec des plages d'id explicites.
+
+    Retourne la liste des tâches (shard, seed, premier_id, formations, effectifs,
+    module_ids, module_formations, poids) prêtes à être envoyées aux workers.
+    """
+    formation_ids = np.array([f for f, in fetch_ids(cur, "SELECT id FROM formations ORDER BY id")])
+    mods = np.array(fetch_ids(cur, "SELECT id, formation_id FROM modules ORDER BY id"), dtype=np.int64).reshape(-1, 2)
+    first_id = fetch_ids(cur, "SELECT COALESCE(MAX(id), 0) + 1 FROM etudiants")[0][0]
+
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+    effectifs = np_rng.multinomial(size['etudiants'], np.full(len(formation_ids), 1 / len(formation_ids)))
+    weights = np_rng.lognormal(0, skew, len(mods)) if skew > 0 else None
+    base_seed = rng.getrandbits(32)
+
+    # Coupe dès que le cumul dépasse un multiple de SHARD_ETUDIANTS
+    bounds = np.searchsorted(np.cumsum(effectifs), np.arange(SHARD_ETUDIANTS, size['etudiants'], SHARD_ETUDIANTS))
+    tasks = []
+    for shard, idx in enumerate(np.split(np.arange(len(formation_ids)), np.unique(bounds + 1))):
+        if not len(idx):
+            continue
+        keep = np.isin(mods[:, 1], formation_ids[idx])
+        tasks.append((shard, base_seed + shard, first_id, formation_ids[idx], effectifs[idx],
+                      mods[keep, 0], mods[keep, 1], None if weights is None else weights[keep]))
+        first_id += int(effectifs[idx].sum())
+    return tasks
+
+
+def gen_shard(cur, task, fake):
+    """Génère et charge les étudiants d'un shard puis leurs inscriptions.
+
+    Les id sont fixés par le plan (pas de SERIAL) : les shards s'insèrent en parallèle
+    sans se marcher dessus. Retourne (nb_etudiants, nb_inscriptions).
+    """
+    shard, seed, first_id, formations, effectifs, module_ids, module_formations, weights = task
+    rng = random.Random(seed)
+    fake.seed_instance(seed)
+
+    ids = np.arange(first_id, first_id + int(effectifs.sum()))
+    etu_formations = np.repeat(formations, effectifs)
+    nb_etudiants = copy_rows(cur, "etudiants", ["id", "nom", "prenom", "formation_id", "promo"], (
+        (int(i), fake.last_name(), fake.first_name(), int(f), rng.randint(2022, 2025))
+        for i, f in zip(ids, etu_formations)
+    ))
+
+    nb_inscriptions = 0
+    for etu, mod in sample_inscriptions(ids, etu_formations, module_ids, module_formations,
+                                        weights=weights, rng=np.random.default_rng(seed)):
+        nb_inscriptions += copy_int_columns(cur, "inscriptions", ["etudiant_id", "module_id"], [etu, mod])
+    return nb_etudiants, nb_inscriptions
+
+
+# Connexion et Faker propres à chaque processus du pool
+_worker = {}
+
+
+def _init_worker():
+    conn = get_connection()
+    with conn.cursor() as cur:
+        cur.execute("SET exam.sans_version = 'on'")
+    conn.commit()
+    _worker['conn'] = conn
+    _worker['fake'] = Faker("fr_FR")
+    Finalize(None, conn.close, exitpriority=10)
+
+
+def _run_shard(task):
+    conn = _worker['conn']
+    cur = conn.cursor()
+    try:
+        counts = gen_shard(cur, task, _worker['fake'])
+        conn.commit()
+        return counts
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def resync_sequences(cur):
+    """Recale les séquences SERIAL après des insertions à id explicites"""
+    for table in TABLES:
+        if table == "inscriptions":
+            continue
+        cur.execute(f"""
+            SELECT setval(pg_get_serial_sequence('{table}', 'id'),
+                          COALESCE(MAX(id), 1), MAX(id) IS NOT NULL)
+            FROM {table}
+        """)
+
+
+# Ordre de dépendance des clés étrangères ; étudiants et inscriptions sont générés par shards
+STEPS = [
+    ("départements", gen_departements),
+    ("formations", gen_formations),
+    ("professeurs", gen_professeurs),
+    ("salles", gen_salles),
+    ("modules", gen_modules),
+]
+
+
+def generate(conn, preset='13k', seed=42, skew=1.0, clear=False, workers=1):
+    """Remplit departements → inscriptions pour un preset ; reproductible pour un même seed.
+
+    Les petites tables sont générées ici. Les étudiants et inscriptions sont découpés
+    en shards par formation : avec workers > 1, chaque shard est généré et chargé par
+    un processus du pool, sur sa propre connexion.
+    """
+    size = PRESETS[preset]
+    rng = random.Random(seed)
+    Faker.seed(seed)
+    fake = Faker("fr_FR")
+
+    cur = conn.cursor()
+    if clear:
+        reset(cur)
+
+    total_start = time.time()
+    for label, step in STEPS:
+        start_time = time.time()
+        n = step(cur, size, rng, fake)
+        report_throughput(label, n, start_time)
+
+    tasks = plan_shards(cur, size, rng, skew)
+    start_time = time.time()
+    if workers > 1:
+        # Les workers doivent voir formations et modules
+        conn.commit()
+        pool = Pool(workers, initializer=_init_worker)
+        try:
+            counts = pool.map(_run_shard, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        counts = [gen_shard(cur, task, fake) for task in tasks]
+    nb_etudiants = sum(c[0] for c in counts)
+    nb_inscriptions = sum(c[1] for c in counts)
+    report_throughput(f"étudiants ({len(tasks)} shards, {workers} workers)", nb_etudiants, start_time)
+    report_throughput("inscriptions", nb_inscriptions, start_time)
+
+    resync_sequences(cur)
+    cur.execute("CALL compacter_kpi_snapshot()")
+    # Les workers n'incrémentent pas data_version (voir maj_data_version)
+    cur.execute("CALL marquer_data_version(ARRAY['etudiants', 'inscriptions'])")
+    conn.commit()
+    cur.close()
+    print(f"\n✅ Campus '{preset}' généré en {time.time() - total_start:.2f} secondes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génération d'un campus synthétique")
+    parser.add_argument("--preset", default="13k", choices=sorted(PRESETS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skew", type=float, default=1.0,
+                        help="dispersion de la popularité des modules (0 = uniforme)")
+    parser.add_argument("--reset", action="store_true", help="vide les tables avant de générer")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processus de génération des étudiants/inscriptions (1 = séquentiel)")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        generate(conn, args.preset, args.seed, args.skew, args.reset, args.workers)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,96 @@
-import random
+import time
+import numpy as np
 from db import get_connection
+from bulk import copy_int_columns, report_throughput
 
-conn = get_connection()
-cur = conn.cursor()
+MODULES_PAR_ETUDIANT = 6
 
-cur.execute("""
-SELECT e.id, m.id
-FROM etudiants e
-JOIN modules m ON m.formation_id = e.formation_id
-""")
+# Étudiants traités par bloc : borne la mémoire (bloc x nb max de modules par formation)
+CHUNK_SIZE = 200_000
 
-mapping = {}
-for e,m in cur.fetchall():
-    mapping.setdefault(e, []).append(m)
 
-for e, mods in mapping.items():
-    for m in random.sample(mods, min(6,len(mods))):
-        cur.execute("INSERT INTO inscriptions VALUES (%s,%s)", (e,m))
+def formation_csr(module_ids, module_formations):
+    """Modules groupés par formation : (formations, indptr, modules) façon CSR"""
+    order = np.argsort(module_formations, kind='stable')
+    formations, counts = np.unique(module_formations[order], return_counts=True)
+    indptr = np.concatenate(([0], np.cumsum(counts)))
+    return formations, indptr, module_ids[order]
 
-conn.commit()
-cur.close()
-conn.close()
+
+def sample_inscriptions(etudiant_ids, etudiant_formations, module_ids, module_formations,
+                        k=MODULES_PAR_ETUDIANT, weights=None, rng=None, chunk_size=CHUNK_SIZE):
+    """Tire k modules sans remise dans la formation de chaque étudiant, par blocs vectorisés.
+
+    weights (un poids par module, optionnel) biaise le tirage : clé log(u)/w
+    (Efraimidis-Spirakis), les k plus grandes clés gagnent.
+    Génère des couples de tableaux (etudiant_ids, module_ids) par bloc ; rien
+    sans module ou avec k = 0.
+    """
+    rng = rng or np.random.default_rng()
+    etudiant_ids = np.asarray(etudiant_ids)
+    etudiant_formations = np.asarray(etudiant_formations)
+    module_ids = np.asarray(module_ids)
+    module_formations = np.asarray(module_formations)
+
+    order = np.argsort(module_formations, kind='stable')
+    formations, indptr, modules = formation_csr(module_ids, module_formations)
+    w = None if weights is None else np.asarray(weights, dtype=np.float64)[order]
+    counts = np.diff(indptr)
+    width = int(counts.max()) if len(counts) else 0
+    kk = min(k, width)
+    if kk <= 0:
+        return
+    cols = np.arange(width)
+
+    for start in range(0, len(etudiant_ids), chunk_size):
+        ids = etudiant_ids[start:start + chunk_size]
+        fpos = np.searchsorted(formations, etudiant_formations[start:start + chunk_size])
+        known = (fpos < len(formations)) & (formations[np.minimum(fpos, len(formations) - 1)] == etudiant_formations[start:start + chunk_size])
+        ids, fpos = ids[known], fpos[known]
+
+        n = counts[fpos]
+        valid = cols[None, :] < n[:, None]
+        flat = np.minimum(indptr[fpos][:, None] + cols[None, :], len(modules) - 1)
+
+        keys = np.log(rng.random((len(ids), width)))
+        if w is not None:
+            keys /= w[flat]
+        keys[~valid] = -np.inf
+
+        picks = np.argpartition(-keys, kk - 1, axis=1)[:, :kk]
+        picked_valid = np.take_along_axis(valid, picks, axis=1)
+        picked = np.take_along_axis(flat, picks, axis=1)
+
+        yield np.repeat(ids, kk)[picked_valid.ravel()], modules[picked][picked_valid]
+
+
+def load_inscriptions(cur, skew=0.0, rng=None):
+    """Génère et charge les inscriptions de tous les étudiants ; retourne le nombre de lignes.
+
+    skew > 0 donne à chaque module une popularité log-normale (écart-type skew).
+    """
+    rng = rng or np.random.default_rng()
+    cur.execute("SELECT id, formation_id FROM modules ORDER BY id")
+    mods = np.array(cur.fetchall(), dtype=np.int64).reshape(-1, 2)
+    cur.execute("SELECT id, formation_id FROM etudiants ORDER BY id")
+    etus = np.array(cur.fetchall(), dtype=np.int64).reshape(-1, 2)
+
+    weights = rng.lognormal(0, skew, len(mods)) if skew > 0 else None
+
+    total = 0
+    for etu, mod in sample_inscriptions(etus[:, 0], etus[:, 1], mods[:, 0], mods[:, 1], weights=weights, rng=rng):
+        total += copy_int_columns(cur, "inscriptions", ["etudiant_id", "module_id"], [etu, mod])
+    return total
+
+
+if __name__ == "__main__":
+    conn = get_connection()
+    cur = conn.cursor()
+    
+    start_time = time.time()
+    n = load_inscriptions(cur)
+    report_throughput("inscriptions", n, start_time)
+    
+    conn.commit()
+    cur.close()
+    conn.close()
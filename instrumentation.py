@@ -0,0 +1,81 @@
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def rss_max_mb():
+    """Pic de mémoire résidente du processus depuis son lancement (Mo), None si indisponible"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sous macOS, kilo-octets sous Linux
+    return round(rss / 2**20 if sys.platform == 'darwin' else rss / 2**10, 1)
+
+
+class PhaseTimer:
+    """Mesures par phase : durée, mémoire et compteurs (lignes, arêtes...).
+
+    with timer.phase('coloring') as m:
+        ...
+        m['couleurs'] = nb
+
+    Toujours : durée (s) et pic RSS du processus (Mo) en fin de phase.
+    trace_memory=True ajoute le pic d'allocations Python de la phase (tracemalloc,
+    précis mais ralentit nettement le code Python). profile=chemin enregistre un
+    profil cProfile de toutes les phases (lisible avec pstats ou snakeviz).
+    """
+
+    def __init__(self, trace_memory=False, profile=None):
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.phases = {}
+        self._profiler = cProfile.Profile() if profile else None
+
+    @contextmanager
+    def phase(self, name):
+        mesures = {}
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self._profiler:
+            self._profiler.enable()
+        t0 = time.perf_counter()
+        try:
+            yield mesures
+        finally:
+            duree = time.perf_counter() - t0
+            if self._profiler:
+                self._profiler.disable()
+            self.phases[name] = dict(secondes=round(duree, 4), rss_max_mb=rss_max_mb(), **mesures)
+            if self.trace_memory:
+                self.phases[name]['py_pic_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+
+    def timings(self):
+        """Durée de chaque phase terminée (s)"""
+        return {name: m['secondes'] for name, m in self.phases.items()}
+
+    def to_dict(self):
+        return {
+            'phases': self.phases,
+            'total_secondes': round(sum(m['secondes'] for m in self.phases.values()), 4),
+        }
+
+    def close(self):
+        """Arrête tracemalloc et écrit le profil cProfile s'il est demandé"""
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if self._profiler:
+            self._profiler.dump_stats(self.profile)
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
@@ -0,0 +1,273 @@
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+
+def _color_counts(indptr, indices, colors, k):
+    """adj[v, c] = nombre de voisins de v de couleur c"""
+    src = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    adj = np.zeros((len(indptr) - 1, k), dtype=np.int32)
+    np.add.at(adj, (src, colors[indices]), 1)
+    return adj
+
+
+def _tabucol(indptr, indices, colors, k, deadline, rng):
+    """Cherche une coloration propre en k couleurs (TabuCol) à partir de colors.
+
+    Les noeuds de couleur >= k sont d'abord reportés sur leur couleur la moins
+    conflictuelle. Retourne la coloration trouvée, ou None à l'échéance.
+    """
+    colors = colors.copy()
+    ptr = indptr.tolist()
+    idx = indices.tolist()
+    # Report des noeuds de la classe supprimée, un par un (adj suit les déplacements)
+    adj = _color_counts(indptr, indices, np.where(colors < k, colors, 0), k)
+    for v in np.flatnonzero(colors >= k).tolist():
+        old = 0
+        for u in idx[ptr[v]:ptr[v + 1]]:
+            adj[u, old] -= 1
+        c = int(np.argmin(adj[v]))
+        colors[v] = c
+        for u in idx[ptr[v]:ptr[v + 1]]:
+            adj[u, c] += 1
+
+    col = colors.tolist()
+    conflits = {v for v in range(len(col)) if adj[v, col[v]]}
+    nb_conflits = sum(int(adj[v, col[v]]) for v in conflits) // 2
+    meilleur = nb_conflits
+    if nb_conflits and k < 2:
+        return None
+    tabu = {}
+    iteration = 0
+    while nb_conflits:
+        iteration += 1
+        if iteration % 64 == 0 and time.perf_counter() > deadline:
+            return None
+        best_delta, best_moves = None, []
+        for v in conflits:
+            cur = adj[v, col[v]]
+            for c in range(k):
+                if c == col[v]:
+                    continue
+                delta = int(adj[v, c]) - int(cur)
+                if tabu.get((v, c), 0) > iteration and nb_conflits + delta >= meilleur:
+                    continue
+                if best_delta is None or delta < best_delta:
+                    best_delta, best_moves = delta, [(v, c)]
+                elif delta == best_delta:
+                    best_moves.append((v, c))
+        if best_moves:
+            v, c = rng.choice(best_moves)
+        else:
+            # Tous les mouvements sont tabous : un mouvement au hasard plutôt que
+            # d'attendre l'échéance sans rien changer
+            v = rng.choice(sorted(conflits))
+            c = rng.choice([c for c in range(k) if c != col[v]])
+            best_delta = int(adj[v, c]) - int(adj[v, col[v]])
+        old = col[v]
+        col[v] = c
+        for u in idx[ptr[v]:ptr[v + 1]]:
+            adj[u, old] -= 1
+            adj[u, c] += 1
+            if adj[u, col[u]]:
+                conflits.add(u)
+            else:
+                conflits.discard(u)
+        if adj[v, c]:
+            conflits.add(v)
+        else:
+            conflits.discard(v)
+        nb_conflits += best_delta
+        meilleur = min(meilleur, nb_conflits)
+        tabu[(v, old)] = iteration + int(0.6 * len(conflits)) + rng.randrange(10)
+    return np.asarray(col, dtype=np.int32)
+
+
+def clique_bound(indptr, indices, essais=64):
+    """Taille d'une clique trouvée gloutonnement depuis les noeuds de plus haut degré.
+
+    Minorant du nombre de couleurs : une coloration qui l'atteint est optimale.
+    """
+    ptr = indptr.tolist()
+    idx = indices.tolist()
+    deg = np.diff(indptr)
+    meilleure = 1 if len(deg) else 0
+    for v in np.argsort(-deg, kind='stable')[:essais].tolist():
+        clique = [v]
+        candidats = set(idx[ptr[v]:ptr[v + 1]])
+        for u in sorted(candidats, key=lambda u: -deg[u]):
+            if u in candidats:
+                clique.append(u)
+                candidats &= set(idx[ptr[u]:ptr[u + 1]])
+        meilleure = max(meilleure, len(clique))
+    return meilleure
+
+
+def reduce_colors(indptr, indices, colors, deadline, seed=0):
+    """Supprime des classes de couleur tant que TabuCol trouve une coloration propre avant deadline"""
+    rng = random.Random(seed)
+    minimum = clique_bound(indptr, indices)
+    while time.perf_counter() < deadline:
+        k = int(colors.max()) + 1 if len(colors) else 0
+        if k <= max(1, minimum):
+            break
+        # La plus petite classe est renumérotée en dernier, puis répartie sur les autres
+        taille = np.bincount(colors, minlength=k)
+        ordre = np.argsort(-taille, kind='stable')
+        rang = np.empty(k, dtype=np.int32)
+        rang[ordre] = np.arange(k, dtype=np.int32)
+        essai = _tabucol(indptr, indices, rang[colors], k - 1, deadline, rng)
+        if essai is None:
+            break
+        colors = essai
+    return colors
+
+
+def _kempe_chain(ptr, idx, col, v, a, b):
+    """Composante de v dans le sous-graphe des couleurs a et b"""
+    chaine = {v}
+    file = deque([v])
+    while file:
+        x = file.popleft()
+        for u in idx[ptr[x]:ptr[x + 1]]:
+            if u not in chaine and col[u] in (a, b):
+                chaine.add(u)
+                file.append(u)
+    return chaine
+
+
+def _respects_precedence(chaine, col, a, b, pre, enfants):
+    """Après échange des couleurs a et b sur la chaîne, chaque prérequis reste avant ses dépendants"""
+    def nouvelle(x):
+        if x in chaine:
+            return b if col[x] == a else a
+        return col[x]
+    for u in chaine:
+        c = nouvelle(u)
+        if pre[u] >= 0 and nouvelle(pre[u]) >= c:
+            return False
+        if any(nouvelle(d) <= c for d in enfants.get(u, ())):
+            return False
+    return True
+
+
+def balance_colors(indptr, indices, colors, weights, capacity, deadline, k=None, prereq=None):
+    """Rééquilibre la charge des classes par déplacements simples et échanges de chaînes de Kempe.
+
+    La charge d'une classe est la somme des poids de ses noeuds. On réduit d'abord
+    le dépassement de capacity, puis la somme des carrés des charges. k (>= nombre
+    de couleurs) autorise des classes supplémentaires, vides au départ. Chaque
+    échange de Kempe garde la coloration propre ; avec prereq (position du
+    prérequis de chaque noeud, -1 sinon), il garde aussi chaque prérequis sur une
+    couleur plus petite que ses dépendants.
+    """
+    k = max(k or 0, int(colors.max()) + 1 if len(colors) else 0)
+    ptr = indptr.tolist()
+    idx = indices.tolist()
+    col = colors.tolist()
+    poids = [float(w) for w in weights]
+    charge = [0.0] * k
+    for v, c in enumerate(col):
+        charge[c] += poids[v]
+    par_poids = sorted(range(len(col)), key=lambda v: -poids[v])
+    membres = [[] for _ in range(k)]
+    for v in par_poids:
+        membres[col[v]].append(v)
+
+    def cout(a, b):
+        return sum(max(0.0, charge[c] - capacity) for c in (a, b)), charge[a] ** 2 + charge[b] ** 2
+
+    pre = np.asarray(prereq).tolist() if prereq is not None else None
+    enfants = {}
+    if pre is not None:
+        for v, p in enumerate(pre):
+            if p >= 0:
+                enfants.setdefault(p, []).append(v)
+
+    bloquees = set()
+    while time.perf_counter() < deadline:
+        candidates = [c for c in range(k) if c not in bloquees]
+        if not candidates:
+            break
+        h = max(candidates, key=charge.__getitem__)
+        ameliore = False
+        for cible in sorted(range(k), key=charge.__getitem__):
+            if cible == h or charge[cible] >= charge[h]:
+                break
+            # Une passe sur la classe h : chaque chaîne qui améliore est échangée aussitôt
+            for v in list(membres[h]):
+                if col[v] != h:
+                    continue
+                chaine = _kempe_chain(ptr, idx, col, v, h, cible)
+                transfert = sum(poids[u] if col[u] == h else -poids[u] for u in chaine)
+                if transfert <= 0:
+                    continue
+                if pre is not None and not _respects_precedence(chaine, col, h, cible, pre, enfants):
+                    continue
+                avant = cout(h, cible)
+                charge[h] -= transfert
+                charge[cible] += transfert
+                if cout(h, cible) < avant:
+                    for u in chaine:
+                        col[u] = cible if col[u] == h else h
+                    ameliore = True
+                else:
+                    charge[h] += transfert
+                    charge[cible] -= transfert
+            if ameliore:
+                break
+        if ameliore:
+            # Membres recalculés après la passe (ordre par poids décroissant conservé)
+            membres = [[] for _ in range(k)]
+            for v in par_poids:
+                membres[col[v]].append(v)
+            bloquees.clear()
+        else:
+            bloquees.add(h)
+
+    # Couleurs renumérotées sans trou (des classes peuvent s'être vidées)
+    colors = np.asarray(col, dtype=np.int32)
+    utilisees = np.unique(colors)
+    return np.searchsorted(utilisees, colors).astype(np.int32)
+
+
+def improve_coloring(indptr, indices, colors, weights=None, capacity=None, budget=1.0, seed=0, prereq=None):
+    """Recherche locale après la coloration gloutonne, dans un budget de temps (s).
+
+    1. TabuCol retire des classes de couleur (des jours d'examens) tant qu'il trouve
+       une coloration propre, sur au plus la moitié du budget ;
+    2. le reste du budget équilibre la charge par classe (nombre d'examens, ou
+       weights, ex. places nécessaires). Avec capacity (charge qu'un jour absorbe),
+       des classes sont ajoutées si la charge totale l'exige, pour éviter les jours
+       de débordement.
+    Avec prereq (voir balance_colors), l'ordre des couleurs porte les prérequis :
+    l'étape 1, qui renumérote les classes, est sautée.
+    Retourne (couleurs, mesures).
+    """
+    t0 = time.perf_counter()
+    deadline = t0 + budget
+    colors = np.asarray(colors, dtype=np.int32)
+    avant = int(colors.max()) + 1 if len(colors) else 0
+    weights = np.ones(len(colors)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    if prereq is None:
+        colors = reduce_colors(indptr, indices, colors, t0 + budget / 2, seed)
+    retirees = avant - (int(colors.max()) + 1 if len(colors) else 0)
+
+    k = int(colors.max()) + 1 if len(colors) else 0
+    if capacity:
+        k = max(k, int(np.ceil(weights.sum() / capacity)))
+    else:
+        capacity = float('inf')
+    colors = balance_colors(indptr, indices, colors, weights, capacity, deadline, k, prereq)
+
+    charges = np.bincount(colors, weights=weights) if len(colors) else np.zeros(0)
+    return colors, dict(
+        couleurs_avant=avant,
+        couleurs_retirees=retirees,
+        couleurs=int(colors.max()) + 1 if len(colors) else 0,
+        charge_max=round(float(charges.max()), 1) if len(charges) else 0,
+        secondes_recherche=round(time.perf_counter() - t0, 3),
+    )
@@ -1,18 +1,21 @@
 from faker import Faker
 import random
+import time
 from db import get_connection
+from bulk import copy_rows, report_throughput
 
 fake = Faker()
 conn = get_connection()
 cur = conn.cursor()
 
+start_time = time.time()
 cur.execute("SELECT id, nb_modules FROM formations")
-for fid, nb in cur.fetchall():
-    for _ in range(nb):
-        cur.execute("""
-        INSERT INTO modules (nom, credits, formation_id)
-        VALUES (%s,%s,%s)
-        """, (fake.word(), random.randint(2,6), fid))
+n = copy_rows(cur, "modules", ["nom", "credits", "formation_id"], (
+    (fake.word(), random.randint(2,6), fid)
+    for fid, nb in cur.fetchall()
+    for _ in range(nb)
+))
+report_throughput("modules", n, start_time)
 
 conn.commit()
 cur.close()
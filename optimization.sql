@@ -6,9 +6,35 @@ CREATE INDEX IF NOT EXISTS idx_inscriptions_module ON inscriptions(module_id);
 CREATE INDEX IF NOT EXISTS idx_salles_amphi ON salles(capacite) WHERE type = 'amphi';
 CREATE INDEX IF NOT EXISTS idx_salles_salle ON salles(capacite) WHERE type = 'salle';
 
--- Index sur les examens pour vérifier les conflits de date
-CREATE INDEX IF NOT EXISTS idx_examens_date ON examens(date_heure);
-CREATE INDEX IF NOT EXISTS idx_examens_prof ON examens(prof_id);
+-- Index sur les examens pour vérifier les conflits de date ; (date_heure, id) sert
+-- aussi la pagination par clé de la liste d'administration
+CREATE INDEX IF NOT EXISTS idx_examens_date_id ON examens(date_heure, id);
+DROP INDEX IF EXISTS idx_examens_date;
+-- Liste filtrée par salle, dans l'ordre de pagination
+CREATE INDEX IF NOT EXISTS idx_examens_salle_date ON examens(salle_id, date_heure, id);
+
+-- Index d'expression pour le contrôle ensembliste de check_exam_etudiant
+-- (examens d'un module un jour donné, examens d'un jour donné)
+CREATE INDEX IF NOT EXISTS idx_examens_module_jour ON examens(module_id, (DATE(date_heure)));
+CREATE INDEX IF NOT EXISTS idx_examens_jour ON examens((DATE(date_heure)));
+
+-- Lignes anormales de student_day_load (conflit nb > 1, ou nb = 0 à nettoyer) :
+-- index partiel minuscule, c'est le lookup du contrôle de conflits
+CREATE INDEX IF NOT EXISTS idx_charge_anomalies ON student_day_load(jour) WHERE nb <> 1;
+
+-- Consultation des plannings personnels (consultation.py) :
+-- examens d'un module triés par date, et surveillances d'un professeur par date.
+-- Côté étudiant, la clé primaire d'inscriptions (etudiant_id, module_id) sert
+-- déjà d'index couvrant : pas d'index supplémentaire.
+CREATE INDEX IF NOT EXISTS idx_examens_module_date ON examens(module_id, date_heure)
+    INCLUDE (salle_id, duree_minutes);
+CREATE INDEX IF NOT EXISTS idx_examens_prof_date ON examens(prof_id, date_heure);
+DROP INDEX IF EXISTS idx_examens_prof;
+
+-- Recherche par préfixe (LIKE 'texte%') : en collation "C", comme text_pattern_ops,
+-- mais l'index rend aussi les lignes triées (ORDER BY ... LIMIT sans tri)
+CREATE INDEX IF NOT EXISTS idx_etudiants_recherche ON etudiants((lower(nom || ' ' || prenom) COLLATE "C"));
+CREATE INDEX IF NOT EXISTS idx_professeurs_recherche ON professeurs((lower(nom) COLLATE "C"));
 
 -- Procédure pour nettoyer le planning actuel
 CREATE OR REPLACE PROCEDURE clear_planning()
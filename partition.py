@@ -0,0 +1,102 @@
+import heapq
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from coloring import color_csr
+
+# 'composantes' : composantes connexes du graphe, aucune arête entre partitions ;
+# 'departement' : un bloc par département, les arêtes transverses sont réparées après coup
+PARTITIONS = ('composantes', 'departement')
+
+
+def _matrix(graph):
+    n = len(graph.module_ids)
+    return sp.csr_matrix((graph.weights, graph.indices, graph.indptr), shape=(n, n))
+
+
+def partition_nodes(graph, node_depts, nb_parts, by='composantes'):
+    """Répartit les noeuds du graphe en au plus nb_parts groupes de travail équilibrés.
+
+    Les blocs (composantes ou départements) ne sont jamais coupés ; le plus gros
+    bloc va au groupe le moins chargé (coût = noeuds + arêtes). Retourne une
+    liste de tableaux de positions de noeuds, triés.
+    """
+    if by == 'composantes':
+        _, labels = connected_components(_matrix(graph), directed=False)
+    elif by == 'departement':
+        labels = np.unique(np.asarray(node_depts), return_inverse=True)[1]
+    else:
+        raise ValueError(f"Partition inconnue : {by} (attendu : {', '.join(PARTITIONS)})")
+
+    cout = np.bincount(labels, weights=np.diff(graph.indptr) + 1)
+    charges = [(0.0, p) for p in range(max(1, nb_parts))]
+    bloc_part = np.empty(len(cout), dtype=np.int32)
+    for bloc in np.argsort(-cout, kind='stable').tolist():
+        charge, p = heapq.heappop(charges)
+        bloc_part[bloc] = p
+        heapq.heappush(charges, (charge + cout[bloc], p))
+
+    part_of = bloc_part[labels]
+    parts = [np.flatnonzero(part_of == p) for p in range(max(1, nb_parts))]
+    return [nodes for nodes in parts if len(nodes)]
+
+
+def subgraph(graph, nodes):
+    """Sous-graphe induit par nodes, en CSR int32 (noeuds renumérotés dans l'ordre de nodes)"""
+    sub = _matrix(graph)[nodes][:, nodes]
+    return sub.indptr.astype(np.int32), sub.indices.astype(np.int32)
+
+
+def cross_edges(graph, parts):
+    """Nombre d'arêtes reliant deux partitions différentes"""
+    part_of = np.empty(len(graph.module_ids), dtype=np.int32)
+    for p, nodes in enumerate(parts):
+        part_of[nodes] = p
+    src = np.repeat(np.arange(len(graph.module_ids)), np.diff(graph.indptr))
+    return int((part_of[src] != part_of[graph.indices]).sum()) // 2
+
+
+def repair(graph, colors):
+    """Recolore les noeuds de même couleur qu'un voisin de plus petite position.
+
+    Chaque noeud repris prend la plus petite couleur absente de son voisinage
+    courant : la coloration est propre en sortie. Sans arête en conflit, rien ne change.
+    """
+    src = np.repeat(np.arange(len(graph.module_ids)), np.diff(graph.indptr))
+    en_conflit = (colors[src] == colors[graph.indices]) & (src > graph.indices)
+    a_reprendre = np.unique(src[en_conflit]).tolist()
+    if not a_reprendre:
+        return colors, 0
+
+    colors = colors.copy()
+    ptr = graph.indptr
+    for v in a_reprendre:
+        used = set(colors[graph.indices[ptr[v]:ptr[v + 1]]].tolist())
+        c = 0
+        while c in used:
+            c += 1
+        colors[v] = c
+    return colors, len(a_reprendre)
+
+
+def color_partitions(graph, parts, strategy='largest_first'):
+    """Colore chaque partition séparément puis fusionne les couleurs.
+
+    Les partitions recommencent toutes à la couleur 0 : une même couleur (un même
+    jour) regroupe des modules de plusieurs partitions, comme en coloration
+    séquentielle. Retourne (couleur par noeud, nombre de noeuds réparés).
+
+    Pas de processus parallèles : la coloration CSR du graphe entier prend
+    quelques dizaines de ms à 200k étudiants, moins que l'envoi des sous-graphes
+    à un pool (voir bench_partition.py), et l'affectation des salles, phase la
+    plus chère, partage salles et surveillants entre toutes les partitions.
+    """
+    results = [color_csr(indptr, indices, strategy) for indptr, indices in
+               (subgraph(graph, nodes) for nodes in parts)]
+
+    colors = np.empty(len(graph.module_ids), dtype=np.int32)
+    for nodes, sub_colors in zip(parts, results):
+        colors[nodes] = sub_colors
+    return repair(graph, colors)
@@ -0,0 +1,69 @@
+import bisect
+
+
+class RoomAllocator:
+    """Occupation des salles par créneau : chaque clé (jour, heure) a sa liste triée de salles libres.
+
+    Les salles sont attribuées en Best Fit (recherche par bisect) ; un examen trop
+    gros pour une seule salle est réparti sur plusieurs salles, des plus grandes
+    vers la plus petite suffisante.
+    """
+
+    def __init__(self, salle_ids, capacites):
+        self._salles = sorted(zip(capacites, salle_ids))
+        self._capacite_totale = sum(capacites)
+        self._free = {}
+        self._free_cap = {}
+
+    def _free_list(self, key):
+        free = self._free.get(key)
+        if free is None:
+            free = self._free[key] = list(self._salles)
+            self._free_cap[key] = self._capacite_totale
+        return free
+
+    def free_capacity(self, key):
+        """Places encore libres sur le créneau"""
+        self._free_list(key)
+        return self._free_cap[key]
+
+    def reserve(self, key, salle_id):
+        """Marque une salle comme occupée (planning existant)"""
+        free = self._free_list(key)
+        for i, (cap, sid) in enumerate(free):
+            if sid == salle_id:
+                del free[i]
+                self._free_cap[key] -= cap
+                return True
+        return False
+
+    def allocate(self, key, nb_etudiants, force=False):
+        """Réserve des salles pour nb_etudiants sur le créneau key.
+
+        Retourne la liste des salle_id, ou None si les places libres ne suffisent
+        pas. Avec force=True, prend toutes les salles libres restantes.
+        """
+        free = self._free_list(key)
+        if not free:
+            return None
+        if self._free_cap[key] < nb_etudiants and not force:
+            return None
+
+        chosen = []
+        remaining = nb_etudiants
+        while free and remaining > 0:
+            # Plus petite salle suffisante, sinon la plus grande et on continue
+            pos = bisect.bisect_left(free, (remaining, -1))
+            cap, sid = free.pop(pos if pos < len(free) else -1)
+            self._free_cap[key] -= cap
+            chosen.append(sid)
+            remaining -= cap
+        return chosen
+
+    def release(self, key, salle_ids):
+        """Libère des salles sur le créneau"""
+        free = self._free_list(key)
+        for cap, sid in self._salles:
+            if sid in salle_ids:
+                bisect.insort(free, (cap, sid))
+                self._free_cap[key] += cap
@@ -1,13 +1,85 @@
+import numpy as np
 import pandas as pd
-import networkx as nx
 import psycopg2
 from db import get_connection
+from bulk import read_int_columns
+from conflict_graph import build_conflict_csr, to_networkx
+from coloring import PRECEDENCE_STRATEGIES, greedy_color, precedence_color, precedence_levels
+from partition import PARTITIONS, color_partitions, cross_edges, partition_nodes
+from local_search import improve_coloring
+from scoring import PlanScorer, plan_arrays
+from rooms import RoomAllocator
+from instrumentation import PhaseTimer
 from datetime import datetime, timedelta
+from collections import deque, namedtuple
+from contextlib import contextmanager
 import random
 
+# Contrainte du trigger check_exam_prof
+MAX_EXAMENS_PROF_JOUR = 3
+
+# Durées autorisées par le CHECK de examens.duree_minutes
+DUREES_AUTORISEES = (60, 90, 120)
+
+# Grilles de créneaux : (heure, minute, durée en minutes)
+GRILLES = {
+    '2x90': [(9, 0, 90), (14, 0, 90)],
+    '4': [(8, 30, 90), (10, 30, 90), (13, 30, 120), (16, 0, 60)],
+}
+CRENEAUX = GRILLES['2x90']
+
+# Étudiants par COPY lors du chargement des inscriptions (borne le buffer binaire)
+INSCRIPTIONS_TRANCHE = 200_000
+
+# Inscriptions en colonnes int32 triées par étudiant
+Inscriptions = namedtuple("Inscriptions", ["etudiant_ids", "module_ids"])
+
+# Phases de generate(), dans l'ordre, avec leur libellé pour l'interface
+PHASES = [
+    ('load_data', "Chargement des données"),
+    ('conflict_graph', "Graphe de conflits"),
+    ('coloring', "Coloration"),
+    ('assign_resources', "Affectation des salles et surveillants"),
+    ('local_search', "Recherche locale"),
+    ('insert', "Insertion du planning"),
+]
+
+# 'day' : une couleur = un jour ; 'day_slot' : chaque module va au premier (jour, créneau)
+# sans voisin ce jour-là et avec assez de salles et de profs libres
+MODES = ('day', 'day_slot')
+
 class ExamScheduler:
-    def __init__(self):
-        self.conn = get_connection()
+    def __init__(self, strategy='largest_first', coloring_engine='native', conn=None, slots=None, mode='day',
+                 search_budget=0.0, precedence=True, partition=None, partition_parts=4):
+        # Connexion ouverte au premier accès BDD si non fournie
+        self.conn = conn
+        # Coloration : 'largest_first', 'dsatur' ou 'smallest_last' ; moteur 'native' (CSR) ou 'networkx'
+        self.strategy = strategy
+        self.coloring_engine = coloring_engine
+        # Budget (s) de la recherche locale après la coloration, 0 pour la désactiver
+        self.search_budget = search_budget
+        # Prérequis (modules.pre_req_id) examinés avant les modules qui en dépendent
+        self.precedence = precedence
+        # Coloration par blocs (partition.PARTITIONS) puis réparation des arêtes
+        # transverses ; None colore le graphe entier
+        if partition is not None and partition not in PARTITIONS:
+            raise ValueError(f"Partition inconnue : {partition} (attendu : {', '.join(PARTITIONS)})")
+        self.partition = partition
+        self.partition_parts = partition_parts
+        
+        self.slots = list(slots or CRENEAUX)
+        for hour, minute, duree in self.slots:
+            if duree not in DUREES_AUTORISEES:
+                raise ValueError(f"Durée de créneau {duree} min non autorisée (attendu : {DUREES_AUTORISEES})")
+        self.slots.sort()
+        if mode not in MODES:
+            raise ValueError(f"Mode inconnu : {mode} (attendu : {', '.join(MODES)})")
+        self.mode = mode
+        # Suivi de generate() : callback de progression, durée et mesures de chaque phase
+        self.progress = None
+        self.timings = {}
+        self.metrics = PhaseTimer()
+        
         self.start_date = datetime.now().replace(hour=8, minute=30, second=0, microsecond=0) + timedelta(days=7)
         # Sauts les weekends
         while self.start_date.weekday() > 4:
@@ -15,19 +87,19 @@ class ExamScheduler:
             
     def load_data(self):
         """Charge les données nécessaires depuis la BDD"""
+        if self.conn is None:
+            self.conn = get_connection()
+            
         # Récupérer les modules et leur durée
         self.modules = pd.read_sql("""
-            SELECT m.id, m.nom, m.credits, m.formation_id, f.dept_id,
-                   COUNT(i.etudiant_id) as nb_inscrits
+            SELECT m.id, m.nom, m.credits, m.formation_id, f.dept_id, m.nb_inscrits, m.pre_req_id
             FROM modules m
             JOIN formations f ON f.id = m.formation_id
-            LEFT JOIN inscriptions i ON i.module_id = m.id
-            GROUP BY m.id, m.nom, m.credits, f.dept_id
-            ORDER BY nb_inscrits DESC
+            ORDER BY m.nb_inscrits DESC
         """, self.conn)
         
-        # Récupérer les inscriptions pour le graphe de conflit
-        self.inscriptions = pd.read_sql("SELECT etudiant_id, module_id FROM inscriptions", self.conn)
+        # Récupérer les inscriptions pour le graphe de conflit (tableaux int32, triés par étudiant)
+        self.inscriptions = self.load_inscriptions()
         
         # Récupérer les salles
         self.salles = pd.read_sql("SELECT id, nom, capacite, type FROM salles ORDER BY capacite ASC", self.conn)
@@ -35,174 +107,734 @@ class ExamScheduler:
         # Récupérer les profs
         self.profs = pd.read_sql("SELECT id, nom, dept_id FROM professeurs", self.conn)
         
+        self.build_indexes()
+
+    def load_inscriptions(self, etudiants_par_tranche=INSCRIPTIONS_TRANCHE):
+        """Charge (etudiant_id, module_id) en colonnes int32 triées par étudiant.
+
+        COPY binaire par tranches d'id étudiant (parcours de la clé primaire) : le
+        buffer ne dépasse jamais une tranche et aucune ligne ne devient un objet
+        Python ; 8 octets par inscription au lieu d'un DataFrame int64.
+        """
+        cur = self.conn.cursor()
+        cur.execute("SELECT MIN(etudiant_id), MAX(etudiant_id) FROM inscriptions")
+        premier, dernier = cur.fetchone()
+        etudiants, modules = [], []
+        if premier is not None:
+            for debut in range(premier, dernier + 1, etudiants_par_tranche):
+                e, m = read_int_columns(cur, f"""
+                    SELECT etudiant_id, module_id FROM inscriptions
+                    WHERE etudiant_id >= {debut} AND etudiant_id < {debut + etudiants_par_tranche}
+                    ORDER BY etudiant_id, module_id
+                """, 2)
+                etudiants.append(e)
+                modules.append(m)
+        cur.close()
+        vide = np.empty(0, dtype=np.int32)
+        return Inscriptions(
+            np.concatenate(etudiants) if etudiants else vide,
+            np.concatenate(modules) if modules else vide,
+        )
+
+    def build_indexes(self):
+        """Précalcule les index utilisés par assign_resources (évite les filtres pandas par appel)"""
+        # module_id -> (nb_inscrits, dept_id)
+        self.module_index = dict(zip(
+            self.modules['id'].tolist(),
+            zip(self.modules['nb_inscrits'].tolist(), self.modules['dept_id'].tolist())
+        ))
+        
+        # Capacités pour le Best Fit de RoomAllocator (salles déjà triées par capacité)
+        self.salle_ids = self.salles['id'].tolist()
+        self.salle_capacites = self.salles['capacite'].tolist()
+        self.reset_occupancy()
+        
+        # Pools de profs par département, mélangés une fois pour l'équité
+        self.prof_ids = self.profs['id'].tolist()
+        self.prof_dept = dict(zip(self.prof_ids, self.profs['dept_id'].tolist()))
+        self.profs_by_dept = {}
+        for pid, dept in self.prof_dept.items():
+            self.profs_by_dept.setdefault(dept, []).append(pid)
+        for pool in self.profs_by_dept.values():
+            random.shuffle(pool)
+        
+        # Évaluateur des plannings (score_plan), construit au premier appel
+        self._scorer = None
+        
+        # module_id -> module prérequis (vide si precedence=False) ; prérequis inconnus ignorés
+        self.prereq = {}
+        if self.precedence:
+            for mid, pre in zip(self.modules['id'].tolist(), self.modules['pre_req_id'].tolist()):
+                if pd.notna(pre) and int(pre) in self.module_index:
+                    self.prereq[mid] = int(pre)
+        # Niveau topologique (0 sans prérequis) ; ValueError si les prérequis bouclent
+        ids = self.modules['id'].tolist()
+        pos = {mid: i for i, mid in enumerate(ids)}
+        levels = precedence_levels([pos.get(self.prereq.get(mid), -1) for mid in ids])
+        self.prereq_level = dict(zip(ids, levels.tolist()))
+        
+    def build_conflict_matrix(self):
+        """Construit le graphe de conflits en CSR (matrice de co-inscription Aᵀ·A)"""
+        # Poids = nombre d'étudiants communs
+        self.conflicts = build_conflict_csr(
+            self.modules['id'].to_numpy(),
+            self.inscriptions.etudiant_ids,
+            self.inscriptions.module_ids
+        )
+        self._module_pos = {mid: i for i, mid in enumerate(self.conflicts.module_ids.tolist())}
+        return self.conflicts
+
+    def _prereq_positions(self, module_ids):
+        """Position (dans le graphe de conflits) du prérequis de chaque module, -1 sinon"""
+        return np.array([self._module_pos.get(self.prereq.get(mid), -1) for mid in module_ids])
+
+    def color_with_precedence(self, graph):
+        """Coloration où chaque prérequis a une couleur (un jour) plus petite que ses dépendants
+        (coloring.precedence_color), retourne (coloring, stratégie utilisée).
+
+        Moteur natif seulement ; DSATUR, à l'ordre dynamique, est remplacé par largest_first.
+        """
+        strategy = self.strategy if self.strategy in PRECEDENCE_STRATEGIES else 'largest_first'
+        module_ids = graph.module_ids.tolist()
+        prereq = self._prereq_positions(module_ids)
+        colors = precedence_color(graph.indptr, graph.indices, prereq, strategy)
+        return dict(zip(module_ids, colors.tolist())), strategy
+
+    def color_partitioned(self, graph):
+        """Coloration par partition (composantes ou départements) fusionnée puis réparée
+        (partition.color_partitions), retourne (coloring, mesures).
+
+        Moteur natif seulement ; la coloration fusionnée est propre même quand des
+        arêtes relient deux partitions.
+        """
+        module_ids = graph.module_ids.tolist()
+        depts = [self.module_index[mid][1] for mid in module_ids]
+        parts = partition_nodes(graph, depts, self.partition_parts, self.partition)
+        colors, repares = color_partitions(graph, parts, self.strategy)
+        mesures = {'partition': self.partition, 'parties': len(parts),
+                   'aretes_transverses': cross_edges(graph, parts), 'repares': repares}
+        return dict(zip(module_ids, colors.tolist())), mesures
+
+    def score_plan(self, exam_records):
+        """Score du planning (scoring.PlanScorer) : écarts entre examens des étudiants,
+        équité des surveillances, remplissage des salles ; plus bas = meilleur"""
+        if self._scorer is None:
+            self._scorer = PlanScorer(
+                self.modules['id'].to_numpy(), self.modules['nb_inscrits'].to_numpy(),
+                self.inscriptions.etudiant_ids, self.inscriptions.module_ids,
+                self.salle_ids, self.salle_capacites, self.prof_ids,
+            )
+        return self._scorer.score(*plan_arrays(exam_records, self.start_date))
+
+    def rooms_needed(self, module_ids):
+        """Salles qu'occupe chaque module seul sur un créneau vide (Best Fit)"""
+        rooms = RoomAllocator(self.salle_ids, self.salle_capacites)
+        needed = []
+        for mid in module_ids:
+            salles = rooms.allocate(None, self.module_index[mid][0], force=True) or []
+            needed.append(len(salles))
+            rooms.release(None, salles)
+        return needed
+
+    def improve_plan(self, graph, coloring, exam_records, nb_jours):
+        """Recherche locale sur la coloration (local_search.improve_coloring), puis nouveau placement.
+
+        La charge d'une couleur est le nombre de salles de ses modules, la capacité
+        d'un jour le nombre de (salle, créneau). Le nouveau planning n'est gardé que
+        s'il tient en moins de jours, ou en autant de jours avec un meilleur score
+        (score_plan). Retourne (exam_records, nb_jours, mesures).
+        """
+        module_ids = graph.module_ids.tolist()
+        colors = np.array([coloring[mid] for mid in module_ids], dtype=np.int32)
+        colors, mesures = improve_coloring(
+            graph.indptr, graph.indices, colors,
+            weights=self.rooms_needed(module_ids),
+            capacity=len(self.salle_ids) * len(self.slots),
+            budget=self.search_budget,
+            prereq=self._prereq_positions(module_ids) if self.prereq else None,
+        )
+        records, jours = self.plan_exams(dict(zip(module_ids, colors.tolist())))
+        mesures.update(jours_avant=nb_jours, jours_gagnes=max(0, nb_jours - jours))
+        if (jours, self.score_plan(records)['total']) < (nb_jours, self.score_plan(exam_records)['total']):
+            return records, jours, mesures
+        return exam_records, nb_jours, mesures
+
+    def neighbours(self, module_id):
+        """Modules partageant au moins un étudiant avec module_id"""
+        p = self._module_pos[module_id]
+        g = self.conflicts
+        return g.module_ids[g.indices[g.indptr[p]:g.indptr[p + 1]]].tolist()
+
     def build_conflict_graph(self):
         """Construit le graphe de conflits entre modules (basé sur les étudiants communs)"""
-        G = nx.Graph()
-        G.add_nodes_from(self.modules['id'].tolist())
-        
-        # Group par étudiant pour trouver les modules conflictuels
-        student_modules = self.inscriptions.groupby('etudiant_id')['module_id'].apply(list)
-        
-        # Ajouter les arêtes
-        for modules in student_modules:
-            for i in range(len(modules)):
-                for j in range(i + 1, len(modules)):
-                    G.add_edge(modules[i], modules[j])
-                    
-        return G
-
-    def assign_resources(self, module_id, date_slot, time_slot_minutes, assigned_profs_count):
-        """Assigne une salle et un prof pour un créneau donné"""
-        module = self.modules[self.modules['id'] == module_id].iloc[0]
-        nb_etudiants = module['nb_inscrits']
-        
-        # 1. Trouver une salle
-        # On cherche la plus petite salle qui peut contenir les étudiants (Best Fit)
-        possible_salles = self.salles[self.salles['capacite'] >= nb_etudiants]
-        
-        if possible_salles.empty:
+        return to_networkx(self.build_conflict_matrix())
+
+    def _next_prof(self, dept, day, slot, assigned_profs_count):
+        """Prend le prochain prof du département sous la limite journalière et libre sur
+        ce créneau (file tournante par jour).
+
+        assigned_profs_count : (prof, jour) -> surveillances du jour, et
+        (prof, jour, créneau) présent si le prof surveille déjà sur ce créneau.
+        """
+        queue = self._prof_queues.get((dept, day))
+        if queue is None:
+            pool = self.profs_by_dept.get(dept, [])
+            queue = deque(pool)
+            queue.rotate(random.randrange(len(pool)) if pool else 0)
+            self._prof_queues[(dept, day)] = queue
+            
+        busy = []
+        chosen = None
+        while queue:
+            pid = queue.popleft()
+            load = assigned_profs_count.get((pid, day), 0)
+            if load >= MAX_EXAMENS_PROF_JOUR:
+                continue
+            if (pid, day, slot) in assigned_profs_count:
+                # Déjà en salle sur ce créneau : garde sa place dans la file
+                busy.append(pid)
+                continue
+            assigned_profs_count[(pid, day)] = load + 1
+            assigned_profs_count[(pid, day, slot)] = 1
+            # Remis en fin de file s'il peut encore surveiller ce jour
+            if load + 1 < MAX_EXAMENS_PROF_JOUR:
+                queue.append(pid)
+            chosen = pid
+            break
+        queue.extendleft(reversed(busy))
+        return chosen
+
+    def _choose_prof(self, dept_id, day, slot, assigned_profs_count):
+        """Prof du département en priorité, sinon d'un autre département ; None si aucun
+        prof n'est libre sur ce créneau sous la limite journalière"""
+        chosen_prof = self._next_prof(dept_id, day, slot, assigned_profs_count)
+        
+        if chosen_prof is None:
+            for other_dept in self.profs_by_dept:
+                if other_dept != dept_id:
+                    chosen_prof = self._next_prof(other_dept, day, slot, assigned_profs_count)
+                    if chosen_prof is not None:
+                        break
+        return chosen_prof
+
+    def _release_prof(self, pid, day, slot, assigned_profs_count):
+        """Annule une surveillance prise par _next_prof ; le prof retrouve sa place dans la file du jour"""
+        assigned_profs_count[(pid, day)] -= 1
+        del assigned_profs_count[(pid, day, slot)]
+        queue = self._prof_queues.get((self.prof_dept[pid], day))
+        if queue is not None and pid not in queue:
+            queue.append(pid)
+
+    def reset_occupancy(self):
+        """Vide l'occupation des salles, le compteur de surveillances par jour et les files de profs"""
+        self.rooms = RoomAllocator(self.salle_ids, self.salle_capacites)
+        self._day_load = {}
+        # (dept, jour) -> file tournante des profs encore disponibles ce jour
+        self._prof_queues = {}
+
+    def assign_resources(self, module_id, date_slot, time_slot_minutes, assigned_profs_count, force=False):
+        """Assigne des salles libres et un prof par salle pour un créneau donné
+
+        Retourne une liste de (salle_id, prof_id), vide si le créneau n'a plus assez
+        de places ou si les profs du jour ne suffisent pas. ValueError si même un
+        placement forcé (jour vide) manque de surveillants.
+        """
+        nb_etudiants, dept_id = self.module_index[module_id]
+        day = date_slot.date()
+        
+        # 1. Trouver des salles libres sur ce créneau
+        # Plus petite salle suffisante (Best Fit), sinon réparti sur plusieurs salles
+        key = (day, time_slot_minutes)
+        if force and self.rooms.free_capacity(key) < nb_etudiants:
             print(f"ALERTE: Aucune salle suffisante pour module {module_id} ({nb_etudiants} étudiants)")
-            # Fallback: prendre la plus grande
-            salle = self.salles.iloc[-1]
-        else:
-            salle = possible_salles.iloc[0]
+        salles = self.rooms.allocate(key, nb_etudiants, force=force)
+        if not salles:
+            return []
             
-        # 2. Trouver un prof
+        # Un surveillant par salle : assez de profs sous la limite journalière ?
+        profs_left = len(self.prof_ids) * MAX_EXAMENS_PROF_JOUR - self._day_load.get(day, 0)
+        if len(salles) > profs_left and not force:
+            self.rooms.release(key, salles)
+            return []
+        self._day_load[day] = self._day_load.get(day, 0) + len(salles)
+            
+        # 2. Trouver un prof par salle
         # Priorité: Département du module
-        # Contrainte: Max 3 examens par jour (vérifié via assigned_profs_count)
+        # Contrainte: Max 3 examens par jour et un seul créneau à la fois (via assigned_profs_count)
+        affectations = []
+        for salle_id in salles:
+            prof_id = self._choose_prof(dept_id, day, time_slot_minutes, assigned_profs_count)
+            if prof_id is None:
+                # Plus de prof libre sur ce créneau : créneau sauté comme sans salle,
+                # salles et surveillances déjà prises rendues
+                for _, pid in affectations:
+                    self._release_prof(pid, day, time_slot_minutes, assigned_profs_count)
+                self.rooms.release(key, salles)
+                self._day_load[day] -= len(salles)
+                if force:
+                    raise ValueError(f"Pas assez de surveillants pour le module {module_id} "
+                                     f"({len(salles)} salles sur un même créneau)")
+                return []
+            affectations.append((salle_id, prof_id))
+        return affectations
+
+    @staticmethod
+    def _skip_weekend(current_date):
+        if current_date.weekday() >= 5: # Samedi/Dimanche
+            current_date += timedelta(days=(7 - current_date.weekday()))
+        return current_date
+
+    def _place_module(self, mod_id, current_date, slot_order, prof_daily_load, exam_records, force=False):
+        """Essaie les créneaux du jour dans l'ordre donné ; True si le module a été placé"""
+        for i in slot_order:
+            hour, minute, duree = self.slots[i]
+            slot = current_date.replace(hour=hour, minute=minute)
+            assignments = self.assign_resources(mod_id, slot, hour * 60 + minute, prof_daily_load, force=force)
+            if assignments:
+                for salle_id, prof_id in assignments:
+                    exam_records.append((int(mod_id), int(prof_id), int(salle_id), slot, duree))
+                return True
+        return False
+
+    def _ready(self, mod_id, placed):
+        """True si le module n'a pas de prérequis ou si celui-ci est déjà placé"""
+        pre = self.prereq.get(mod_id)
+        return pre is None or pre in placed
+
+    def _place_day(self, day_modules, current_date, prof_daily_load, exam_records, force_first=False):
+        """Répartit les modules d'un jour sur les créneaux ; retourne ceux qui n'ont pas trouvé de salle"""
+        # Les modules d'une même couleur ne partagent aucun étudiant :
+        # ils peuvent tous avoir lieu le même jour, en parallèle, tant qu'il reste des salles.
+        left = []
+        n = len(self.slots)
+        for k, mod_id in enumerate(day_modules):
+            # Alternance basique pour répartir la charge salles, puis les autres créneaux si plein
+            order = [(k + i) % n for i in range(n)]
+            if self._place_module(mod_id, current_date, order, prof_daily_load, exam_records):
+                continue
+            if force_first and k == 0:
+                # Jour vide et module trop gros pour toutes les salles : on prend tout
+                self._place_module(mod_id, current_date, [0], prof_daily_load, exam_records, force=True)
+                continue
+            left.append(mod_id)
+        return left
+
+    def _require_resources(self):
+        if not self.salle_ids:
+            raise ValueError("Aucune salle : impossible de planifier les examens")
+        if not self.prof_ids:
+            raise ValueError("Aucun professeur : impossible de surveiller les examens")
+
+    def plan_exams(self, coloring):
+        """Place les modules sur des (jour, créneau) avec salles libres et profs.
+
+        Retourne (exam_records, nb_jours). ValueError sans aucune salle ou sans aucun
+        prof : aucun module ne pourrait être placé.
+        """
+        self._require_resources()
+        self.reset_occupancy()
+        if self.mode == 'day_slot':
+            return self._plan_day_slot(coloring)
+            
+        # Group modules by color (day)
+        days = {}
+        for node, color in coloring.items():
+            days.setdefault(color, []).append(node)
+            
+        exam_records = []
+        current_date = self.start_date
         
-        dept_match_profs = self.profs[self.profs['dept_id'] == module['dept_id']]
-        other_profs = self.profs[self.profs['dept_id'] != module['dept_id']]
+        # Tracking pour Profs (ProfID, Date) -> Count
+        prof_daily_load = {}
+        nb_jours = 0
+        pending = []
         
-        # Mélanger pour équité
-        candidates = pd.concat([dept_match_profs.sample(frac=1), other_profs.sample(frac=1)])
+        # Modules placés les jours précédents : un module attend que son prérequis le soit
+        placed = set()
         
-        chosen_prof = None
-        current_day_str = date_slot.strftime('%Y-%m-%d')
+        # Trier les jours pour l'ordre chrono
+        for color in sorted(days):
+            current_date = self._skip_weekend(current_date)
+            today = [m for m in days[color] if self._ready(m, placed)]
+            waiting = [m for m in days[color] if not self._ready(m, placed)]
+            left = self._place_day(today, current_date, prof_daily_load, exam_records)
+            placed.update(set(today) - set(left))
+            pending += left + waiting
+            current_date += timedelta(days=1)
+            nb_jours += 1
+            
+        # Modules sans salle libre : jours supplémentaires, sans deux modules en conflit le même jour
+        while pending:
+            current_date = self._skip_weekend(current_date)
+            today, rest, blocked = [], [], set()
+            for mod_id in pending:
+                if mod_id in blocked or not self._ready(mod_id, placed):
+                    rest.append(mod_id)
+                else:
+                    today.append(mod_id)
+                    blocked.update(self.neighbours(mod_id))
+            left = self._place_day(today, current_date, prof_daily_load, exam_records, force_first=True)
+            placed.update(set(today) - set(left))
+            pending = rest + left
+            current_date += timedelta(days=1)
+            nb_jours += 1
+            
+        return exam_records, nb_jours
+
+    def _plan_day_slot(self, coloring):
+        """Chaque module va au premier jour sans voisin ayant un créneau avec assez de salles.
+
+        La coloration ne sert qu'à l'ordre de traitement : un jour peut mélanger
+        plusieurs couleurs tant qu'aucun étudiant n'a deux examens ce jour-là.
+        """
+        exam_records = []
+        prof_daily_load = {}
+        module_day = {}
+        dates = []
         
-        for _, prof in candidates.iterrows():
-            pid = prof['id']
-            # Vérifier charge journalière (max 3)
-            if assigned_profs_count.get((pid, current_day_str), 0) < 3:
-                chosen_prof = prof
-                assigned_profs_count[(pid, current_day_str)] = assigned_profs_count.get((pid, current_day_str), 0) + 1
-                break
-                
-        if chosen_prof is None:
-            # Cas rare : tous les profs sont occupés ce jour là ?
-            # On prend un au hasard (le trigger sql bloquera si > 3, mais on essaie d'éviter)
-            chosen_prof = self.profs.sample(1).iloc[0]
+        for mod_id in sorted(coloring, key=coloring.get):
+            self._first_fit(mod_id, dates, module_day, prof_daily_load, exam_records)
+            
+        return exam_records, len(set(module_day.values()))
+
+    def _first_fit(self, mod_id, dates, module_day, prof_daily_load, exam_records):
+        """Place le module au premier jour de dates sans voisin et avec un créneau libre.
+
+        dates est prolongée au besoin (hors weekends) ; module_day reçoit l'indice du jour.
+        Le module est placé après le jour de son prérequis s'il est déjà planifié.
+        """
+        nbr_days = {module_day[n] for n in self.neighbours(mod_id) if n in module_day}
+        # Au plus tôt le lendemain du prérequis
+        pre = self.prereq.get(mod_id)
+        d = module_day[pre] + 1 if pre in module_day else 0
+        while True:
+            if d == len(dates):
+                previous = dates[-1] + timedelta(days=1) if dates else self.start_date
+                dates.append(self._skip_weekend(previous))
+            if d not in nbr_days:
+                day = dates[d].date()
+                # Best Fit entre créneaux : le moins de places libres d'abord
+                slot_order = sorted(
+                    range(len(self.slots)),
+                    key=lambda i: self.rooms.free_capacity((day, self.slots[i][0] * 60 + self.slots[i][1]))
+                )
+                if self._place_module(mod_id, dates[d], slot_order, prof_daily_load, exam_records):
+                    break
+                if self._day_load.get(day, 0) == 0:
+                    # Jour vide et module trop gros pour toutes les salles : on prend tout
+                    self._place_module(mod_id, dates[d], slot_order[-1:], prof_daily_load, exam_records, force=True)
+                    break
+            d += 1
+        module_day[mod_id] = d
+        return d
+
+    def load_planning(self):
+        """Charge les examens déjà planifiés"""
+        return pd.read_sql("""
+            SELECT id, module_id, prof_id, salle_id, date_heure, duree_minutes
+            FROM examens
+            ORDER BY date_heure, id
+        """, self.conn)
+
+    def plan_changes(self, planning, module_ids=(), depth=0):
+        """Replanifie seulement les modules touchés et calcule le diff minimal avec planning.
+
+        Sont touchés : module_ids, les modules sans examen, et ceux dont la salle ou
+        le prof n'existe plus. depth=1 libère aussi leurs voisins de conflit. Les
+        modules qui dépendent (même indirectement) d'un module touché le sont aussi :
+        _first_fit ne borne le jour que par le bas, un prérequis replanifié pourrait
+        sinon tomber le jour d'un dépendant resté en place, ou après. Les autres
+        examens restent en place et bloquent salles, profs et jours.
+        Retourne une liste de (requête SQL, paramètres) : au plus un DELETE, un UPDATE
+        et un INSERT multi-lignes ; self.diff_counts donne le nombre de lignes de chacun.
+        """
+        self._require_resources()
+        known_salles = set(self.salle_ids)
+        known_profs = set(self.prof_ids)
+        
+        affected = set(module_ids)
+        planned = set(planning['module_id'].tolist())
+        affected |= set(self.module_index) - planned
+        broken = planning[~planning['salle_id'].isin(known_salles) | ~planning['prof_id'].isin(known_profs)]
+        affected |= set(broken['module_id'].tolist())
+        for _ in range(depth):
+            affected |= {n for m in list(affected) for n in self.neighbours(m)}
+        dependents = {}
+        for mid, pre in self.prereq.items():
+            dependents.setdefault(pre, []).append(mid)
+        stack = list(affected)
+        while stack:
+            for child in dependents.get(stack.pop(), ()):
+                if child not in affected:
+                    affected.add(child)
+                    stack.append(child)
+            
+        # Occupation des examens conservés
+        self.reset_occupancy()
+        prof_daily_load = {}
+        fixed = planning[~planning['module_id'].isin(affected) & planning['module_id'].isin(list(self.module_index))]
+        day_starts = sorted({dh.to_pydatetime().replace(hour=0, minute=0, second=0, microsecond=0) for dh in fixed['date_heure']})
+        dates = [d.replace(hour=self.start_date.hour, minute=self.start_date.minute) for d in day_starts]
+        day_index = {d.date(): i for i, d in enumerate(dates)}
+        module_day = {}
+        
+        for row in fixed.itertuples(index=False):
+            day = row.date_heure.date()
+            start = row.date_heure.hour * 60 + row.date_heure.minute
+            # La salle et le prof sont bloqués sur chaque créneau de la grille qui chevauche l'examen
+            for hour, minute, duree in self.slots:
+                slot_start = hour * 60 + minute
+                if slot_start < start + row.duree_minutes and start < slot_start + duree:
+                    self.rooms.reserve((day, slot_start), row.salle_id)
+                    prof_daily_load[(row.prof_id, day, slot_start)] = 1
+            prof_daily_load[(row.prof_id, day)] = prof_daily_load.get((row.prof_id, day), 0) + 1
+            self._day_load[day] = self._day_load.get(day, 0) + 1
+            module_day[row.module_id] = day_index[day]
             
-        return salle['id'], chosen_prof['id']
+        # Placement des modules touchés, les plus gros d'abord
+        new_records = []
+        to_place = [m for m in self.module_index if m in affected]
+        to_place.sort(key=lambda m: (self.prereq_level[m], -self.module_index[m][0]))
+        for mod_id in to_place:
+            self._first_fit(mod_id, dates, module_day, prof_daily_load, new_records)
+            
+        # Diff par module : les lignes existantes sont réutilisées avant d'en insérer
+        old_rows = {}
+        for row in planning[~planning['module_id'].isin(fixed['module_id'])].itertuples(index=False):
+            old_rows.setdefault(row.module_id, []).append(row)
+        new_rows = {}
+        for record in new_records:
+            new_rows.setdefault(record[0], []).append(record)
+            
+        deletes, updates, inserts = [], [], []
+        for mod_id in set(old_rows) | set(new_rows):
+            pairs, olds, news = self._pair_rows(old_rows.get(mod_id, []), new_rows.get(mod_id, []))
+            for old, new in pairs:
+                if (old.prof_id, old.salle_id, old.date_heure, old.duree_minutes) != new[1:]:
+                    updates.append((int(old.id),) + tuple(new[1:]))
+            deletes += [int(old.id) for old in olds]
+            inserts += news
+            
+        # Une instruction par type : les triggers par instruction voient chaque
+        # mouvement en entier (deux modules qui échangent leurs jours, par exemple)
+        statements = []
+        if deletes:
+            statements.append(("DELETE FROM examens WHERE id = ANY(%s)", (sorted(deletes),)))
+        if updates:
+            statements.append((
+                "UPDATE examens e SET prof_id = v.prof_id, salle_id = v.salle_id, "
+                "date_heure = v.date_heure, duree_minutes = v.duree_minutes "
+                "FROM (VALUES " + ",".join(["(%s, %s, %s, %s::timestamp, %s)"] * len(updates)) + ") "
+                "AS v(id, prof_id, salle_id, date_heure, duree_minutes) WHERE e.id = v.id",
+                tuple(x for row in sorted(updates) for x in row)
+            ))
+        if inserts:
+            statements.append((
+                "INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes) VALUES "
+                + ",".join(["(%s,%s,%s,%s,%s)"] * len(inserts)),
+                tuple(x for row in inserts for x in row)
+            ))
+        self.diff_counts = {'DELETE': len(deletes), 'UPDATE': len(updates), 'INSERT': len(inserts)}
+        return statements
+
+    @staticmethod
+    def _pair_rows(olds, news):
+        """Associe les anciennes lignes d'un module aux nouvelles, du plus au moins semblable.
 
-    def generate(self):
+        Même (date_heure, salle) d'abord, puis même créneau, puis même jour, puis le
+        reste : le moins de colonnes possible changent. Retourne (paires, anciennes
+        sans paire, nouvelles sans paire).
+        """
+        olds, news = list(olds), list(news)
+        pairs = []
+        keys = (
+            lambda dh, salle: (dh, salle),
+            lambda dh, salle: dh,
+            lambda dh, salle: dh.date(),
+            lambda dh, salle: None,
+        )
+        for key in keys:
+            libres = {}
+            for old in olds:
+                libres.setdefault(key(old.date_heure.to_pydatetime(), old.salle_id), []).append(old)
+            reste = []
+            for new in news:
+                candidats = libres.get(key(new[3], new[2]))
+                if candidats:
+                    pairs.append((candidats.pop(0), new))
+                else:
+                    reste.append(new)
+            olds = [old for candidats in libres.values() for old in candidats]
+            news = reste
+        return pairs, olds, news
+
+    def reschedule(self, module_ids=(), depth=0, dry_run=False):
+        """Mode incrémental : applique le diff de plan_changes sans vider la table examens"""
         try:
-            print("Début optimisation...")
             self.load_data()
+            planning = self.load_planning()
+            self.build_conflict_matrix()
             
-            # Nettoyer avant
+            statements = self.plan_changes(planning, module_ids, depth)
             cur = self.conn.cursor()
-            try:
-                cur.execute("CALL clear_planning()")
-            except psycopg2.errors.UndefinedFunction:
-                # Fallback si la procédure n'existe pas encore
-                self.conn.rollback()
-                cur = self.conn.cursor() # Re-cursor after rollback
-                cur.execute("TRUNCATE TABLE examens RESTART IDENTITY CASCADE")
-            
+            if dry_run:
+                for sql, params in statements:
+                    print(cur.mogrify(sql, params).decode('utf-8'))
+                return True, f"{sum(self.diff_counts.values())} modification(s) à appliquer (dry-run) : {self.diff_counts}"
+                
+            for sql, params in statements:
+                cur.execute(sql, params)
             self.conn.commit()
+            return True, f"{sum(self.diff_counts.values())} modification(s) appliquée(s) : {self.diff_counts}"
             
-            # Graphe de conflits (Coloration pour les jours)
-            G = self.build_conflict_graph()
-            
-            # Greedy coloring : stratégie 'largest_first' pour traiter les gros noeuds d'abord
-            coloring = nx.coloring.greedy_color(G, strategy='largest_first')
+        except Exception as e:
+            if self.conn:
+                self.conn.rollback()
+            print(f"Erreur scheduler : {e}")
+            return False, str(e)
             
-            # Group modules by color (day)
-            days = {}
-            for node, color in coloring.items():
-                if color not in days:
-                    days[color] = []
-                days[color].append(node)
+        finally:
+            if self.conn:
+                self.conn.close()
+
+    @contextmanager
+    def _phase(self, name):
+        """Mesure une phase de generate() (self.metrics) et prévient le callback de progression"""
+        if self.progress:
+            self.progress(name, self.metrics.timings())
+        with self.metrics.phase(name) as mesures:
+            yield mesures
+        self.timings = self.metrics.timings()
+
+    def generate(self, progress=None, trace_memory=False, profile=None):
+        """Génère le planning complet ; retourne (succès, message, métriques).
+
+        progress(phase, timings), optionnel, est appelé au début de chaque phase de
+        PHASES puis une dernière fois avec phase='done' ; timings contient la durée
+        (s) des phases terminées.
+        Les métriques (PhaseTimer.to_dict) donnent par phase la durée, le pic RSS et
+        des compteurs ; trace_memory ajoute le pic tracemalloc, profile=chemin
+        enregistre un profil cProfile.
+        """
+        self.progress = progress
+        self.timings = {}
+        self.metrics = PhaseTimer(trace_memory, profile)
+        try:
+            print("Début optimisation...")
+            with self._phase('load_data') as m:
+                self.load_data()
+                m.update(modules=len(self.modules), inscriptions=len(self.inscriptions.etudiant_ids),
+                         inscriptions_mo=round((self.inscriptions.etudiant_ids.nbytes
+                                                + self.inscriptions.module_ids.nbytes) / 2**20, 1),
+                         salles=len(self.salles), professeurs=len(self.profs))
+                
+                # Nettoyer avant
+                cur = self.conn.cursor()
+                try:
+                    cur.execute("CALL clear_planning()")
+                except psycopg2.errors.UndefinedFunction:
+                    # Fallback si la procédure n'existe pas encore
+                    self.conn.rollback()
+                    cur = self.conn.cursor() # Re-cursor after rollback
+                    cur.execute("TRUNCATE TABLE examens RESTART IDENTITY CASCADE")
                 
-            # Assign Slots
-            exam_records = []
-            current_date = self.start_date
+                self.conn.commit()
+            
+            # Graphe de conflits (Coloration pour les jours)
+            with self._phase('conflict_graph') as m:
+                graph = self.build_conflict_matrix()
+                m.update(noeuds=len(graph.module_ids), aretes=len(graph.indices) // 2)
             
-            # Tracking pour Profs (ProfID, Date) -> Count
-            prof_daily_load = {}
+            # Greedy coloring sur les tableaux CSR ('largest_first' traite les gros noeuds d'abord)
+            with self._phase('coloring') as m:
+                if self.prereq:
+                    # Prérequis : coloration ordonnée dans le temps ; un choix de stratégie
+                    # ou de moteur remplacé est tracé dans les mesures
+                    coloring, strategy = self.color_with_precedence(graph)
+                    m.update(prerequis=len(self.prereq), strategie=strategy)
+                    if (strategy, 'native') != (self.strategy, self.coloring_engine):
+                        m['strategie_demandee'] = f"{self.strategy} ({self.coloring_engine})"
+                    if self.partition:
+                        m['partition_ignoree'] = self.partition
+                elif self.partition:
+                    coloring, mesures = self.color_partitioned(graph)
+                    m.update(mesures, strategie=self.strategy)
+                    if self.coloring_engine != 'native':
+                        m['strategie_demandee'] = f"{self.strategy} ({self.coloring_engine})"
+                else:
+                    coloring = greedy_color(graph, self.strategy, self.coloring_engine)
+                    m['strategie'] = self.strategy
+                m['couleurs'] = len(set(coloring.values()))
             
-            # Trier les jours pour l'ordre chrono
-            sorted_colors = sorted(days.keys())
+            # Salles libres par créneau, un prof par salle
+            with self._phase('assign_resources') as m:
+                exam_records, nb_jours = self.plan_exams(coloring)
+                m.update(examens=len(exam_records), jours=nb_jours, score=self.score_plan(exam_records)['total'])
             
-            for color in sorted_colors:
-                day_modules = days[color]
-                
-                # Gestion Weekend
-                if current_date.weekday() >= 5: # Samedi/Dimanche
-                    current_date += timedelta(days=(7 - current_date.weekday()))
-                
-                # Créneaux horaires disponibles par jour (ex: 08:30, 10:30, 13:30, 15:30)
-                # On met max 4 examens séquentiels dans la même salle, mais ici on simplifie
-                # On répartit les modules du jour sur les créneaux.
-                # Simplification: Tous les modules de ce "Jour couleur" peuvent être en parallèle 
-                # SI ils n'ont pas de conflit. Mais la coloration garantit pas de conflit étudiant.
-                # Donc tous les modules de 'days[color]' peuvent avoir lieu LE MEME JOUR.
-                # Ils peuvent être à la MEME HEURE ? 
-                # OUI, car s'ils ont la même couleur, ils ne partagent AUCUN étudiant.
-                # Donc on peut paralléliser max.
-                
-                # Assignation Horaire: Tout le monde à 09:00 sauf si manque de salles
-                # Si manque de salles, on décale à 14:00.
-                
-                morning_slots = []
-                afternoon_slots = []
-                
-                for mod_id in day_modules:
-                    # Alternance basique pour répartir la charge salles
-                    if len(morning_slots) <= len(afternoon_slots):
-                        morning_slots.append(mod_id)
-                    else:
-                        afternoon_slots.append(mod_id)
-                        
-                # Traitement Matin (09:00)
-                for mod_id in morning_slots:
-                    salle_id, prof_id = self.assign_resources(mod_id, current_date, 9*60, prof_daily_load)
-                    exam_records.append((
-                        int(mod_id), int(prof_id), int(salle_id), 
-                        current_date.replace(hour=9, minute=0), 
-                        90 # Durée par défaut
-                    ))
-                    
-                # Traitement Aprèm (14:00)
-                for mod_id in afternoon_slots:
-                    salle_id, prof_id = self.assign_resources(mod_id, current_date, 14*60, prof_daily_load)
-                    exam_records.append((
-                        int(mod_id), int(prof_id), int(salle_id), 
-                        current_date.replace(hour=14, minute=0), 
-                        90
-                    ))
-                
-                current_date += timedelta(days=1)
+            # Optionnel : moins de jours en rééquilibrant les couleurs, dans le budget de temps
+            if self.search_budget > 0:
+                with self._phase('local_search') as m:
+                    exam_records, nb_jours, mesures = self.improve_plan(graph, coloring, exam_records, nb_jours)
+                    m.update(mesures, examens=len(exam_records), jours=nb_jours,
+                             score=self.score_plan(exam_records)['total'])
             
             # Insertion Batch
-            print(f"Insertion de {len(exam_records)} examens...")
-            args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s)", x).decode('utf-8') for x in exam_records)
-            cur.execute("INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes) VALUES " + args_str)
-            
-            self.conn.commit()
+            with self._phase('insert') as m:
+                print(f"Insertion de {len(exam_records)} examens...")
+                args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s)", x).decode('utf-8') for x in exam_records)
+                cur.execute("INSERT INTO examens (module_id, prof_id, salle_id, date_heure, duree_minutes) VALUES " + args_str)
+                
+                self.conn.commit()
+                m['lignes'] = len(exam_records)
             print("Planification terminée avec succès.")
-            return True, f"Généré {len(exam_records)} examens sur {len(sorted_colors)} jours."
+            if progress:
+                progress('done', self.timings)
+            return True, f"Généré {len(exam_records)} examens sur {nb_jours} jours.", self.metrics.to_dict()
             
         except Exception as e:
-            self.conn.rollback()
+            if self.conn:
+                self.conn.rollback()
             print(f"Erreur scheduler : {e}")
-            return False, str(e)
+            return False, str(e), self.metrics.to_dict()
             
         finally:
+            self.metrics.close()
             if self.conn:
                 self.conn.close()
 
 if __name__ == "__main__":
-    scheduler = ExamScheduler()
-    scheduler.generate()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Génération du planning d'examens")
+    parser.add_argument("--strategy", default="largest_first", help="largest_first, dsatur ou smallest_last")
+    parser.add_argument("--grille", default="2x90", choices=sorted(GRILLES), help="grille de créneaux par jour")
+    parser.add_argument("--mode", default="day", choices=MODES)
+    parser.add_argument("--incremental", nargs="*", type=int, metavar="MODULE_ID",
+                        help="replanifie seulement ces modules (et les modules sans examen) sans vider le planning")
+    parser.add_argument("--depth", type=int, default=0, help="mode incrémental : libère aussi les voisins jusqu'à cette profondeur")
+    parser.add_argument("--dry-run", action="store_true", help="mode incrémental : affiche le diff sans l'appliquer")
+    parser.add_argument("--search-budget", type=float, default=0.0, metavar="SECONDES",
+                        help="recherche locale après la coloration pour réduire le nombre de jours")
+    parser.add_argument("--no-precedence", action="store_true",
+                        help="ignore modules.pre_req_id (prérequis non forcément examinés avant)")
+    parser.add_argument("--partition", choices=PARTITIONS,
+                        help="colore séparément les composantes ou les départements (sans prérequis)")
+    parser.add_argument("--parts", type=int, default=4, help="nombre de partitions avec --partition")
+    parser.add_argument("--metrics", metavar="FICHIER.json", help="écrit les mesures par phase en JSON")
+    parser.add_argument("--trace-memory", action="store_true", help="pic mémoire Python par phase (tracemalloc, plus lent)")
+    parser.add_argument("--profile", metavar="FICHIER.prof", help="profil cProfile de la génération")
+    args = parser.parse_args()
+    
+    scheduler = ExamScheduler(strategy=args.strategy, slots=GRILLES[args.grille], mode=args.mode,
+                              search_budget=args.search_budget, precedence=not args.no_precedence,
+                              partition=args.partition, partition_parts=args.parts)
+    if args.incremental is not None:
+        print(scheduler.reschedule(args.incremental, args.depth, args.dry_run)[1])
+    else:
+        ok, msg, metrics = scheduler.generate(trace_memory=args.trace_memory, profile=args.profile)
+        print(msg)
+        for phase, mesures in metrics['phases'].items():
+            print(f"  {phase:<18} {mesures['secondes']:>8.3f} s  " +
+                  "  ".join(f"{k}={v}" for k, v in mesures.items() if k != 'secondes'))
+        if args.metrics:
+            scheduler.metrics.write_json(args.metrics)
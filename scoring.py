@@ -0,0 +1,226 @@
+from collections import Counter
+
+import numpy as np
+
+# Pénalité par étudiant selon l'écart (jours calendaires) entre deux examens consécutifs ;
+# au-delà de la table, aucune pénalité. Écart 0 = deux examens le même jour (contrainte dure)
+PENALITES_ECART = (0.0, 1.0, 0.5, 0.25)
+
+# Poids des composantes dans le score total (plus bas = meilleur)
+POIDS = {
+    'ecarts': 1.0,            # pénalité moyenne par étudiant
+    'variance_profs': 1.0,    # variance / moyenne² des surveillances par prof
+    'remplissage': 1.0,       # 1 - taux de remplissage moyen des salles
+}
+# Poids de chaque violation de contrainte dure (mêmes règles que le scheduler)
+POIDS_DUR = 1000.0
+
+# Même limite que scheduler.MAX_EXAMENS_PROF_JOUR (trigger check_exam_prof)
+MAX_EXAMENS_PROF_JOUR = 3
+
+# Jour des modules non planifiés dans l'état de start() : après tout jour réel
+_HORS_PLANNING = np.iinfo(np.int32).max
+
+
+def _lookup(ids):
+    """Tableau dense id -> position (-1 si inconnu)"""
+    ids = np.asarray(ids, dtype=np.int64)
+    pos = np.full(int(ids.max()) + 2 if len(ids) else 1, -1, dtype=np.int64)
+    pos[ids] = np.arange(len(ids))
+    return pos
+
+
+class PlanScorer:
+    """Évalue un planning complet en quelques opérations NumPy.
+
+    Les données fixes (inscriptions, capacités, profs) sont indexées une fois à la
+    construction ; score() ne reçoit que les tableaux du planning, une ligne par
+    (module, salle) comme exam_records : module_id, jour, créneau, salle_id, prof_id.
+    Les jours sont des entiers (jours calendaires, week-ends compris), les
+    créneaux l'heure de début en minutes depuis minuit (voir plan_arrays).
+
+    Pour évaluer beaucoup de déplacements d'un module vers un autre jour, start()
+    mémorise un planning ; move_delta() ne recalcule alors que les lignes des
+    étudiants du module, ses profs et ses salles, et apply_move() l'enregistre.
+    """
+
+    def __init__(self, module_ids, nb_inscrits, etudiant_ids, insc_module_ids,
+                 salle_ids, capacites, prof_ids):
+        self.module_pos = _lookup(module_ids)
+        self.nb_inscrits = np.asarray(nb_inscrits, dtype=np.float64)
+        self.salle_pos = _lookup(salle_ids)
+        self.capacites = np.asarray(capacites, dtype=np.float64)
+        self.prof_pos = _lookup(prof_ids)
+        self.nb_profs = len(prof_ids)
+        n = len(module_ids)
+
+        # Modules de chaque étudiant en matrice (étudiants x examens max), complétée par
+        # n : position sentinelle placée après le dernier jour du planning
+        etudiant_ids = np.asarray(etudiant_ids)
+        cols = self.module_pos[np.asarray(insc_module_ids)]
+        ordre = np.argsort(etudiant_ids, kind='stable')
+        etudiant_ids, cols = etudiant_ids[ordre], cols[ordre]
+        if len(etudiant_ids):
+            nouveau = np.concatenate(([True], etudiant_ids[1:] != etudiant_ids[:-1]))
+            ligne = np.cumsum(nouveau) - 1
+            debut = np.flatnonzero(nouveau)
+            rang = np.arange(len(ligne)) - debut[ligne]
+            self.etudiant_modules = np.full((len(debut), int(rang.max()) + 1), n, dtype=np.int32)
+            self.etudiant_modules[ligne, rang] = np.where(cols >= 0, cols, n)
+        else:
+            self.etudiant_modules = np.full((0, 1), n, dtype=np.int32)
+        self.nb_etudiants = len(self.etudiant_modules)
+        self._penalites = np.array(PENALITES_ECART + (0.0,), dtype=np.float64)
+
+        # Lignes (étudiants) de chaque module, en CSR : move_delta ne relit que celles-là
+        lignes, rangs = np.nonzero(self.etudiant_modules < n)
+        mods = self.etudiant_modules[lignes, rangs]
+        ordre = np.argsort(mods, kind='stable')
+        self._module_lignes = lignes[ordre]
+        self._module_ptr = np.concatenate(([0], np.cumsum(np.bincount(mods, minlength=n))))
+
+    def _ecarts(self, jours_etudiants, hors_planning):
+        """Pénalité d'écarts et nombre de conflits de chaque ligne (étudiant) de jours_etudiants"""
+        jours_etudiants = np.sort(jours_etudiants, axis=1)
+        ecarts = np.minimum(np.diff(jours_etudiants, axis=1), len(self._penalites) - 1)
+        valides = jours_etudiants[:, 1:] < hors_planning
+        penalites = np.where(valides, self._penalites[ecarts], 0.0).sum(axis=1)
+        conflits = ((ecarts == 0) & valides).sum(axis=1)
+        return penalites, conflits
+
+    def score(self, modules, jours, creneaux, salles, profs):
+        """Retourne les composantes du score et le total pondéré (plus bas = meilleur)"""
+        m = self.module_pos[np.asarray(modules)]
+        jours = np.asarray(jours, dtype=np.int64)
+        creneaux = np.asarray(creneaux, dtype=np.int64)
+        s = self.salle_pos[np.asarray(salles)]
+        p = self.prof_pos[np.asarray(profs)]
+        n = len(self.nb_inscrits)
+        nb_jours = int(jours.max()) + 1 if len(jours) else 1
+
+        # Jour de chaque module ; modules non planifiés et sentinelle après le dernier jour
+        module_jour = np.full(n + 1, nb_jours, dtype=np.int32)
+        module_jour[m] = jours
+        planifies = module_jour[:n] < nb_jours
+
+        # Écarts entre examens consécutifs de chaque étudiant (examens planifiés seulement)
+        penalites, conflits = self._ecarts(module_jour[self.etudiant_modules], nb_jours)
+        penalite_ecarts = float(penalites.sum())
+        conflits_etudiants = int(conflits.sum())
+
+        # Charge des profs : variance des surveillances, dépassements par jour
+        charge = np.bincount(p, minlength=self.nb_profs).astype(np.float64)
+        moyenne = charge.mean() if len(charge) else 0.0
+        variance = float(charge.var()) if len(charge) else 0.0
+        prof_jour = np.bincount(p * nb_jours + jours)
+        profs_depassements = int(np.maximum(prof_jour - MAX_EXAMENS_PROF_JOUR, 0).sum())
+
+        # Remplissage : places de toutes les salles de chaque module planifié
+        places = np.bincount(m, weights=self.capacites[s], minlength=n)
+        places_mod = places[planifies]
+        inscrits = self.nb_inscrits[planifies]
+        remplissage = float((np.minimum(inscrits, places_mod) / np.maximum(places_mod, 1)).mean()) \
+            if len(places_mod) else 0.0
+        sous_capacite = int((places_mod < inscrits).sum())
+        # Salles réservées deux fois sur un même (jour, créneau) ; créneaux numérotés
+        # via une table des minutes de la journée (bincount au lieu de np.unique)
+        presents = np.zeros(24 * 60, dtype=bool)
+        presents[creneaux] = True
+        creneau_idx = (np.cumsum(presents) - 1)[creneaux]
+        occupations = np.bincount((s * nb_jours + jours) * int(presents.sum()) + creneau_idx)
+        salles_doubles = int(np.maximum(occupations - 1, 0).sum())
+
+        composantes = {
+            'ecarts': penalite_ecarts / max(self.nb_etudiants, 1),
+            'variance_profs': variance / moyenne ** 2 if moyenne else 0.0,
+            'remplissage': 1.0 - remplissage,
+        }
+        violations = conflits_etudiants + profs_depassements + sous_capacite + salles_doubles
+        total = sum(POIDS[k] * v for k, v in composantes.items()) + POIDS_DUR * violations
+        return dict(
+            total=round(float(total), 6),
+            **{k: round(float(v), 6) for k, v in composantes.items()},
+            charge_prof_max=int(charge.max()) if len(charge) else 0,
+            conflits_etudiants=conflits_etudiants,
+            profs_depassements=profs_depassements,
+            sous_capacite=sous_capacite,
+            salles_doubles=salles_doubles,
+            modules_non_planifies=int(n - planifies.sum()),
+        )
+
+    def start(self, modules, jours, creneaux, salles, profs):
+        """Mémorise le planning pour move_delta / apply_move ; retourne son score()"""
+        resultat = self.score(modules, jours, creneaux, salles, profs)
+        m = self.module_pos[np.asarray(modules)]
+        self._jour = np.full(len(self.nb_inscrits) + 1, _HORS_PLANNING, dtype=np.int64)
+        self._jour[m] = jours
+        self._penalite_etudiant, self._conflits_etudiant = self._ecarts(
+            self._jour[self.etudiant_modules], _HORS_PLANNING)
+        # Lignes (créneau, salle, prof) de chaque module ; occupations par jour
+        self._examens = {}
+        for v, j, c, sl, p in zip(m.tolist(), np.asarray(jours).tolist(), np.asarray(creneaux).tolist(),
+                                  np.asarray(salles).tolist(), np.asarray(profs).tolist()):
+            self._examens.setdefault(v, []).append((c, sl, p))
+        self._prof_jour = Counter(zip(np.asarray(profs).tolist(), np.asarray(jours).tolist()))
+        self._salle_creneau = Counter(zip(np.asarray(salles).tolist(), np.asarray(jours).tolist(),
+                                          np.asarray(creneaux).tolist()))
+        self.total = resultat['total']
+        return resultat
+
+    def _deplacement(self, module_id, jour):
+        """Composantes touchées par le passage du module à jour (état de start())"""
+        v = int(self.module_pos[module_id])
+        ancien = int(self._jour[v])
+        lignes = self._module_lignes[self._module_ptr[v]:self._module_ptr[v + 1]]
+        self._jour[v] = jour
+        penalites, conflits = self._ecarts(self._jour[self.etudiant_modules[lignes]], _HORS_PLANNING)
+        self._jour[v] = ancien
+
+        # Profs et salles du module quittent l'ancien jour pour le nouveau
+        profs, salles = Counter(), Counter()
+        for c, sl, p in self._examens.get(v, ()):
+            profs[(p, ancien)] -= 1
+            profs[(p, jour)] += 1
+            salles[(sl, ancien, c)] -= 1
+            salles[(sl, jour, c)] += 1
+        d_profs = sum(max(self._prof_jour[k] + d - MAX_EXAMENS_PROF_JOUR, 0)
+                      - max(self._prof_jour[k] - MAX_EXAMENS_PROF_JOUR, 0) for k, d in profs.items())
+        d_salles = sum(max(self._salle_creneau[k] + d - 1, 0)
+                       - max(self._salle_creneau[k] - 1, 0) for k, d in salles.items())
+        d_conflits = int(conflits.sum() - self._conflits_etudiant[lignes].sum())
+        delta = (POIDS['ecarts'] * float(penalites.sum() - self._penalite_etudiant[lignes].sum())
+                 / max(self.nb_etudiants, 1)
+                 + POIDS_DUR * (d_conflits + d_profs + d_salles))
+        return delta, v, lignes, penalites, conflits, profs, salles
+
+    def move_delta(self, module_id, jour):
+        """Variation du score total si module_id passe au jour jour (mêmes créneaux, salles, profs)"""
+        return self._deplacement(module_id, jour)[0]
+
+    def apply_move(self, module_id, jour):
+        """Enregistre le déplacement dans l'état de start() ; retourne le nouveau total"""
+        delta, v, lignes, penalites, conflits, profs, salles = self._deplacement(module_id, jour)
+        self._jour[v] = jour
+        self._penalite_etudiant[lignes] = penalites
+        self._conflits_etudiant[lignes] = conflits
+        self._prof_jour.update(profs)
+        self._salle_creneau.update(salles)
+        self.total += delta
+        return self.total
+
+
+def plan_arrays(exam_records, origine=None):
+    """exam_records (module_id, prof_id, salle_id, date_heure, durée) -> tableaux pour score().
+
+    Jours comptés en jours calendaires depuis origine (par défaut le premier
+    examen), créneaux en minutes depuis minuit.
+    """
+    if not exam_records:
+        vide = np.empty(0, dtype=np.int64)
+        return vide, vide, vide, vide, vide
+    modules, profs, salles, dates, _ = zip(*exam_records)
+    ordinaux = np.array([d.toordinal() for d in dates], dtype=np.int64)
+    origine = origine.toordinal() if origine is not None else ordinaux.min()
+    creneaux = np.array([d.hour * 60 + d.minute for d in dates], dtype=np.int64)
+    return (np.asarray(modules, dtype=np.int64), ordinaux - origine, creneaux,
+            np.asarray(salles, dtype=np.int64), np.asarray(profs, dtype=np.int64))